@@ -1,52 +1,168 @@
 from fastapi import FastAPI
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
-from api.routes import diagnosis, patients, telemedicine
-
-# Initialize FastAPI app
-app = FastAPI(
-    title="AI-Powered Symptom Checker",
-    description="Advanced medical symptom analysis and diagnosis system",
-    version="1.0.0"
+from starlette.middleware import Middleware
+from typing import List
+from api.middleware import (
+    AuthMiddleware, CompressionMiddleware, DeadlineMiddleware, ErrorHandlerMiddleware, ProfilingMiddleware,
+    RateLimitMiddleware, RequestIdMiddleware, TimingMiddleware
 )
+from api.responses import FastJSONResponse
+from api.routes import admin, auth, diagnosis, patients, reports, telemedicine, wearables
+from core.metrics import CONTENT_TYPE, get_registry
+from core.model_registry import get_model_registry, run_model_watch_job
+from core.rate_limiter import get_rate_limiter
+from core.response_cache import get_response_cache
+from services.diagnosis_cascade import cascade_metrics
+from services.diagnosis_coalescing import get_diagnosis_coalescer
+from services.diagnosis_writer import shutdown_diagnosis_writer
+from services.http_client import close_http_session
+from services.medical_api_service import prewarm_condition_cache
+from services.report_service import run_rollup_job
+from services.resilience import breaker_metrics
+from services.timeseries_store import run_vitals_compaction_job
+from services.vitals_ingestion import shutdown_vitals_ingestor
+from services.wearable_sync import run_wearable_sync_job
+import asyncio
 
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure this appropriately for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+def build_middleware() -> List[Middleware]:
+    """The app's middleware, outermost first. All of it is pure ASGI, so
+    no per-request tasks are spawned and streaming responses pass through."""
+    return [
+        # Tags every log record of the request, including error logs below
+        Middleware(RequestIdMiddleware),
+        # Catches whatever the layers below raise
+        Middleware(ErrorHandlerMiddleware),
+        # Times everything below, including auth and rate limiting
+        Middleware(TimingMiddleware),
+        # gzip/brotli for large bodies; CORS and auth headers below are kept as-is
+        Middleware(CompressionMiddleware),
+        # Answers preflights before auth and adds CORS headers to 401/429s
+        Middleware(
+            CORSMiddleware,
+            allow_origins=["*"],  # Configure this appropriately for production
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        ),
+        # Puts the token's user in the request state for rate limiting
+        Middleware(AuthMiddleware),
+        # Per-client token buckets (RATE_LIMIT_*); rejected requests cost nothing downstream
+        Middleware(RateLimitMiddleware),
+        # Opt-in per-request profiles (PROFILING_TOKEN or armed via the admin API)
+        Middleware(ProfilingMiddleware),
+        # Per-request latency budget for outbound calls
+        Middleware(DeadlineMiddleware)
+    ]
 
-# Include routers
-app.include_router(
-    diagnosis.router,
-    prefix="/api/v1/diagnosis",
-    tags=["diagnosis"]
-)
+def create_app() -> FastAPI:
+    """Build the API application"""
+    app = FastAPI(
+        title="AI-Powered Symptom Checker",
+        description="Advanced medical symptom analysis and diagnosis system",
+        version="1.0.0",
+        default_response_class=FastJSONResponse,
+        middleware=build_middleware()
+    )
 
-app.include_router(
-    patients.router,
-    prefix="/api/v1/patients",
-    tags=["patients"]
-)
+    # Include routers
+    app.include_router(
+        admin.router,
+        prefix="/api/v1/admin",
+        tags=["admin"]
+    )
 
-app.include_router(
-    telemedicine.router,
-    prefix="/api/v1/telemedicine",
-    tags=["telemedicine"]
-)
+    app.include_router(
+        auth.router,
+        prefix="/api/v1/auth",
+        tags=["authentication"]
+    )
+
+    app.include_router(
+        diagnosis.router,
+        prefix="/api/v1/diagnosis",
+        tags=["diagnosis"]
+    )
+
+    app.include_router(
+        patients.router,
+        prefix="/api/v1/patients",
+        tags=["patients"]
+    )
+
+    app.include_router(
+        reports.router,
+        prefix="/api/v1/reports",
+        tags=["reports"]
+    )
+
+    app.include_router(
+        telemedicine.router,
+        prefix="/api/v1/telemedicine",
+        tags=["telemedicine"]
+    )
+
+    app.include_router(
+        wearables.router,
+        prefix="/api/v1/wearables",
+        tags=["wearables"]
+    )
+
+    @app.on_event("startup")
+    async def start_background_jobs():
+        """Start the periodic rollup, compaction, wearable sync and model watch jobs and warm the condition cache"""
+        app.state.rollup_job = asyncio.create_task(run_rollup_job())
+        app.state.vitals_compaction = asyncio.create_task(run_vitals_compaction_job())
+        app.state.wearable_sync = asyncio.create_task(run_wearable_sync_job())
+        app.state.cache_warmup = asyncio.create_task(prewarm_condition_cache())
+        app.state.model_watch = asyncio.create_task(run_model_watch_job())
+
+    @app.on_event("shutdown")
+    async def release_resources():
+        """Commit buffered diagnoses and vitals and close pooled connections before exit"""
+        app.state.rollup_job.cancel()
+        app.state.vitals_compaction.cancel()
+        app.state.wearable_sync.cancel()
+        app.state.cache_warmup.cancel()
+        app.state.model_watch.cancel()
+        shutdown_diagnosis_writer()
+        shutdown_vitals_ingestor()
+        await close_http_session()
+        await get_rate_limiter().backend.close()
+
+    @app.get("/health")
+    async def health_check():
+        """Health check endpoint"""
+        return {"status": "healthy"}
+
+    @app.get("/health/dependencies")
+    async def dependency_health():
+        """Circuit breaker state and counters for each external dependency"""
+        breakers = breaker_metrics()
+        return {
+            "status": "degraded" if any(b["state"] != "closed" for b in breakers) else "healthy",
+            "breakers": breakers,
+            "rate_limiter": get_rate_limiter().metrics(),
+            "response_cache": get_response_cache().metrics(),
+            "diagnosis_coalescing": get_diagnosis_coalescer().metrics(),
+            "diagnosis_cascade": cascade_metrics(),
+            "models": get_model_registry().metrics()
+        }
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus scrape endpoint"""
+        return Response(get_registry().render(), media_type=CONTENT_TYPE)
+
+    @app.get("/")
+    async def root():
+        """Root endpoint with API information"""
+        return {
+            "app": "AI-Powered Symptom Checker",
+            "version": "1.0.0",
+            "status": "running"
+        }
+
+    return app
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy"}
-
-@app.get("/")
-async def root():
-    """Root endpoint with API information"""
-    return {
-        "app": "AI-Powered Symptom Checker",
-        "version": "1.0.0",
-        "status": "running"
-    }
\ No newline at end of file
+app = create_app()
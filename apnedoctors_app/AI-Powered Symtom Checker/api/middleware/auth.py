@@ -1,34 +1,32 @@
-from fastapi import Request, HTTPException, Depends
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from fastapi import HTTPException, Depends
+from fastapi.security import OAuth2PasswordBearer
+from starlette.types import ASGIApp, Receive, Scope, Send
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from typing import Optional
-import os
-from dotenv import load_dotenv
+from api.responses import FastJSONResponse
+from core.config import get_settings
+from core.password_hasher import get_password_hasher
+from core.token_cache import get_token_cache
 
-# Load environment variables
-load_dotenv()
+settings = get_settings()
 
-# Security configurations
-SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
+# Security configurations (the signing key is settings.SECRET_KEY)
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 class AuthHandler:
     @staticmethod
-    def verify_password(plain_password: str, hashed_password: str) -> bool:
-        """Verify password against hash"""
-        return pwd_context.verify(plain_password, hashed_password)
+    async def verify_password(plain_password: str, hashed_password: str) -> bool:
+        """Verify password against hash (bcrypt runs in the hasher pool)"""
+        return await get_password_hasher().verify(plain_password, hashed_password)
 
     @staticmethod
-    def get_password_hash(password: str) -> str:
-        """Generate password hash"""
-        return pwd_context.hash(password)
+    async def get_password_hash(password: str) -> str:
+        """Generate password hash (bcrypt runs in the hasher pool)"""
+        return await get_password_hasher().hash(password)
 
     @staticmethod
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -42,7 +40,7 @@ class AuthHandler:
             expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
             
         to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+        encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
         return encoded_jwt
 
     @staticmethod
@@ -55,7 +53,7 @@ class AuthHandler:
         )
         
         try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            payload = get_token_cache().verify(token, settings.SECRET_KEY, [ALGORITHM])
             user_id: str = payload.get("sub")
             if user_id is None:
                 raise credentials_exception
@@ -66,39 +64,68 @@ class AuthHandler:
         # For now, we'll just return the user_id
         return user_id
 
+# Reachable without a token even when AUTH_REQUIRED is set
+PUBLIC_PATHS = ("/", "/health", "/metrics", "/api/v1/auth/login", "/openapi.json")
+PUBLIC_PREFIXES = ("/health/", "/docs", "/redoc")
+
 class AuthMiddleware:
-    async def __call__(self, request: Request, call_next):
-        """Middleware to handle authentication for protected routes"""
-        # Skip auth for public endpoints
-        if request.url.path in ["/api/v1/auth/login", "/health", "/docs", "/redoc"]:
-            return await call_next(request)
+    """Resolve the bearer token to a user before routing.
 
-        try:
-            # Get authorization header
-            auth_header = request.headers.get("Authorization")
-            if not auth_header or not auth_header.startswith("Bearer "):
-                raise HTTPException(
-                    status_code=401,
-                    detail="Invalid authentication credentials",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-
-            token = auth_header.split(" ")[1]
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            
-            # Add user info to request state
-            request.state.user = payload.get("sub")
-            
-            return await call_next(request)
-            
-        except JWTError:
-            raise HTTPException(
-                status_code=401,
-                detail="Invalid token or expired token",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        except Exception as e:
-            raise HTTPException(
-                status_code=500,
-                detail=str(e)
-            )
\ No newline at end of file
+    A valid token puts its subject in the request state as `user`, where
+    rate limiting and routes pick it up. With AUTH_REQUIRED, requests to
+    anything but PUBLIC_PATHS without a valid token get 401; otherwise
+    they proceed anonymously. Refuses to start without SECRET_KEY, since
+    tokens signed with a guessable key would pass.
+    """
+
+    def __init__(self, app: ASGIApp, required: Optional[bool] = None):
+        if not settings.SECRET_KEY:
+            raise RuntimeError("SECRET_KEY is not set; refusing to verify tokens without a signing key")
+        self.app = app
+        self.required = settings.AUTH_REQUIRED if required is None else required
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        user = None
+        token = self._bearer_token(scope)
+        if token is not None:
+            try:
+                user = get_token_cache().verify(token, settings.SECRET_KEY, [ALGORITHM]).get("sub")
+            except JWTError:
+                if self.required:
+                    await self._reject(scope, receive, send, "Invalid token or expired token")
+                    return
+
+        if user is None and self.required and not self._is_public(scope["path"]):
+            await self._reject(scope, receive, send, "Not authenticated")
+            return
+
+        if user is not None:
+            scope.setdefault("state", {})["user"] = user
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _bearer_token(scope: Scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    return token.strip()
+                return None
+        return None
+
+    @staticmethod
+    def _is_public(path: str) -> bool:
+        return path in PUBLIC_PATHS or path.startswith(PUBLIC_PREFIXES)
+
+    @staticmethod
+    async def _reject(scope: Scope, receive: Receive, send: Send, detail: str) -> None:
+        response = FastJSONResponse(
+            {"detail": detail},
+            status_code=401,
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,77 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import List, Optional
+import asyncio
+from core.config import get_settings
+from utils.compression import compress, is_compressible, negotiate_encoding
+
+settings = get_settings()
+
+# Bodies above this are compressed on a worker thread rather than the event loop
+OFFLOAD_SIZE = 256 * 1024
+
+class CompressionMiddleware:
+    """gzip/brotli for large JSON and text responses.
+
+    Only bodies with a Content-Length of at least COMPRESSION_MIN_SIZE are
+    compressed. Streaming responses (exports, SSE) and responses that
+    already set Content-Encoding, such as cached ones that were compressed
+    once and stored, pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = minimum_size or settings.COMPRESSION_MIN_SIZE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                if self._should_compress(message):
+                    start = message
+                    return
+                await send(message)
+                return
+
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            if len(body) >= OFFLOAD_SIZE:
+                body = await asyncio.to_thread(compress, body, encoding)
+            else:
+                body = compress(body, encoding)
+            headers = MutableHeaders(scope=start)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _should_compress(self, message: Message) -> bool:
+        headers = Headers(raw=message.get("headers", []))
+        if "content-encoding" in headers or message["status"] in (204, 304):
+            return False
+        length = headers.get("content-length")
+        if length is None or int(length) < self.minimum_size:
+            return False
+        return is_compressible(headers.get("content-type", ""))
@@ -0,0 +1,42 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+from typing import Optional
+import logging
+from core.config import get_settings
+from services.resilience import deadline_scope
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+DEADLINE_HEADER = b"x-request-timeout"
+
+class DeadlineMiddleware:
+    """Give each HTTP request a latency budget that outbound calls inherit.
+
+    Clients may shorten the budget with an X-Request-Timeout header (in
+    seconds); it can never exceed REQUEST_TIMEOUT.
+    """
+
+    def __init__(self, app: ASGIApp, default_timeout: Optional[float] = None):
+        self.app = app
+        self.default_timeout = default_timeout or settings.REQUEST_TIMEOUT
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with deadline_scope(self._budget(scope)):
+            await self.app(scope, receive, send)
+
+    def _budget(self, scope: Scope) -> float:
+        for name, value in scope["headers"]:
+            if name == DEADLINE_HEADER:
+                try:
+                    requested = float(value)
+                except ValueError:
+                    logger.warning(f"Ignoring invalid {DEADLINE_HEADER.decode()} header: {value!r}")
+                    break
+                if requested > 0:
+                    return min(requested, self.default_timeout)
+                break
+        return self.default_timeout
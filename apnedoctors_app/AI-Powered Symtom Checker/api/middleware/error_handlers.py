@@ -1,56 +1,92 @@
 from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
-from typing import Union, Dict, Any
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Dict, Any
 import logging
-import traceback
-import sys
+import math
+from core.password_hasher import LoginThrottled, PasswordHasherBusy
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 class ErrorHandlerMiddleware:
-    async def __call__(self, request: Request, call_next) -> Union[JSONResponse, Any]:
+    """Turn exceptions that escape the app into sanitized JSON responses.
+
+    HTTPExceptions keep their status, ValueErrors become 422, login
+    throttling 429 and a saturated password hasher 503, and anything else
+    a 500 with an error_id to find the logged stack trace. If the
+    response has already started there is nothing left to send, so the
+    error is logged and re-raised for the server to close the connection.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
         try:
-            return await call_next(request)
-        
+            await self.app(scope, receive, send_wrapper)
+            return
         except HTTPException as http_exc:
-            # Handle known HTTP exceptions
-            return JSONResponse(
+            if response_started:
+                raise
+            response = JSONResponse(
                 status_code=http_exc.status_code,
-                content={"detail": http_exc.detail}
+                content={"detail": http_exc.detail},
+                headers=getattr(http_exc, "headers", None)
+            )
+        except LoginThrottled as throttled:
+            if response_started:
+                raise
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Too many login attempts"},
+                headers={"Retry-After": str(math.ceil(throttled.retry_after))}
+            )
+        except PasswordHasherBusy:
+            logger.warning(f"Password hasher saturated on {scope['method']} {scope['path']}")
+            if response_started:
+                raise
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Authentication is busy, try again shortly"},
+                headers={"Retry-After": "1"}
             )
-            
         except ValueError as val_exc:
-            # Handle validation errors
             logger.error(f"Validation error: {str(val_exc)}")
-            return JSONResponse(
+            if response_started:
+                raise
+            response = JSONResponse(
                 status_code=422,
                 content={"detail": str(val_exc)}
             )
-            
         except Exception as exc:
-            # Handle unexpected errors
-            exc_type, exc_value, exc_traceback = sys.exc_info()
-            stack_trace = traceback.format_exception(exc_type, exc_value, exc_traceback)
-            
-            # Log the full error details
+            # The stack trace is formatted by the log writer thread, not here
             logger.error(
-                f"Unhandled error occurred: {str(exc)}\n"
-                f"Stack trace:\n{''.join(stack_trace)}"
+                f"Unhandled error occurred on {scope['method']} {scope['path']}: {str(exc)}",
+                exc_info=exc
             )
-            
+            if response_started:
+                raise
             # Return a sanitized error response
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=500,
                 content={
                     "detail": "An internal server error occurred",
                     "error_id": id(exc)  # Useful for log correlation
                 }
             )
+        await response(scope, receive, send)
 
 class CustomHTTPException(HTTPException):
     def __init__(
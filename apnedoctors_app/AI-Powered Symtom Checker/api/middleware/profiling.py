@@ -0,0 +1,70 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Optional
+import asyncio
+import hmac
+import logging
+from core.config import get_settings
+from core.profiling import PROFILE_MODES, RequestProfiler, get_profiler
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_MODE_HEADER = b"x-profile-mode"
+
+class ProfilingMiddleware:
+    """Profile individual requests on demand.
+
+    A request carrying `X-Profile: <PROFILING_TOKEN>` (optionally with
+    `X-Profile-Mode: sample`) is profiled, as are requests the profiler
+    was armed for through the admin API. The response carries the
+    artifact id in X-Profile-Id. With no token configured and nothing
+    armed, requests pass straight through.
+    """
+
+    def __init__(self, app: ASGIApp, token: Optional[str] = None, profiler: Optional[RequestProfiler] = None):
+        self.app = app
+        self.token = (token or settings.PROFILING_TOKEN or "").encode()
+        self.profiler = profiler or get_profiler()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not (self.token or self.profiler.armed):
+            await self.app(scope, receive, send)
+            return
+
+        mode = self._requested_mode(scope) or self.profiler.take_armed(scope["path"])
+        profile = self.profiler.start(scope["method"], scope["path"], mode) if mode else None
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", profile.profile_id)
+            await send(message)
+
+        context_token = self.profiler.activate(profile)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.profiler.finish(profile, context_token)
+            try:
+                await asyncio.to_thread(self.profiler.save, profile)
+            except Exception as e:
+                logger.error(f"Saving profile {profile.profile_id} failed: {str(e)}")
+
+    def _requested_mode(self, scope: Scope) -> Optional[str]:
+        if not self.token:
+            return None
+        supplied, mode = None, b"cprofile"
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                supplied = value
+            elif name == PROFILE_MODE_HEADER:
+                mode = value
+        if supplied is None or not hmac.compare_digest(supplied, self.token):
+            return None
+        mode = mode.decode("latin-1").lower()
+        return mode if mode in PROFILE_MODES else "cprofile"
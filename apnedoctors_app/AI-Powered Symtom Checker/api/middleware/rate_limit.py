@@ -0,0 +1,44 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+from typing import Optional
+import math
+from api.responses import FastJSONResponse
+from core.rate_limiter import RateLimiter, get_rate_limiter
+
+def client_key(scope: Scope) -> str:
+    """The authenticated user from the request state, else the client IP"""
+    user = scope.get("state", {}).get("user")
+    if user is not None:
+        return f"user:{user}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+class RateLimitMiddleware:
+    """Reject clients that exceed their token bucket with 429 + Retry-After.
+
+    Clients are identified by the authenticated user that auth middleware
+    put in the request state, falling back to the client IP.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter or get_rate_limiter()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cost = self.limiter.cost_for(scope["path"])
+        if cost > 0:
+            wait = await self.limiter.acquire(client_key(scope), cost)
+            if wait > 0:
+                response = FastJSONResponse(
+                    {"detail": "Rate limit exceeded"},
+                    status_code=429,
+                    headers={"Retry-After": str(math.ceil(wait))}
+                )
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
+
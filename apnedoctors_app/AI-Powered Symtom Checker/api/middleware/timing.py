@@ -0,0 +1,50 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Optional
+import logging
+import time
+from core.config import get_settings
+from core.metrics import HTTP_REQUEST_DURATION, bind_request_scope, reset_request_scope, route_label
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+class TimingMiddleware:
+    """Report how long the app took to produce each response.
+
+    Adds a Server-Timing header with the time to the response start,
+    records http_request_duration_seconds by route template and logs
+    requests whose full response took longer than SLOW_REQUEST_THRESHOLD
+    seconds. Also binds the request scope so stage timers deeper down
+    can label their observations with the route.
+    """
+
+    def __init__(self, app: ASGIApp, slow_threshold: Optional[float] = None):
+        self.app = app
+        self.slow_threshold = slow_threshold or settings.SLOW_REQUEST_THRESHOLD
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                MutableHeaders(scope=message).append("Server-Timing", f"app;dur={elapsed_ms:.1f}")
+            await send(message)
+
+        scope_token = bind_request_scope(scope)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            reset_request_scope(scope_token)
+            elapsed = time.perf_counter() - started
+            HTTP_REQUEST_DURATION.labels(route_label(scope), scope["method"], status or 500).observe(elapsed)
+            if elapsed > self.slow_threshold:
+                logger.warning(f"Slow request: {scope['method']} {scope['path']} -> {status} in {elapsed:.3f}s")
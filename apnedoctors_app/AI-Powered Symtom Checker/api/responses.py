@@ -0,0 +1,102 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from typing import Any, Callable, Dict, Optional, Sequence
+import hashlib
+from core.config import get_settings
+from core.metrics import route_label
+from core.response_cache import get_response_cache
+from utils.compression import negotiate_encoding
+from utils.serialization import dumps
+
+settings = get_settings()
+
+class FastJSONResponse(JSONResponse):
+    """orjson-backed JSON response.
+
+    Used as the app's default response class. Routes with large payloads
+    return it directly, which also skips FastAPI's jsonable_encoder pass;
+    ORM instances, Pydantic models and NumPy values can be passed as-is.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def make_etag(version: str) -> str:
+    """Weak ETag for a resource version; the same in every worker process"""
+    return 'W/"' + hashlib.sha1(version.encode()).hexdigest()[:20] + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison as If-None-Match requires"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+def _cache_headers(etag: Optional[str]) -> Dict[str, str]:
+    # Clients may keep the body but must revalidate it on every use
+    headers = {"Cache-Control": "private, no-cache", "Vary": "Accept-Encoding"}
+    if etag is not None:
+        headers["ETag"] = etag
+    return headers
+
+def cached_json_response(
+    request: Request,
+    tags: Sequence[str],
+    version: Callable[[], Optional[str]],
+    build: Callable[[], Any]
+) -> Response:
+    """JSON response with an ETag, served from the response cache when possible.
+
+    `version` is a cheap query identifying the resource's current state
+    (None if it does not exist); `build` runs the full query and returns
+    the payload. A request whose If-None-Match matches gets a 304 without
+    `build` being called, and a fresh cache entry is served without
+    calling either. Cached bodies keep their gzip/brotli variants.
+    """
+    cache = get_response_cache()
+    key = f"{request.url.path}?{request.url.query}"
+    tags = tuple(tags)
+
+    entry = cache.get(key)
+    result = "hit"
+    if entry is not None and cache.is_fresh(entry):
+        etag = entry.etag
+    else:
+        generation = cache.generation(tags)
+        current = version()
+        etag = make_etag(current) if current is not None else None
+        if entry is not None and entry.etag == etag:
+            cache.touch(entry)
+            result = "revalidated"
+        else:
+            entry = None
+            result = "miss"
+
+    headers = _cache_headers(etag)
+    if etag is not None and etag_matches(request.headers.get("if-none-match"), etag):
+        cache.record(route_label(), "not_modified")
+        return Response(status_code=304, headers=headers)
+
+    cache.record(route_label(), result)
+    if entry is None:
+        body = dumps(build())
+        if etag is not None:
+            entry = cache.put(key, body, etag, tags, generation)
+        if entry is None:
+            # Not cacheable; CompressionMiddleware still compresses it
+            return Response(body, media_type="application/json", headers=headers)
+
+    encoding = None
+    if len(entry.body) >= settings.COMPRESSION_MIN_SIZE:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    if encoding is None:
+        return Response(entry.body, media_type="application/json", headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(entry.encoded(encoding), media_type="application/json", headers=headers)
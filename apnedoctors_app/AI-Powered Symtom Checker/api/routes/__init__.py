@@ -1,7 +1,9 @@
 from fastapi import APIRouter
 from .diagnosis import router as diagnosis_router
 from .patients import router as patients_router
+from .reports import router as reports_router
 from .telemedicine import router as telemedicine_router
+from .wearables import router as wearables_router
 from .auth import router as auth_router
 
 # Create main router
@@ -26,11 +28,23 @@ main_router.include_router(
     tags=["patients"]
 )
 
+main_router.include_router(
+    reports_router,
+    prefix="/reports",
+    tags=["reports"]
+)
+
 main_router.include_router(
     telemedicine_router,
     prefix="/telemedicine",
     tags=["telemedicine"]
 )
 
+main_router.include_router(
+    wearables_router,
+    prefix="/wearables",
+    tags=["wearables"]
+)
+
 # Export the main router
 __all__ = ["main_router"]
\ No newline at end of file
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+from typing import Optional
+import hmac
+from api.responses import FastJSONResponse
+from core.config import get_settings
+from core.model_registry import get_model_registry
+from core.profiling import PROFILE_MODES, get_profiler
+
+settings = get_settings()
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Admin routes need X-Admin-Token; without ADMIN_TOKEN they don't exist"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.post("/profiles/arm")
+async def arm_profiler(count: int = 1, path_prefix: str = "/", mode: str = "cprofile"):
+    """Profile the next `count` requests under path_prefix"""
+    if mode not in PROFILE_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(PROFILE_MODES)}")
+    return FastJSONResponse(get_profiler().arm(count, path_prefix, mode))
+
+@router.get("/profiles")
+async def list_profiles():
+    """Stored profile artifacts, newest first"""
+    return FastJSONResponse(get_profiler().list_artifacts())
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str):
+    """Zip with meta.json, the Python profile and any torch traces"""
+    path = get_profiler().artifact_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/zip", filename=path.name)
+
+@router.get("/models")
+async def list_models():
+    """Served version and activation state of each registered model"""
+    return FastJSONResponse(get_model_registry().metrics())
+
+@router.get("/models/{name}")
+async def model_status(name: str):
+    """Version being served, available versions and the latest activation"""
+    try:
+        return FastJSONResponse(get_model_registry().status(name))
+    except (LookupError, ValueError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.post("/models/{name}/activate", status_code=202)
+async def activate_model(name: str, version: str):
+    """Load, warm up and swap in a model version in the background;
+    poll GET /models/{name} for the result"""
+    try:
+        activation = get_model_registry().activate(name, version)
+    except (LookupError, ValueError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return FastJSONResponse(activation, status_code=202)
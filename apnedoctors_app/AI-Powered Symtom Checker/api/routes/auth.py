@@ -1,8 +1,34 @@
-from fastapi import APIRouter, Depends
-from fastapi.security import OAuth2PasswordRequestForm
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer, OAuth2PasswordRequestForm
+from api.routes.admin import require_admin
+from core.password_hasher import get_password_hasher
+from core.security import SecurityHandler
+from core.token_cache import get_token_cache
 
 router = APIRouter()
+bearer = HTTPBearer()
 
 @router.post("/login")
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    return {"access_token": "dummy_token", "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": "dummy_token", "token_type": "bearer"}
+
+@router.post("/logout")
+async def logout(credentials: HTTPAuthorizationCredentials = Depends(bearer)):
+    """Revoke the presented token until it expires"""
+    if not SecurityHandler.revoke_token(credentials.credentials):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid token or expired token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return {"revoked": True}
+
+@router.get("/token-cache/stats", dependencies=[Depends(require_admin)])
+async def get_token_cache_stats():
+    """Hit ratio and size of the verified token cache"""
+    return get_token_cache().metrics()
+
+@router.get("/password-hasher/stats", dependencies=[Depends(require_admin)])
+async def get_password_hasher_stats():
+    """Queue depth, throttling and rehash counters of the password hasher"""
+    return get_password_hasher().metrics()
@@ -1,33 +1,60 @@
-from fastapi import APIRouter, Depends
-from typing import List, Dict
-from core.ai_models.symptom_extractor import SymptomExtractor
-from core.ai_models.disease_predictor import DiseasePredictor
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from typing import List, Dict, Optional
+from api.middleware.rate_limit import client_key
+from api.responses import FastJSONResponse
+from core.ai_models.symptom_extractor import SymptomExtractor, get_symptom_extractor
 from core.ai_models.medical_chatbot import MedicalChatbot
+from services.diagnosis_cascade import DiagnosisCascade, get_diagnosis_cascade
+from services.diagnosis_coalescing import IdempotencyConflict, InvalidIdempotencyKey, get_diagnosis_coalescer
 
 router = APIRouter()
 
 @router.post("/diagnose")
 async def create_diagnosis(
+    request: Request,
     text: str,
     patient_info: dict,
-    symptom_extractor: SymptomExtractor = Depends(),
-    disease_predictor: DiseasePredictor = Depends(),
+    idempotency_key: Optional[str] = Header(None),
+    symptom_extractor: SymptomExtractor = Depends(get_symptom_extractor),
+    cascade: DiagnosisCascade = Depends(get_diagnosis_cascade),
     medical_chatbot: MedicalChatbot = Depends()
 ):
-    # Extract symptoms
-    symptoms = await symptom_extractor.extract_symptoms(text)
-    
-    # Get potential diagnoses
-    diagnoses = await disease_predictor.predict_diseases(symptoms)
-    
-    # Get follow-up questions
-    follow_up = await medical_chatbot.get_follow_up_question(
-        symptoms,
-        patient_info
-    )
-    
-    return {
-        "symptoms": symptoms,
-        "potential_diagnoses": diagnoses,
-        "follow_up_question": follow_up
-    }
\ No newline at end of file
+    """Run the diagnosis pipeline once per distinct in-flight request.
+
+    Identical concurrent requests (double submits, retries) share one run.
+    With an Idempotency-Key the finished result is also replayed to
+    retries, marked by an Idempotent-Replayed header.
+    """
+    async def run_pipeline():
+        # Extract symptoms
+        symptoms = await symptom_extractor.extract_symptoms(text)
+
+        # Get potential diagnoses: the classifier, escalating to BioGPT when unsure
+        diagnosis = await cascade.diagnose(symptoms)
+
+        # Get follow-up questions
+        follow_up = await medical_chatbot.get_follow_up_question(
+            symptoms,
+            patient_info
+        )
+
+        return {
+            "symptoms": symptoms,
+            "potential_diagnoses": diagnosis["diagnoses"],
+            "diagnosis_model": diagnosis["model"],
+            "diagnosis_model_version": diagnosis["model_version"],
+            "escalation_reason": diagnosis["escalation_reason"],
+            "follow_up_question": follow_up
+        }
+
+    try:
+        result, replayed = await get_diagnosis_coalescer().diagnose(
+            text, patient_info, run_pipeline, client_key(request.scope), idempotency_key
+        )
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except InvalidIdempotencyKey as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    return FastJSONResponse(result, headers=headers)
@@ -1,7 +1,37 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+from typing import Optional
+from api.responses import cached_json_response
+from core.database import get_db
+from core.response_cache import patient_tag
+from services.patient_history_service import PatientHistoryService, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter()
 
 @router.get("/profile")
 async def get_patient_profile():
-    return {"message": "Patient profile endpoint"}
\ No newline at end of file
+    return {"message": "Patient profile endpoint"}
+
+@router.get("/{patient_id}/history")
+def get_patient_history(
+    request: Request,
+    patient_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Patient timeline with keyset-paginated diagnoses (pass next_cursor to continue).
+
+    Supports If-None-Match; unchanged timelines cost one aggregate query.
+    """
+    history_service = PatientHistoryService(db)
+    try:
+        return cached_json_response(
+            request,
+            [patient_tag(patient_id)],
+            version=lambda: history_service.history_version(patient_id),
+            build=lambda: history_service.get_history(patient_id, limit=limit, cursor=cursor)
+        )
+    except ValueError as e:
+        status_code = 404 if str(e) == "Patient not found" else 400
+        raise HTTPException(status_code=status_code, detail=str(e))
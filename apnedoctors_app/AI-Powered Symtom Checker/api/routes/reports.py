@@ -0,0 +1,89 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from api.middleware.auth import AuthHandler
+from api.responses import cached_json_response
+from datetime import date, datetime
+from typing import Optional
+from core.database import get_db
+from core.response_cache import REPORTS_TAG
+from models.db_models.diagnosis_terms import normalize_term
+from services.report_service import ReportService
+from services.export_service import DataExportService, EXPORT_FORMATS
+
+router = APIRouter()
+
+# Report GETs read only the rollups, so all of them share the rollup
+# checkpoint as their version and are dropped together when it advances
+def _report_response(request: Request, db: Session, build):
+    service = ReportService(db)
+    return cached_json_response(request, [REPORTS_TAG], version=service.version, build=lambda: build(service))
+
+@router.get("/conditions")
+def get_condition_totals(
+    request: Request,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """Most frequent conditions between start and end (inclusive)"""
+    return _report_response(request, db, lambda service: {"conditions": service.condition_totals(start, end, limit)})
+
+@router.get("/conditions/{condition}/daily")
+def get_condition_daily(
+    request: Request,
+    condition: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """Daily case counts for a single condition"""
+    condition = normalize_term(condition)
+    return _report_response(request, db, lambda service: {
+        "condition": condition,
+        "daily": service.condition_daily(condition, start, end)
+    })
+
+@router.get("/risk-levels")
+def get_risk_level_distribution(
+    request: Request,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """Diagnosis counts per risk level"""
+    return _report_response(request, db, lambda service: {"risk_levels": service.risk_level_distribution(start, end)})
+
+@router.get("/confidence")
+def get_confidence_summary(
+    request: Request,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """Average diagnosis confidence overall and per day"""
+    return _report_response(request, db, lambda service: service.confidence_summary(start, end))
+
+
+# Bulk patient data: needs a valid token even when AUTH_REQUIRED is off
+@router.get("/export/{table_name}", dependencies=[Depends(AuthHandler.get_current_user)])
+def export_table(
+    table_name: str,
+    export_format: str = Query("parquet", alias="format", regex="^(csv|parquet)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    patient_id: Optional[int] = None
+):
+    """Stream diagnoses or medical_records as Parquet or gzipped CSV"""
+    try:
+        chunks = DataExportService().export(table_name, export_format, start, end, patient_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    media_type, extension = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{table_name}.{extension}"'}
+    )
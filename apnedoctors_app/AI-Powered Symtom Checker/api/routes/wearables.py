@@ -0,0 +1,101 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+from api.responses import FastJSONResponse
+from datetime import datetime, timedelta
+from typing import Optional
+from core.config import get_settings
+from core.database import get_db
+from models.ai_models.vitals_anomaly import get_anomaly_detector
+from services.timeseries_store import TimeSeriesStore
+from services.vitals_ingestion import get_vitals_ingestor, METRIC_RANGES
+from services.wearable_service import WearableService, link_device
+from services.wearable_sync import get_sync_scheduler
+import asyncio
+from utils.serialization import loads
+
+settings = get_settings()
+
+router = APIRouter()
+
+@router.post("/samples", status_code=202)
+async def ingest_samples(request: Request):
+    """Accept batched wearable samples in columnar form:
+    {"series": [{"patient_id", "metric", "timestamps": [epoch seconds], "values": [...]}]}"""
+    # Parsed with orjson straight into lists; per-sample pydantic models are too slow here
+    try:
+        body = loads(await request.body())
+        series = body["series"]
+        if not isinstance(series, list):
+            raise ValueError("series must be a list")
+        # Off the loop: unseen patient ids are looked up in the database
+        result = await asyncio.to_thread(get_vitals_ingestor().ingest_batch, series)
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid sample batch: {str(e)}")
+
+    return FastJSONResponse(result, status_code=202)
+
+@router.get("/ingestion/stats")
+async def get_ingestion_stats():
+    """Counters of the vitals ingestion pipeline"""
+    ingestor = get_vitals_ingestor()
+    return FastJSONResponse({
+        **ingestor.stats,
+        "dropped": ingestor.dropped,
+        "metrics": sorted(METRIC_RANGES)
+    })
+
+@router.get("/{patient_id}/vitals/{metric}")
+def get_vitals_series(
+    patient_id: int,
+    metric: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution: str = Query("auto", regex="^(auto|raw|minute|hour|day)$"),
+    max_points: int = Query(settings.VITALS_MAX_POINTS, ge=10, le=10000),
+    db: Session = Depends(get_db)
+):
+    """Chart series for one metric (UTC times; defaults to the last 24 hours).
+    "auto" picks the finest tier that stays under max_points"""
+    if metric not in METRIC_RANGES:
+        raise HTTPException(status_code=404, detail=f"Unknown metric: {metric}")
+
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+
+    series = TimeSeriesStore(db).query(patient_id, metric, start, end, resolution, max_points)
+    return FastJSONResponse({"patient_id": patient_id, "metric": metric, **series})
+
+@router.post("/{patient_id}/devices/{device_type}", status_code=201)
+async def link_wearable_device(patient_id: int, device_type: str):
+    """Link a patient's wearable account so the scheduler syncs it"""
+    if device_type not in WearableService().supported_devices:
+        raise HTTPException(status_code=404, detail=f"Unsupported device type: {device_type}")
+
+    created = await asyncio.to_thread(link_device, patient_id, device_type)
+    return FastJSONResponse(
+        {"patient_id": patient_id, "device_type": device_type, "linked": True},
+        status_code=201 if created else 200
+    )
+
+@router.post("/{patient_id}/devices/{device_type}/sync")
+async def sync_wearable_device(patient_id: int, device_type: str):
+    """Pull new data from the provider now instead of waiting for the next round"""
+    service = WearableService()
+    if device_type not in service.supported_devices:
+        raise HTTPException(status_code=404, detail=f"Unsupported device type: {device_type}")
+
+    if not await service.sync_data(device_type, str(patient_id)):
+        raise HTTPException(status_code=502, detail=f"Sync from {device_type} failed")
+    return FastJSONResponse({"patient_id": patient_id, "device_type": device_type, "synced": True})
+
+@router.get("/sync/stats")
+async def get_sync_stats():
+    """Sync throughput, per-user lag and provider throttling"""
+    return FastJSONResponse(get_sync_scheduler().metrics())
+
+@router.get("/anomalies")
+async def get_active_anomalies():
+    """Patients whose vitals are currently flagged, most severe first"""
+    return FastJSONResponse({"anomalies": get_anomaly_detector().active_anomalies()})
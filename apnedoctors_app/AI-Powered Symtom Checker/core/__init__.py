@@ -3,12 +3,10 @@ from typing import Dict, Any
 import logging
 from dotenv import load_dotenv
 import os
+from .logging_config import setup_logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging (queue-backed, written by a background thread)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # Load environment variables
@@ -1,5 +1,8 @@
 from transformers import AutoTokenizer, AutoModelForCausalLM
 import torch
+import time
+from core.metrics import record_generation, stage_timer
+from core.profiling import model_trace
 
 class DiseasePredictor:
     def __init__(self):
@@ -10,19 +13,24 @@ class DiseasePredictor:
 
     async def predict_diseases(self, symptoms: list):
         prompt = f"Based on these symptoms: {', '.join(symptoms)}, the possible diagnoses are:"
-        inputs = self.tokenizer(
-            prompt,
-            return_tensors="pt",
-            max_length=512,
-            truncation=True
-        ).to(self.device)
+        with stage_timer("tokenize", "biogpt"):
+            inputs = self.tokenizer(
+                prompt,
+                return_tensors="pt",
+                max_length=512,
+                truncation=True
+            ).to(self.device)
         
-        outputs = self.model.generate(
-            **inputs,
-            max_length=200,
-            num_return_sequences=3,
-            temperature=0.7
-        )
+        started = time.perf_counter()
+        with stage_timer("generate", "biogpt"), model_trace("biogpt"):
+            outputs = self.model.generate(
+                **inputs,
+                max_length=200,
+                num_return_sequences=3,
+                temperature=0.7
+            )
+        new_tokens = (outputs.shape[1] - inputs["input_ids"].shape[1]) * outputs.shape[0]
+        record_generation("biogpt", outputs.shape[0], new_tokens, time.perf_counter() - started)
         
         diagnoses = [
             self.tokenizer.decode(output, skip_special_tokens=True)
@@ -1,5 +1,8 @@
 from transformers import AutoTokenizer, AutoModelForCausalLM
 import torch
+import time
+from core.metrics import record_generation, stage_timer
+from core.profiling import model_trace
 
 class MedicalChatbot:
     def __init__(self):
@@ -18,19 +21,24 @@ class MedicalChatbot:
         Based on these symptoms, what follow-up questions should I ask?
         """
         
-        inputs = self.tokenizer(
-            context,
-            return_tensors="pt",
-            max_length=512,
-            truncation=True
-        ).to(self.device)
+        with stage_timer("tokenize", "chatdoctor"):
+            inputs = self.tokenizer(
+                context,
+                return_tensors="pt",
+                max_length=512,
+                truncation=True
+            ).to(self.device)
         
-        outputs = self.model.generate(
-            **inputs,
-            max_length=150,
-            temperature=0.7,
-            num_return_sequences=1
-        )
+        started = time.perf_counter()
+        with stage_timer("generate", "chatdoctor"), model_trace("chatdoctor"):
+            outputs = self.model.generate(
+                **inputs,
+                max_length=150,
+                temperature=0.7,
+                num_return_sequences=1
+            )
+        new_tokens = (outputs.shape[1] - inputs["input_ids"].shape[1]) * outputs.shape[0]
+        record_generation("chatdoctor", outputs.shape[0], new_tokens, time.perf_counter() - started)
         
         question = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
         self.conversation_history.append({"role": "system", "content": question})
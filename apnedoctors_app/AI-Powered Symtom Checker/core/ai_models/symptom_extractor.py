@@ -1,5 +1,10 @@
 from transformers import AutoTokenizer, AutoModelForTokenClassification
+from typing import Dict, List, Optional, Tuple
+import threading
 import torch
+from core.metrics import stage_timer
+from core.profiling import model_trace
+from utils.batching import EncoderBatcher
 
 class SymptomExtractor:
     def __init__(self):
@@ -9,27 +14,44 @@ class SymptomExtractor:
         )
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.model.to(self.device)
+        self.batcher = EncoderBatcher(self.tokenizer, self._tag_batch)
+
+    def _tag_batch(self, inputs: Dict[str, torch.Tensor], lengths: List[int]) -> List[Tuple[List[int], List[int]]]:
+        """Token ids and predicted labels of each text in one length bucket, padding removed"""
+        inputs = {name: tensor.to(self.device) for name, tensor in inputs.items()}
+        with torch.no_grad():
+            predictions = torch.argmax(self.model(**inputs).logits, dim=2).cpu()
+        input_ids = inputs["input_ids"].cpu()
+        return [
+            (input_ids[row, :length].tolist(), predictions[row, :length].tolist())
+            for row, length in enumerate(lengths)
+        ]
 
     async def extract_symptoms(self, text: str):
-        inputs = self.tokenizer(
-            text,
-            return_tensors="pt",
-            truncation=True,
-            max_length=512
-        ).to(self.device)
-        
-        outputs = self.model(**inputs)
-        predictions = torch.argmax(outputs.logits, dim=2)
+        # Tokenized and tagged with concurrent requests of similar length
+        with stage_timer("forward", "biobert"), model_trace("biobert"):
+            input_ids, predictions = await self.batcher.submit(text)
         
-        tokens = self.tokenizer.convert_ids_to_tokens(inputs["input_ids"][0])
+        tokens = self.tokenizer.convert_ids_to_tokens(input_ids)
         symptoms = []
         
         current_symptom = []
-        for token, pred in zip(tokens, predictions[0]):
+        for token, pred in zip(tokens, predictions):
             if pred == 1:  # Symptom token
                 current_symptom.append(token)
             elif current_symptom:
                 symptoms.append(" ".join(current_symptom))
                 current_symptom = []
                 
-        return symptoms
\ No newline at end of file
+        return symptoms
+
+_extractor: Optional[SymptomExtractor] = None
+_extractor_lock = threading.Lock()
+
+def get_symptom_extractor() -> SymptomExtractor:
+    """Shared extractor, so concurrent requests land in the same batches"""
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            _extractor = SymptomExtractor()
+        return _extractor
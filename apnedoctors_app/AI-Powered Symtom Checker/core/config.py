@@ -14,14 +14,43 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "AI Symptom Checker"
     VERSION: str = "1.0.0"
     API_V1_STR: str = "/api/v1"
+    SLOW_REQUEST_THRESHOLD: float = 1.0  # seconds before a request is logged as slow
     
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_REQUIRED: bool = os.getenv("AUTH_REQUIRED", "false").lower() == "true"  # reject anonymous API calls
+    ADMIN_TOKEN: Optional[str] = os.getenv("ADMIN_TOKEN")  # X-Admin-Token for /api/v1/admin; unset disables it
+    TOKEN_CACHE_SIZE: int = 10000  # verified tokens kept in memory
+    TOKEN_CACHE_MAX_TTL: float = 300.0  # seconds, even if the token lives longer
+    TOKEN_REVOCATION_LIMIT: int = 100000  # revoked tokens remembered until they expire
+    BCRYPT_ROUNDS: int = 12  # weaker stored hashes are upgraded on login
+    PASSWORD_HASH_WORKERS: int = max(1, (os.cpu_count() or 2) // 2)
+    PASSWORD_HASH_MAX_PENDING: int = 256  # queued hash operations before rejecting
+    LOGIN_ATTEMPTS_PER_MINUTE: float = 5.0  # per account
+    LOGIN_ATTEMPT_BURST: float = 5.0
+    
+    # On-demand request profiling
+    PROFILING_TOKEN: Optional[str] = os.getenv("PROFILING_TOKEN")  # X-Profile header value; unset disables it
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_MAX_ARTIFACTS: int = 50
+    PROFILE_SAMPLE_INTERVAL: float = 0.005  # seconds between stack samples in "sample" mode
     
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL")
     
+    # Bulk diagnosis persistence
+    DIAGNOSIS_BATCH_SIZE: int = 500
+    DIAGNOSIS_FLUSH_INTERVAL: float = 1.0  # seconds
+    DIAGNOSIS_WRITE_DURABILITY: str = os.getenv("DIAGNOSIS_WRITE_DURABILITY", "strict")
+    
+    # Report rollups
+    REPORT_ROLLUP_INTERVAL: float = 60.0  # seconds between delta runs
+    REPORT_ROLLUP_BATCH_SIZE: int = 5000
+    
+    # Data export
+    EXPORT_BATCH_SIZE: int = 10000  # rows per streamed batch / Parquet row group
+    
     # AI Model Configuration
     MODEL_PATHS: Dict[str, str] = {
         "symptom_classifier": "models/trained/symptom_classifier",
@@ -29,6 +58,11 @@ class Settings(BaseSettings):
         "risk_assessment": "models/trained/risk_assessment"
     }
     
+    # Versioned model artifacts (<dir>/<name>/<version>/model.safetensors + manifest.json)
+    MODEL_REGISTRY_DIR: str = os.getenv("MODEL_REGISTRY_DIR", "models/trained")
+    MODEL_WARMUP_RUNS: int = 3  # predictions run on a new version before it is swapped in
+    MODEL_ACTIVE_POLL_INTERVAL: float = 5.0  # seconds between checks for activations made by other workers
+    
     # Model parameters
     MODEL_PARAMS: Dict[str, Dict[str, Any]] = {
         "symptom_classifier": {
@@ -43,13 +77,105 @@ class Settings(BaseSettings):
         }
     }
     
+    # Encoder micro-batching (BERT symptom models)
+    ENCODER_MAX_BATCH_SIZE: int = 32
+    ENCODER_MAX_BATCH_TOKENS: int = 8192  # padded tokens per forward pass
+    ENCODER_BATCH_WAIT: float = 0.005  # seconds to collect concurrent requests
+    ENCODER_PAD_MULTIPLE: int = 8  # round padded lengths for tensor-core kernels; 1 disables
+    
+    # Diagnosis model cascade (threshold: MODEL_PARAMS["diagnosis_model"]["confidence_threshold"])
+    CASCADE_MIN_COVERAGE: float = 1.0  # share of symptoms the classifier must know, else escalate
+    
     # External API endpoints
     MAYO_CLINIC_API: Optional[str] = os.getenv("MAYO_CLINIC_API")
     NIH_API: Optional[str] = os.getenv("NIH_API")
     WHO_API: Optional[str] = os.getenv("WHO_API")
     
+    # Shared HTTP client for external APIs
+    HTTP_POOL_SIZE: int = 100
+    HTTP_POOL_PER_HOST: int = 20
+    HTTP_KEEPALIVE_TIMEOUT: float = 30.0  # seconds
+    EXTERNAL_API_TIMEOUT: float = float(os.getenv("EXTERNAL_API_TIMEOUT", "5.0"))
+    EXTERNAL_API_CONNECT_TIMEOUT: float = 1.0
+    MEDICAL_API_HEDGE_PERCENTILE: float = 95.0
+    MEDICAL_API_HEDGE_DELAY: float = 0.5  # used until enough latency samples exist
+    
+    # Resilience for external dependencies
+    REQUEST_TIMEOUT: float = float(os.getenv("REQUEST_TIMEOUT", "10.0"))  # default per-request budget
+    EXTERNAL_API_MAX_RETRIES: int = 2
+    EXTERNAL_API_BACKOFF_BASE: float = 0.05  # seconds, doubled per attempt (full jitter)
+    EXTERNAL_API_BACKOFF_MAX: float = 1.0
+    EXTERNAL_API_MAX_RETRY_AFTER: float = 30.0  # longest 429 Retry-After waited out before giving up
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5  # consecutive failures before opening
+    CIRCUIT_BREAKER_RECOVERY_TIMEOUT: float = 30.0  # seconds before a half-open probe
+    
+    # Condition information cache
+    CONDITION_CACHE_PATH: str = os.getenv("CONDITION_CACHE_PATH", "data/condition_cache.sqlite")
+    CONDITION_CACHE_SIZE: int = 1024  # in-process LRU entries
+    CONDITION_CACHE_TTL: int = 7 * 24 * 3600  # seconds an entry stays fresh
+    CONDITION_CACHE_STALE_TTL: int = 30 * 24 * 3600  # served stale while refreshing
+    CONDITION_CACHE_NEGATIVE_TTL: int = 300  # empty upstream answers
+    CONDITION_CACHE_PREWARM_COUNT: int = 50  # top conditions loaded at startup
+    
+    # HTTP response cache and compression
+    RESPONSE_CACHE_SIZE: int = 2048  # cached GET responses
+    RESPONSE_CACHE_TTL: float = 10.0  # seconds served without checking the DB version
+    RESPONSE_CACHE_MAX_BODY: int = 1024 * 1024  # larger bodies are not cached
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes; smaller bodies are sent as-is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5  # used when the optional brotli package is installed
+    
+    # Diagnosis request coalescing
+    IDEMPOTENCY_KEY_TTL: float = 24 * 3600.0  # seconds a completed diagnosis is replayed for its key
+    IDEMPOTENCY_MAX_KEYS: int = 10000
+    
+    # Wearable vitals ingestion
+    VITALS_BUFFER_CAPACITY: int = 2048  # samples held per patient and metric
+    VITALS_FLUSH_INTERVAL: float = 10.0  # seconds between bulk flushes (one chunk per series and tier)
+    VITALS_FLUSH_HIGH_WATER: float = 0.5  # flush early once a buffer is this full
+    VITALS_BUFFER_IDLE_TIMEOUT: float = 600.0  # seconds an empty buffer is kept for its series
+    VITALS_PATIENT_CACHE_TTL: float = 300.0  # seconds a patient id is trusted without a lookup
+    VITALS_MAX_SAMPLE_AGE: int = 7 * 24 * 3600  # reject older samples (seconds)
+    VITALS_MAX_CLOCK_SKEW: int = 300  # reject samples this far in the future
+    VITALS_COMPACTION_INTERVAL: float = 3600.0  # seconds between chunk compaction passes
+    VITALS_COMPACTION_AGE: int = 3600  # only merge chunks older than this (seconds)
+    VITALS_COMPACTION_BATCH_SIZE: int = 5000  # candidate chunks read per compaction query
+    VITALS_MAX_POINTS: int = 1000  # default chart points for automatic tier selection
+    VITALS_ANOMALY_ALPHA: float = 0.05  # EWMA smoothing per sample
+    VITALS_ANOMALY_Z_THRESHOLD: float = 4.0  # EW standard deviations from the EWMA
+    VITALS_ANOMALY_WARMUP: int = 30  # samples before statistical flags are raised
+    VITALS_ANOMALY_WINDOW: float = 900.0  # seconds an anomaly stays a risk factor
+    VITALS_ANOMALY_QUANTILE_STEP: float = 0.05  # quantile estimate step, in EW std units
+    VITALS_ANOMALY_STORE_PATH: str = os.getenv("VITALS_ANOMALY_STORE_PATH", "data/vital_anomalies.sqlite")  # "" = per process
+    
+    # Wearable provider sync
+    APPLE_HEALTH_API: str = os.getenv("APPLE_HEALTH_API", "https://api.apple.com/health")
+    FITBIT_API: str = os.getenv("FITBIT_API", "https://api.fitbit.com/1")
+    GOOGLE_FIT_API: str = os.getenv("GOOGLE_FIT_API", "https://www.googleapis.com/fitness/v1")
+    WEARABLE_PROVIDER_RATE_LIMITS: Dict[str, Any] = {  # requests/second and burst per provider
+        "apple_health": {"rate": 20.0, "burst": 40},
+        "fitbit": {"rate": 5.0, "burst": 10},
+        "google_fit": {"rate": 10.0, "burst": 20}
+    }
+    WEARABLE_SYNC_INTERVAL: float = 300.0  # seconds between sync rounds
+    WEARABLE_SYNC_CONCURRENCY: int = 50  # users synced at once
+    WEARABLE_SYNC_PAGE_SIZE: int = 2000  # samples requested per page; capped at VITALS_BUFFER_CAPACITY
+    WEARABLE_SYNC_MAX_PAGES: int = 20  # per user per round; the rest waits for the next round
+    
     # API Rate limiting
-    RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_PER_MINUTE: int = 60  # tokens earned per client per minute
+    RATE_LIMIT_BURST: float = 60.0
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory, sqlite or redis
+    RATE_LIMIT_SQLITE_PATH: str = os.getenv("RATE_LIMIT_SQLITE_PATH", "/tmp/rate_limits.sqlite3")
+    RATE_LIMIT_REDIS_URL: str = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+    RATE_LIMIT_ROUTE_COSTS: Dict[str, float] = {  # tokens per request, longest prefix wins
+        "/api/v1/diagnosis/diagnose": 10.0,
+        "/api/v1/reports/export": 10.0,
+        "/health": 0.1,
+        "/metrics": 0.0,
+        "/docs": 0.0,
+        "/openapi.json": 0.0
+    }
     
     # Telemedicine settings
     VIDEO_CALL_PROVIDER: str = os.getenv("VIDEO_CALL_PROVIDER", "twilio")
@@ -62,7 +188,10 @@ class Settings(BaseSettings):
     
     # Logging configuration
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
-    LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"  # text mode only
+    LOG_JSON: bool = os.getenv("LOG_JSON", "true").lower() == "true"  # one JSON object per line
+    LOG_QUEUE_SIZE: int = 10000  # records buffered for the writer thread before dropping
+    LOG_DEDUP_WINDOW: float = 10.0  # seconds identical warnings/errors are collapsed
     
     class Config:
         case_sensitive = True
@@ -0,0 +1,170 @@
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from core.config import get_settings
+
+settings = get_settings()
+
+# Id of the request being handled, set by RequestIdMiddleware
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+def get_request_id() -> Optional[str]:
+    return request_id_var.get()
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line; tracebacks are formatted here, on the writer thread"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "module": record.module,
+            "line": record.lineno,
+            "thread": record.threadName
+        }
+        if getattr(record, "repeated", 0):
+            entry["repeated"] = record.repeated
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+class TextFormatter(logging.Formatter):
+    """LOG_FORMAT with the request id and repeat count appended when present"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            line = f"{line} [request_id={request_id}]"
+        if getattr(record, "repeated", 0):
+            line = f"{line} (repeated {record.repeated} times)"
+        return line
+
+class DuplicateFilter(logging.Filter):
+    """Collapse identical warnings/errors within `window` seconds.
+
+    The first occurrence goes through; repeats are dropped and counted, and
+    the next occurrence after the window reports how many were dropped.
+    """
+
+    def __init__(self, window: float, level: int = logging.WARNING, max_keys: int = 10000):
+        super().__init__()
+        self.window = window
+        self.level = level
+        self.max_keys = max_keys
+        self._seen: Dict[Tuple[str, int, str], Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.level or self.window <= 0:
+            return True
+        key = (record.name, record.levelno, record.getMessage())
+        now = time.monotonic()
+        with self._lock:
+            first_seen, repeats = self._seen.get(key, (None, 0))
+            if first_seen is not None and now - first_seen < self.window:
+                self._seen[key] = (first_seen, repeats + 1)
+                self.suppressed += 1
+                return False
+            if len(self._seen) >= self.max_keys:
+                self._seen.clear()
+            self._seen[key] = (now, 0)
+        record.repeated = repeats
+        return True
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the writer thread without formatting them.
+
+    Only the message arguments are merged (they may be mutated later) and
+    the request id captured (it lives in a context variable). Tracebacks
+    stay attached and are formatted by the listener. When the queue is full
+    records are dropped and counted rather than blocking the caller.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        record.request_id = request_id_var.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[NonBlockingQueueHandler] = None
+_stream_handler: Optional[logging.StreamHandler] = None
+_setup_lock = threading.Lock()
+
+def _formatter(json_format: bool) -> logging.Formatter:
+    return JSONFormatter() if json_format else TextFormatter(settings.LOG_FORMAT)
+
+def setup_logging(level: Optional[str] = None, json_format: Optional[bool] = None) -> None:
+    """Route all logging through one queue and a background writer thread.
+
+    The first call configures logging (importing `core` does this with
+    the settings' defaults); later calls only apply an explicitly given
+    level or format, e.g. plain text for command-line scripts.
+    """
+    global _listener, _handler, _stream_handler
+    with _setup_lock:
+        root = logging.getLogger()
+        if _listener is not None:
+            if json_format is not None:
+                _stream_handler.setFormatter(_formatter(json_format))
+            if level is not None:
+                root.setLevel(level)
+            return
+
+        _stream_handler = logging.StreamHandler(sys.stderr)
+        _stream_handler.setFormatter(_formatter(settings.LOG_JSON if json_format is None else json_format))
+
+        log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+        _handler = NonBlockingQueueHandler(log_queue)
+        _handler.addFilter(DuplicateFilter(settings.LOG_DEDUP_WINDOW))
+
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_handler)
+        root.setLevel(level or settings.LOG_LEVEL)
+
+        _listener = QueueListener(log_queue, _stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+def shutdown_logging() -> None:
+    """Write out queued records and stop the writer thread"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+def logging_stats() -> Dict[str, int]:
+    """Records dropped because the queue was full or collapsed as duplicates"""
+    if _handler is None:
+        return {"dropped": 0, "suppressed_duplicates": 0, "queued": 0}
+    duplicates = sum(f.suppressed for f in _handler.filters if isinstance(f, DuplicateFilter))
+    return {"dropped": _handler.dropped, "suppressed_duplicates": duplicates, "queued": _handler.queue.qsize()}
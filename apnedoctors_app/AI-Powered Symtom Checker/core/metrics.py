@@ -0,0 +1,325 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import math
+import os
+import resource
+import threading
+import time
+
+# Latency buckets in seconds, from sub-millisecond lookups to long generations
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Starlette appends "; charset=utf-8" to text/* media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._unlabelled = self._new_child()
+
+    def labels(self, *values: Any, **kwargs: Any):
+        """The child for one combination of label values"""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> Iterator[Tuple[str, Tuple[str, ...], str, float]]:
+        raise NotImplementedError
+
+    @property
+    def family(self) -> str:
+        return self.name
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.family} {self.documentation}", f"# TYPE {self.family} {self.kind}"]
+        for suffix, values, extra, value in self._samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, values, extra)} {_format_value(value)}")
+        return lines
+
+    def _items(self):
+        if not self.labelnames:
+            return [((), self._unlabelled)]
+        return list(self._children.items())
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+class Counter(_Metric):
+    """Monotonically increasing count, exposed as <name>_total"""
+    kind = "counter"
+
+    @property
+    def family(self) -> str:
+        return self.name + "_total"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabelled.inc(amount)
+
+    def _samples(self):
+        for values, child in self._items():
+            yield "_total", values, "", child.value
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value: float) -> None:
+        self._unlabelled.set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabelled.inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._unlabelled.dec(amount)
+
+    def _samples(self):
+        for values, child in self._items():
+            yield "", values, "", child.value
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramValue(self.bounds)
+
+    def observe(self, value: float) -> None:
+        self._unlabelled.observe(value)
+
+    def _samples(self):
+        for values, child in self._items():
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.bounds + (math.inf,), counts):
+                cumulative += count
+                yield "_bucket", values, f'le="{_format_value(bound)}"', cumulative
+            yield "_sum", values, "", total
+            yield "_count", values, "", cumulative
+
+class MetricsRegistry:
+    """Holds the process's metrics and renders them in Prometheus text format.
+
+    Observations cost a dict lookup and a short lock, so instrumentation
+    stays on in production. Collectors run at scrape time for values that
+    are cheaper to read on demand (e.g. RSS).
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered with a different type or labels")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+_registry = MetricsRegistry()
+
+def get_registry() -> MetricsRegistry:
+    """Process-wide metrics registry"""
+    return _registry
+
+HTTP_REQUEST_DURATION = _registry.histogram(
+    "http_request_duration_seconds", "Time to complete an HTTP request", ("route", "method", "status")
+)
+STAGE_DURATION = _registry.histogram(
+    "stage_duration_seconds", "Time spent in one stage of request handling", ("route", "stage", "model")
+)
+GENERATION_TOKENS_PER_SECOND = _registry.histogram(
+    "generation_tokens_per_second", "New tokens per second of a generate() call", ("model",),
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+)
+GENERATION_BATCH_SIZE = _registry.histogram(
+    "generation_batch_size", "Sequences produced per generate() call", ("model",),
+    buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+GENERATED_TOKENS = _registry.counter("generated_tokens", "New tokens generated", ("model",))
+RESPONSE_CACHE_REQUESTS = _registry.counter(
+    "response_cache_requests", "Cacheable GETs by outcome (hit, revalidated, miss, not_modified)", ("route", "result")
+)
+DIAGNOSIS_INFERENCES_SAVED = _registry.counter(
+    "diagnosis_inferences_saved", "Diagnosis pipeline runs avoided (coalesced or idempotent_replay)", ("reason",)
+)
+DIAGNOSIS_CASCADE_DECISIONS = _registry.counter(
+    "diagnosis_cascade_decisions",
+    "Cascade outcomes: accepted by the classifier, or the reason for escalating to the generator",
+    ("outcome",)
+)
+MODEL_ACTIVATIONS = _registry.counter(
+    "model_activations", "Background model version activations by result (active, failed)", ("model", "result")
+)
+PROCESS_RSS = _registry.gauge("process_resident_memory_bytes", "Resident set size")
+PROCESS_CPU = _registry.counter("process_cpu_seconds", "User and system CPU time")
+
+# Scope of the request being handled, set by TimingMiddleware; the router
+# fills in the matched endpoint, which labels stages by route
+_request_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar("request_scope", default=None)
+_route_templates: Dict[Any, str] = {}
+
+def bind_request_scope(scope: Dict[str, Any]):
+    return _request_scope.set(scope)
+
+def reset_request_scope(token) -> None:
+    _request_scope.reset(token)
+
+def route_label(scope: Optional[Dict[str, Any]] = None) -> str:
+    """Path template of the route handling the request, e.g.
+    /api/v1/patients/{patient_id}; "" outside a request"""
+    scope = scope if scope is not None else _request_scope.get()
+    if scope is None:
+        return ""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    template = _route_templates.get(endpoint)
+    if template is None:
+        app = scope.get("app")
+        for candidate in getattr(app, "routes", ()):
+            if getattr(candidate, "endpoint", None) is endpoint:
+                template = candidate.path
+                break
+        template = _route_templates[endpoint] = template or "unmatched"
+    return template
+
+@contextmanager
+def stage_timer(stage: str, model: str = ""):
+    """Time a block into stage_duration_seconds for the current route.
+    `model` names the model (or upstream source) the stage runs."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_DURATION.labels(route_label(), stage, model).observe(time.perf_counter() - started)
+
+def record_generation(model: str, batch_size: int, new_tokens: int, seconds: float) -> None:
+    """Batch size and throughput of one generate() call"""
+    GENERATION_BATCH_SIZE.labels(model).observe(batch_size)
+    GENERATED_TOKENS.labels(model).inc(new_tokens)
+    if seconds > 0:
+        GENERATION_TOKENS_PER_SECOND.labels(model).observe(new_tokens / seconds)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def _collect_process() -> None:
+    try:
+        with open("/proc/self/statm") as statm:
+            PROCESS_RSS.set(int(statm.read().split()[1]) * _PAGE_SIZE)
+    except OSError:
+        # Peak rather than current RSS where /proc is unavailable (kB on Linux, bytes on macOS)
+        PROCESS_RSS.set(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # Read from the kernel rather than counted, so set the counter's value directly
+    PROCESS_CPU._unlabelled.set(usage.ru_utime + usage.ru_stime)
+
+_registry.add_collector(_collect_process)
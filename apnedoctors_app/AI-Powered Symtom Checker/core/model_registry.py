@@ -0,0 +1,386 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import torch.nn as nn
+from safetensors import safe_open
+from safetensors.torch import save_file
+from core.config import get_settings
+from core.metrics import MODEL_ACTIVATIONS
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+WEIGHTS_FILE = "model.safetensors"
+MANIFEST_FILE = "manifest.json"
+ACTIVE_FILE = "ACTIVE"
+_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$")
+
+# Architectures a manifest may name. Artifacts only ever carry tensors and
+# JSON, so loading one never imports or unpickles anything.
+ARCHITECTURES: Dict[str, Callable[[Dict[str, Any]], nn.Module]] = {}
+# Per-architecture manifest checks, run when publishing and when loading
+MANIFEST_VALIDATORS: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+
+def register_architecture(name: str, validate: Optional[Callable[[Dict[str, Any]], None]] = None):
+    """Decorator adding a `builder(config) -> nn.Module` to the allowlist.
+    `validate(manifest)` raises ValueError for manifests the model can't serve."""
+    def decorator(builder: Callable[[Dict[str, Any]], nn.Module]):
+        ARCHITECTURES[name] = builder
+        if validate is not None:
+            MANIFEST_VALIDATORS[name] = validate
+        return builder
+    return decorator
+
+def _validate_manifest(manifest: Dict[str, Any]) -> Callable[[Dict[str, Any]], nn.Module]:
+    """Builder for an allowlisted, valid manifest; ValueError otherwise"""
+    architecture = manifest.get("architecture")
+    builder = ARCHITECTURES.get(architecture)
+    if builder is None:
+        raise ValueError(f"architecture {architecture!r} is not allowlisted")
+    validate = MANIFEST_VALIDATORS.get(architecture)
+    if validate is not None:
+        validate(manifest)
+    return builder
+
+def _check_name(value: str, kind: str) -> str:
+    if not _NAME_PATTERN.match(value or ""):
+        raise ValueError(f"Invalid model {kind}: {value!r}")
+    return value
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _write_atomic(path: Path, data: str) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(data)
+    os.replace(tmp, path)
+
+class ModelArtifact:
+    """One version of a model on disk: <root>/<name>/<version>/ with
+    model.safetensors (a state dict) and manifest.json (architecture,
+    config, vocabulary, sha256 of the weights)."""
+
+    def __init__(self, name: str, version: str, path: Path, manifest: Dict[str, Any]):
+        self.name = name
+        self.version = version
+        self.path = path
+        self.manifest = manifest
+
+    @property
+    def weights_path(self) -> Path:
+        return self.path / WEIGHTS_FILE
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        return self.manifest.get("config", {})
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "architecture": self.manifest.get("architecture"),
+            "created": self.manifest.get("created"),
+            "size_bytes": self.weights_path.stat().st_size if self.weights_path.exists() else None
+        }
+
+    def build(self, device: str = "cpu") -> nn.Module:
+        """Instantiate the allowlisted architecture and load the weights
+        after checking them against the manifest's sha256.
+
+        safe_open memory-maps the file, so only the header is parsed up
+        front and each tensor is read when it is requested. On torch
+        versions with load_state_dict(assign=True) the parameters take
+        those tensors over instead of copying them into fresh storage.
+        """
+        try:
+            builder = _validate_manifest(self.manifest)
+        except ValueError as e:
+            raise ValueError(f"{self.name} {self.version}: {str(e)}")
+        if not self.manifest.get("sha256"):
+            raise ValueError(f"{self.name} {self.version}: manifest has no sha256 for the weights")
+        if _sha256(self.weights_path) != self.manifest["sha256"]:
+            raise ValueError(f"{self.name} {self.version}: weights do not match the manifest checksum")
+
+        module = builder(self.config)
+        with safe_open(str(self.weights_path), framework="pt", device="cpu") as f:
+            state_dict = {key: f.get_tensor(key) for key in f.keys()}
+        try:
+            module.load_state_dict(state_dict, strict=True, assign=True)
+        except TypeError:
+            module.load_state_dict(state_dict, strict=True)
+        module.to(device)
+        module.eval()
+        return module
+
+class _Slot:
+    """The instance of one model currently being served"""
+
+    def __init__(self, load: Callable[[ModelArtifact], Any], warmup: Optional[Callable[[Any], Awaitable[None]]]):
+        self.load = load
+        self.warmup = warmup
+        self.instance: Any = None
+        self.version: Optional[str] = None
+        self.listeners: List[Callable[[Any], None]] = []
+        self.activation: Optional[Dict[str, Any]] = None
+        self.lock = threading.Lock()
+
+class ModelRegistry:
+    """Versioned model artifacts under MODEL_REGISTRY_DIR, served with hot swap.
+
+    Listing versions only reads manifests, and a model is loaded the first
+    time it is asked for. activate() loads a version in a worker thread,
+    warms it up and then replaces the served instance in one assignment:
+    requests already holding the old instance finish on it, new ones get
+    the new one, and the old instance is freed when the last of them
+    drops it. The active version is recorded in <name>/ACTIVE so a
+    restart serves the same one; without it the newest version is used.
+
+    The swap happens in the worker process that handled activate(). Every
+    worker runs run_model_watch_job, which notices a changed ACTIVE within
+    MODEL_ACTIVE_POLL_INTERVAL and activates that version locally; until
+    then status() reports the worker as out of sync.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or settings.MODEL_REGISTRY_DIR)
+        self._slots: Dict[str, _Slot] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def register(
+        self,
+        name: str,
+        load: Callable[[ModelArtifact], Any],
+        warmup: Optional[Callable[[Any], Awaitable[None]]] = None
+    ) -> None:
+        """How to turn an artifact of `name` into a servable instance and
+        exercise it before it takes traffic"""
+        self._slots[_check_name(name, "name")] = _Slot(load, warmup)
+
+    def on_activate(self, name: str, listener: Callable[[Any], None]) -> None:
+        """Call listener(instance) whenever a new version of `name` is swapped in"""
+        self._slot(name).listeners.append(listener)
+
+    def _slot(self, name: str) -> _Slot:
+        slot = self._slots.get(name)
+        if slot is None:
+            raise LookupError(f"No loader registered for model {name!r}")
+        return slot
+
+    def versions(self, name: str) -> List[ModelArtifact]:
+        """Artifacts of a model, oldest first"""
+        directory = self.root / _check_name(name, "name")
+        if not directory.is_dir():
+            return []
+        artifacts = []
+        for path in directory.iterdir():
+            if (path / MANIFEST_FILE).is_file() and _NAME_PATTERN.match(path.name):
+                try:
+                    artifacts.append(self.artifact(name, path.name))
+                except ValueError as e:
+                    logger.error(f"Skipping model artifact {path}: {str(e)}")
+        return sorted(artifacts, key=lambda a: (a.manifest.get("created") or "", a.version))
+
+    def artifact(self, name: str, version: str) -> ModelArtifact:
+        path = self.root / _check_name(name, "name") / _check_name(version, "version")
+        try:
+            manifest = json.loads((path / MANIFEST_FILE).read_text())
+        except FileNotFoundError:
+            raise LookupError(f"Model {name} has no version {version}")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Unreadable manifest: {str(e)}")
+        if not (path / WEIGHTS_FILE).is_file():
+            raise ValueError(f"{name} {version} has no {WEIGHTS_FILE}")
+        return ModelArtifact(name, version, path, manifest)
+
+    def recorded_version(self, name: str) -> Optional[str]:
+        """Version written to ACTIVE by the last successful activation, if any"""
+        try:
+            return (self.root / _check_name(name, "name") / ACTIVE_FILE).read_text().strip()
+        except OSError:
+            return None
+
+    def active_version(self, name: str) -> Optional[str]:
+        """Recorded active version, else the newest one"""
+        recorded = self.recorded_version(name)
+        if recorded is not None:
+            return recorded
+        artifacts = self.versions(name)
+        return artifacts[-1].version if artifacts else None
+
+    def publish(
+        self,
+        name: str,
+        version: str,
+        state_dict: Dict[str, Any],
+        architecture: str,
+        config: Dict[str, Any],
+        **extra: Any
+    ) -> ModelArtifact:
+        """Write a state dict and manifest as a new version.
+        Extra keyword arguments (e.g. vocabulary) go into the manifest."""
+        path = self.root / _check_name(name, "name") / _check_name(version, "version")
+        if path.exists():
+            raise ValueError(f"{name} {version} already exists")
+        manifest = {
+            "name": name,
+            "version": version,
+            "architecture": architecture,
+            "config": config,
+            "created": datetime.utcnow().isoformat(),
+            **extra
+        }
+
+        # Validates the manifest and state dict before anything is written
+        _validate_manifest(manifest)(config).load_state_dict(state_dict, strict=True)
+        path.mkdir(parents=True)
+        tensors = {key: tensor.detach().cpu().contiguous() for key, tensor in state_dict.items()}
+        save_file(tensors, str(path / WEIGHTS_FILE))
+        manifest["sha256"] = _sha256(path / WEIGHTS_FILE)
+        _write_atomic(path / MANIFEST_FILE, json.dumps(manifest, indent=2))
+        return ModelArtifact(name, version, path, manifest)
+
+    def current(self, name: str) -> Any:
+        """The instance being served, loading the active version on first use.
+        Callers should take it once per request and use that reference throughout."""
+        slot = self._slot(name)
+        if slot.instance is None:
+            with slot.lock:
+                if slot.instance is None:
+                    version = self.active_version(name)
+                    if version is None:
+                        raise LookupError(f"Model {name} has no versions in {self.root / name}")
+                    instance = slot.load(self.artifact(name, version))
+                    # An activation may have swapped a version in while this one loaded
+                    if slot.instance is None:
+                        slot.instance, slot.version = instance, version
+                        logger.info(f"Loaded model {name} version {version}")
+        return slot.instance
+
+    def activate(self, name: str, version: str, record: bool = True) -> Dict[str, Any]:
+        """Start loading `version` in the background; returns the activation status.
+        With `record`, a successful swap is written to ACTIVE for the other
+        workers. Raises LookupError for an unknown model or version and
+        RuntimeError if an activation of this model is already running."""
+        slot = self._slot(name)
+        artifact = self.artifact(name, version)
+        if slot.activation is not None and slot.activation["state"] in ("loading", "warming"):
+            raise RuntimeError(f"Version {slot.activation['version']} of {name} is still being activated")
+
+        slot.activation = {"version": version, "state": "loading", "started": time.time(), "error": None}
+        task = asyncio.get_running_loop().create_task(self._activate(name, slot, artifact, slot.activation, record))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return dict(slot.activation)
+
+    async def _activate(
+        self,
+        name: str,
+        slot: _Slot,
+        artifact: ModelArtifact,
+        status: Dict[str, Any],
+        record: bool
+    ) -> None:
+        started = time.perf_counter()
+        try:
+            instance = await asyncio.to_thread(slot.load, artifact)
+            status["state"] = "warming"
+            if slot.warmup is not None:
+                await slot.warmup(instance)
+        except Exception as e:
+            logger.error(f"Activating {name} {artifact.version} failed, still serving {slot.version}: {str(e)}")
+            status.update(state="failed", error=str(e))
+            MODEL_ACTIVATIONS.labels(name, "failed").inc()
+            return
+
+        # The swap itself: one assignment on the event loop, nothing awaited in between
+        previous = slot.version
+        slot.instance, slot.version = instance, artifact.version
+        for listener in slot.listeners:
+            listener(instance)
+        if record:
+            try:
+                _write_atomic(self.root / name / ACTIVE_FILE, artifact.version)
+            except OSError as e:
+                logger.error(f"Could not record {name} {artifact.version} as active: {str(e)}")
+        status.update(state="active", seconds=round(time.perf_counter() - started, 3))
+        MODEL_ACTIVATIONS.labels(name, "active").inc()
+        logger.info(f"Swapped model {name} from {previous} to {artifact.version}")
+
+    def sync_active(self) -> List[str]:
+        """Activate, in this worker, versions another worker recorded in ACTIVE.
+        Only models already loaded here are considered, and a version that
+        failed to activate here is not retried until ACTIVE changes again."""
+        started = []
+        for name, slot in self._slots.items():
+            if slot.version is None:
+                continue
+            activation = slot.activation
+            if activation is not None and activation["state"] in ("loading", "warming"):
+                continue
+            version = self.recorded_version(name)
+            if version is None or version == slot.version:
+                continue
+            if activation is not None and activation["version"] == version and activation["state"] == "failed":
+                continue
+            try:
+                self.activate(name, version, record=False)
+                started.append(name)
+                logger.info(f"Model {name} was activated as {version} elsewhere; activating here")
+            except (LookupError, ValueError, RuntimeError) as e:
+                logger.error(f"Cannot follow {name} to {version}: {str(e)}")
+                slot.activation = {"version": version, "state": "failed", "started": time.time(), "error": str(e)}
+        return started
+
+    def status(self, name: str) -> Dict[str, Any]:
+        slot = self._slot(name)
+        recorded = self.recorded_version(name)
+        return {
+            "name": name,
+            "pid": os.getpid(),
+            "serving": slot.version,
+            "active_version": self.active_version(name),
+            # This worker has not caught up with an activation made elsewhere yet
+            "out_of_sync": slot.version is not None and recorded is not None and slot.version != recorded,
+            "activation": dict(slot.activation) if slot.activation else None,
+            "versions": [artifact.summary() for artifact in self.versions(name)]
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "serving": slot.version,
+                "active_version": self.active_version(name),
+                "activation": slot.activation["state"] if slot.activation else None
+            }
+            for name, slot in self._slots.items()
+        }
+
+_registry: Optional[ModelRegistry] = None
+
+def get_model_registry() -> ModelRegistry:
+    """Process-wide model registry"""
+    global _registry
+    if _registry is None:
+        _registry = ModelRegistry()
+    return _registry
+
+async def run_model_watch_job(interval: Optional[float] = None) -> None:
+    """Follow activations made by other workers until cancelled"""
+    interval = interval or settings.MODEL_ACTIVE_POLL_INTERVAL
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            get_model_registry().sync_active()
+        except Exception as e:
+            logger.error(f"Model watch job failed: {str(e)}")
@@ -0,0 +1,158 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from passlib.context import CryptContext
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+import atexit
+import threading
+from core.config import get_settings
+from utils.token_bucket import TokenBucket
+
+settings = get_settings()
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hash operations are already queued"""
+
+class LoginThrottled(Exception):
+    """Raised when an account has used up its login attempts"""
+
+    def __init__(self, account: str, retry_after: float):
+        super().__init__(f"Too many login attempts for {account}")
+        self.account = account
+        self.retry_after = retry_after
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop in a small dedicated thread pool.
+
+    bcrypt releases the GIL, so `workers` threads use up to that many
+    cores while the event loop keeps serving other requests. At most
+    `max_pending` operations may be queued or running; beyond that callers
+    get PasswordHasherBusy instead of piling up behind a login storm. Each
+    account has a token bucket of login attempts, checked before any bcrypt
+    work is spent on it. Only full buckets are evicted to make room, so an
+    attacker can't reset a throttled account by flooding others; if every
+    tracked account is mid-throttle, new accounts are throttled too. Hashes
+    weaker than BCRYPT_ROUNDS are upgraded on the next successful login.
+    """
+
+    def __init__(
+        self,
+        rounds: Optional[int] = None,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        attempts_per_minute: Optional[float] = None,
+        attempt_burst: Optional[float] = None,
+        max_accounts: int = 100000
+    ):
+        self.rounds = rounds or settings.BCRYPT_ROUNDS
+        self.workers = workers or settings.PASSWORD_HASH_WORKERS
+        self.max_pending = max_pending or settings.PASSWORD_HASH_MAX_PENDING
+        self.attempt_rate = (attempts_per_minute or settings.LOGIN_ATTEMPTS_PER_MINUTE) / 60.0
+        self.attempt_burst = attempt_burst or settings.LOGIN_ATTEMPT_BURST
+        self.max_accounts = max_accounts
+
+        # min_rounds makes passlib flag weaker hashes for an update
+        self.context = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=self.rounds,
+            bcrypt__min_rounds=self.rounds
+        )
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hasher")
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._attempts: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.stats = {"hashes": 0, "verifications": 0, "failures": 0, "rehashes": 0, "rejected_busy": 0, "throttled": 0}
+        atexit.register(self.close)
+
+    async def hash(self, password: str) -> str:
+        """bcrypt hash at the configured cost"""
+        hashed = await self._run(self.context.hash, password)
+        self.stats["hashes"] += 1
+        return hashed
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        """Check a password without touching the attempt limits"""
+        valid = await self._run(self.context.verify, password, hashed)
+        self.stats["verifications"] += 1
+        if not valid:
+            self.stats["failures"] += 1
+        return valid
+
+    async def verify_and_update(self, account: str, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Login check for an account: (valid, new_hash). new_hash is set when
+        the stored hash should be replaced with one at the configured cost.
+        Raises LoginThrottled once the account is out of attempts."""
+        self.check_attempt(account)
+        valid, new_hash = await self._run(self.context.verify_and_update, password, hashed)
+        self.stats["verifications"] += 1
+        if not valid:
+            self.stats["failures"] += 1
+        elif new_hash is not None:
+            self.stats["rehashes"] += 1
+        return valid, new_hash
+
+    def check_attempt(self, account: str) -> None:
+        """Spend one login attempt for the account or raise LoginThrottled"""
+        with self._lock:
+            bucket = self._attempts.get(account)
+            if bucket is None:
+                wait = self._make_room()
+                if wait:
+                    self.stats["throttled"] += 1
+                    raise LoginThrottled(account, wait)
+                bucket = self._attempts[account] = TokenBucket(self.attempt_rate, self.attempt_burst)
+            self._attempts.move_to_end(account)
+
+        wait = bucket.try_acquire()
+        if wait:
+            self.stats["throttled"] += 1
+            raise LoginThrottled(account, wait)
+
+    def _make_room(self) -> float:
+        """Evict least recently used buckets that have fully refilled (they
+        hold no state) until a new one fits; returns 0.0, or the seconds
+        until the oldest bucket refills if it hasn't yet. Caller holds _lock."""
+        while len(self._attempts) >= self.max_accounts:
+            oldest = next(iter(self._attempts.values()))
+            missing = self.attempt_burst - oldest.tokens
+            if missing > 0:
+                return missing / self.attempt_rate
+            self._attempts.popitem(last=False)
+        return 0.0
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "pending": self._pending,
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "tracked_accounts": len(self._attempts)
+        }
+
+    async def _run(self, func: Callable, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.stats["rejected_busy"] += 1
+                raise PasswordHasherBusy(f"{self._pending} password hash operations pending")
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+_hasher: Optional[PasswordHasher] = None
+_hasher_lock = threading.Lock()
+
+def get_password_hasher() -> PasswordHasher:
+    """Process-wide password hasher"""
+    global _hasher
+    with _hasher_lock:
+        if _hasher is None:
+            _hasher = PasswordHasher()
+        return _hasher
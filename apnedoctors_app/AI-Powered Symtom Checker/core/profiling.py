@@ -0,0 +1,245 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import cProfile
+import io
+import json
+import logging
+import pstats
+import shutil
+import sys
+import threading
+import time
+import uuid
+import zipfile
+from core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("cprofile", "sample")
+
+class RequestProfile:
+    """Profile of a single request: Python side plus torch traces of model calls.
+
+    "cprofile" records every Python call on the event loop thread while
+    the request runs. "sample" records the stacks of all threads every
+    `interval` seconds instead, which is cheaper for long generations and
+    also sees work handed to executor threads. Other requests interleaved
+    on the loop show up in either mode.
+    """
+
+    def __init__(self, profile_id: str, workdir: Path, method: str, path: str, mode: str, interval: float):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unsupported profile mode: {mode}")
+        self.profile_id = profile_id
+        self.workdir = workdir
+        self.method = method
+        self.path = path
+        self.mode = mode
+        self.interval = interval
+        self.status: Optional[int] = None
+        self.model_traces = 0
+        self._profiler: Optional[cProfile.Profile] = None
+        self._stacks: Counter = Counter()
+        self._sampling = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._started = 0.0
+        self.duration = 0.0
+
+    def start(self) -> None:
+        self.workdir.mkdir(parents=True, exist_ok=True)
+        self._started = time.perf_counter()
+        if self.mode == "cprofile":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._sampler = threading.Thread(target=self._sample, name=f"profile-{self.profile_id}", daemon=True)
+            self._sampler.start()
+
+    def stop(self) -> None:
+        self.duration = time.perf_counter() - self._started
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self._sampler is not None:
+            self._sampling.set()
+            self._sampler.join()
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        while not self._sampling.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_filename}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self._stacks[";".join(reversed(stack))] += 1
+
+    def write_python_profile(self) -> None:
+        """pstats dump plus a readable summary, or folded stacks for flame graphs"""
+        if self._profiler is not None:
+            self._profiler.dump_stats(str(self.workdir / "python.prof"))
+            summary = io.StringIO()
+            pstats.Stats(self._profiler, stream=summary).sort_stats("cumulative").print_stats(50)
+            (self.workdir / "python.txt").write_text(summary.getvalue())
+        else:
+            (self.workdir / "stacks.folded").write_text(
+                "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+            )
+
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            "id": self.profile_id,
+            "method": self.method,
+            "path": self.path,
+            "mode": self.mode,
+            "status": self.status,
+            "duration": self.duration,
+            "model_traces": self.model_traces,
+            "created": datetime.utcnow().isoformat()
+        }
+
+# Profile of the request being handled, if it is being profiled
+_active_profile: ContextVar[Optional[RequestProfile]] = ContextVar("active_profile", default=None)
+
+@contextmanager
+def model_trace(model: str):
+    """torch.profiler trace of a model call, written into the active request
+    profile; a single context variable lookup when nothing is profiled"""
+    profile = _active_profile.get()
+    if profile is None:
+        yield
+        return
+
+    from torch.profiler import ProfilerActivity, profile as torch_profile
+    import torch
+
+    activities = [ProfilerActivity.CPU]
+    if torch.cuda.is_available():
+        activities.append(ProfilerActivity.CUDA)
+
+    profile.model_traces += 1
+    trace_path = profile.workdir / f"torch_{profile.model_traces:02d}_{model}.json"
+    with torch_profile(activities=activities, record_shapes=True, with_stack=False) as trace:
+        yield
+    trace.export_chrome_trace(str(trace_path))
+
+class RequestProfiler:
+    """Starts, stores and lists request profiles.
+
+    Only one request is profiled at a time (cProfile cannot nest); others
+    run unprofiled. Each finished profile is stored as
+    PROFILE_DIR/<id>.zip, keeping the newest PROFILE_MAX_ARTIFACTS.
+    Besides the X-Profile header, an admin can arm the profiler for the
+    next N requests under a path prefix.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_artifacts: Optional[int] = None):
+        self.directory = Path(directory or settings.PROFILE_DIR)
+        self.max_artifacts = max_artifacts or settings.PROFILE_MAX_ARTIFACTS
+        self._busy = threading.Lock()
+        self._arm_lock = threading.Lock()
+        self._armed: Dict[str, Any] = {"remaining": 0, "path_prefix": "/", "mode": "cprofile"}
+
+    @property
+    def armed(self) -> bool:
+        return self._armed["remaining"] > 0
+
+    def arm(self, count: int, path_prefix: str = "/", mode: str = "cprofile") -> Dict[str, Any]:
+        """Profile the next `count` requests whose path starts with path_prefix"""
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unsupported profile mode: {mode}")
+        with self._arm_lock:
+            self._armed = {"remaining": max(0, count), "path_prefix": path_prefix, "mode": mode}
+            return dict(self._armed)
+
+    def take_armed(self, path: str) -> Optional[str]:
+        """Mode to profile this request with if the profiler is armed for it"""
+        with self._arm_lock:
+            if self._armed["remaining"] > 0 and path.startswith(self._armed["path_prefix"]):
+                self._armed["remaining"] -= 1
+                return self._armed["mode"]
+        return None
+
+    def start(self, method: str, path: str, mode: str = "cprofile") -> Optional[RequestProfile]:
+        """Begin profiling a request; None if another profile is running"""
+        if not self._busy.acquire(blocking=False):
+            return None
+        try:
+            profile_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+            profile = RequestProfile(
+                profile_id, self.directory / profile_id, method, path, mode, settings.PROFILE_SAMPLE_INTERVAL
+            )
+            profile.start()
+        except Exception:
+            self._busy.release()
+            raise
+        return profile
+
+    def activate(self, profile: RequestProfile):
+        return _active_profile.set(profile)
+
+    def finish(self, profile: RequestProfile, token) -> None:
+        """Stop profiling; call save() afterwards, ideally off the event loop"""
+        _active_profile.reset(token)
+        try:
+            profile.stop()
+        finally:
+            self._busy.release()
+
+    def save(self, profile: RequestProfile) -> Path:
+        """Bundle the profile's files into <id>.zip and prune old artifacts"""
+        try:
+            profile.write_python_profile()
+            (profile.workdir / "meta.json").write_text(json.dumps(profile.metadata(), indent=2))
+            artifact = self.directory / f"{profile.profile_id}.zip"
+            with zipfile.ZipFile(artifact, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+                for path in sorted(profile.workdir.iterdir()):
+                    bundle.write(path, path.name)
+            self._prune()
+            logger.info(f"Saved profile {profile.profile_id} of {profile.method} {profile.path} ({profile.duration:.3f}s)")
+            return artifact
+        finally:
+            shutil.rmtree(profile.workdir, ignore_errors=True)
+
+    def list_artifacts(self) -> List[Dict[str, Any]]:
+        if not self.directory.exists():
+            return []
+        artifacts = sorted(self.directory.glob("*.zip"), key=lambda path: path.stat().st_mtime, reverse=True)
+        return [
+            {
+                "id": path.stem,
+                "size": path.stat().st_size,
+                "created": datetime.utcfromtimestamp(path.stat().st_mtime).isoformat()
+            }
+            for path in artifacts
+        ]
+
+    def artifact_path(self, profile_id: str) -> Optional[Path]:
+        path = self.directory / f"{profile_id}.zip"
+        # Ids come from URLs; never leave the profile directory
+        if path.parent != self.directory or not path.is_file():
+            return None
+        return path
+
+    def _prune(self) -> None:
+        artifacts = sorted(self.directory.glob("*.zip"), key=lambda path: path.stat().st_mtime)
+        for path in artifacts[:max(0, len(artifacts) - self.max_artifacts)]:
+            path.unlink(missing_ok=True)
+
+_profiler: Optional[RequestProfiler] = None
+
+def get_profiler() -> RequestProfiler:
+    """Process-wide request profiler"""
+    global _profiler
+    if _profiler is None:
+        _profiler = RequestProfiler()
+    return _profiler
@@ -0,0 +1,230 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from core.config import get_settings
+from utils.token_bucket import TokenBucket
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+class RateLimitBackend:
+    """Storage for per-key token buckets.
+
+    acquire() takes `cost` tokens from the bucket of `key` if it holds
+    enough and returns 0.0; otherwise nothing is taken and it returns the
+    seconds until the tokens will be there.
+    """
+
+    async def acquire(self, key: str, cost: float, rate: float, capacity: float) -> float:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+class MemoryBackend(RateLimitBackend):
+    """Buckets in this process only; each worker enforces its own limit"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def acquire(self, key: str, cost: float, rate: float, capacity: float) -> float:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(rate, capacity)
+                # Evicting the least recently seen key only forgets a bucket
+                # that has most likely refilled already
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            self._buckets.move_to_end(key)
+        return bucket.try_acquire(cost)
+
+class SQLiteBackend(RateLimitBackend):
+    """Buckets in a local SQLite file shared by all workers on one host.
+
+    Each acquire is a single BEGIN IMMEDIATE transaction, so concurrent
+    workers serialize on the file lock. Wall-clock time is used because
+    monotonic clocks are not comparable across processes. Calls run in a
+    worker thread to keep lock waits off the event loop.
+    """
+
+    PRUNE_EVERY = 10000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._calls = 0
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+            "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _acquire(self, key: str, cost: float, rate: float, capacity: float) -> float:
+        connection = self._connect()
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + max(0.0, now - row[1]) * rate)
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / rate
+            connection.execute(
+                "INSERT INTO rate_limit_buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                (key, tokens, now)
+            )
+
+            self._calls += 1
+            if self._calls % self.PRUNE_EVERY == 0:
+                # Buckets idle long enough to be full again carry no state
+                connection.execute(
+                    "DELETE FROM rate_limit_buckets WHERE updated < ?", (now - capacity / rate,)
+                )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return wait
+
+    async def acquire(self, key: str, cost: float, rate: float, capacity: float) -> float:
+        return await asyncio.to_thread(self._acquire, key, cost, rate, capacity)
+
+# Refill, take and store in one round trip; Redis' own clock keeps every
+# worker on the same time base
+_REDIS_TOKEN_BUCKET = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1])
+local updated = tonumber(state[2])
+if tokens == nil then
+    tokens = capacity
+    updated = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(wait)
+"""
+
+class RedisBackend(RateLimitBackend):
+    """Buckets in Redis (or a compatible server), shared by every worker and host.
+
+    Requires the optional `redis` package (4.2+ for redis.asyncio).
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        try:
+            import redis.asyncio as aioredis
+        except ImportError:
+            raise RuntimeError("The redis rate limit backend requires the 'redis' package")
+        self.prefix = prefix
+        self._client = aioredis.from_url(url)
+        self._script = self._client.register_script(_REDIS_TOKEN_BUCKET)
+
+    async def acquire(self, key: str, cost: float, rate: float, capacity: float) -> float:
+        wait = await self._script(keys=[self.prefix + key], args=[rate, capacity, cost])
+        return float(wait)
+
+    async def close(self) -> None:
+        await self._client.close()
+
+class RateLimiter:
+    """Per-client token buckets with per-route costs.
+
+    Every client earns `per_minute` tokens a minute, up to `burst`.
+    A request costs the value of the longest matching prefix in
+    `route_costs` (1 when none matches); a cost of 0 exempts the route.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[RateLimitBackend] = None,
+        per_minute: Optional[float] = None,
+        burst: Optional[float] = None,
+        route_costs: Optional[Dict[str, float]] = None
+    ):
+        self.backend = backend or MemoryBackend()
+        self.per_minute = per_minute or settings.RATE_LIMIT_PER_MINUTE
+        self.rate = self.per_minute / 60.0
+        self.burst = burst or settings.RATE_LIMIT_BURST
+        route_costs = settings.RATE_LIMIT_ROUTE_COSTS if route_costs is None else route_costs
+        self._prefixes = sorted(route_costs.items(), key=lambda item: len(item[0]), reverse=True)
+        self.stats = {"allowed": 0, "limited": 0, "backend_errors": 0}
+
+    def cost_for(self, path: str) -> float:
+        for prefix, cost in self._prefixes:
+            if path.startswith(prefix):
+                return cost
+        return 1.0
+
+    async def acquire(self, key: str, cost: float) -> float:
+        """Seconds the client must wait before this request is allowed (0.0 if now).
+        Fails open: a broken shared backend must not take the API down."""
+        try:
+            wait = await self.backend.acquire(key, min(cost, self.burst), self.rate, self.burst)
+        except Exception as e:
+            self.stats["backend_errors"] += 1
+            logger.error(f"Rate limit backend failed: {str(e)}")
+            return 0.0
+        self.stats["allowed" if wait <= 0 else "limited"] += 1
+        return wait
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "backend": type(self.backend).__name__,
+            "per_minute": self.per_minute,
+            "burst": self.burst
+        }
+
+def create_backend(name: Optional[str] = None) -> RateLimitBackend:
+    """Backend selected by RATE_LIMIT_BACKEND"""
+    name = name or settings.RATE_LIMIT_BACKEND
+    if name == "memory":
+        return MemoryBackend()
+    if name == "sqlite":
+        return SQLiteBackend(settings.RATE_LIMIT_SQLITE_PATH)
+    if name == "redis":
+        return RedisBackend(settings.RATE_LIMIT_REDIS_URL)
+    raise ValueError(f"Unsupported rate limit backend: {name}")
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide rate limiter"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(create_backend())
+        return _limiter
@@ -0,0 +1,135 @@
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+import threading
+import time
+from core.config import get_settings
+from core.metrics import RESPONSE_CACHE_REQUESTS
+from utils.compression import compress
+
+settings = get_settings()
+
+REPORTS_TAG = "reports"
+
+def patient_tag(patient_id: int) -> str:
+    return f"patient:{patient_id}"
+
+class CachedResponse:
+    """A serialized response body with its ETag and compressed variants"""
+
+    def __init__(self, body: bytes, etag: str, tags: Tuple[str, ...], expires_at: float):
+        self.body = body
+        self.etag = etag
+        self.tags = tags
+        self.expires_at = expires_at
+        self._encoded: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding: str) -> bytes:
+        """Body compressed with `encoding`, computed once per entry"""
+        with self._lock:
+            body = self._encoded.get(encoding)
+            if body is None:
+                body = self._encoded[encoding] = compress(self.body, encoding)
+            return body
+
+class ResponseCache:
+    """In-process LRU of rendered GET responses, keyed by path and query.
+
+    Entries carry tags (e.g. "patient:42", "reports"); writes invalidate
+    every entry under a tag. Within RESPONSE_CACHE_TTL an entry is served
+    without touching the database; after that its ETag is checked against
+    the resource's current version and it is reused if unchanged, so
+    writes made by other worker processes show up within the TTL.
+
+    Each tag has a generation counter. A response built while its tag was
+    invalidated is not stored, so a slow read cannot put pre-write data
+    back into the cache.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[float] = None, max_body: Optional[int] = None):
+        self.max_entries = max_entries or settings.RESPONSE_CACHE_SIZE
+        self.ttl = settings.RESPONSE_CACHE_TTL if ttl is None else ttl
+        self.max_body = max_body or settings.RESPONSE_CACHE_MAX_BODY
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hit": 0, "revalidated": 0, "miss": 0, "not_modified": 0, "invalidated": 0}
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def record(self, route: str, result: str) -> None:
+        """Count how a request was answered: hit, revalidated, miss or not_modified"""
+        self.stats[result] += 1
+        RESPONSE_CACHE_REQUESTS.labels(route, result).inc()
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return time.monotonic() < entry.expires_at
+
+    def touch(self, entry: CachedResponse) -> None:
+        """Extend an entry whose ETag still matches the resource"""
+        entry.expires_at = time.monotonic() + self.ttl
+
+    def generation(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        """Snapshot to pass to put(); take it before reading the resource"""
+        with self._lock:
+            return tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def put(self, key: str, body: bytes, etag: str, tags: Tuple[str, ...], generation: Tuple[int, ...]) -> Optional[CachedResponse]:
+        """Store a rendered body unless it is too large or a tag was invalidated meanwhile"""
+        if len(body) > self.max_body:
+            return None
+        entry = CachedResponse(body, etag, tags, time.monotonic() + self.ttl)
+        with self._lock:
+            if tuple(self._generations.get(tag, 0) for tag in tags) != generation:
+                return None
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop every entry under any of `tags`; returns how many were dropped"""
+        wanted = set(tags)
+        with self._lock:
+            for tag in wanted:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+            stale = [key for key, entry in self._entries.items() if wanted.intersection(entry.tags)]
+            for key in stale:
+                del self._entries[key]
+            self.stats["invalidated"] += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._entries)
+            body_bytes = sum(len(entry.body) for entry in self._entries.values())
+        return dict(self.stats, entries=size, bytes=body_bytes)
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide response cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
+
+def invalidate_patient(*patient_ids: int) -> None:
+    """Call after committing changes to a patient, their records or diagnoses"""
+    get_response_cache().invalidate(*(patient_tag(patient_id) for patient_id in patient_ids))
+
+def invalidate_reports() -> None:
+    """Call after the report rollups change"""
+    get_response_cache().invalidate(REPORTS_TAG)
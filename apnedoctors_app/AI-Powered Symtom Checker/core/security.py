@@ -1,24 +1,32 @@
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Optional, Tuple, Union
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from core.config import get_settings
+from core.password_hasher import get_password_hasher
+from core.token_cache import get_token_cache
 
 settings = get_settings()
 
-# Password hashing configuration
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 class SecurityHandler:
     @staticmethod
-    def get_password_hash(password: str) -> str:
+    async def get_password_hash(password: str) -> str:
         """Generate password hash"""
-        return pwd_context.hash(password)
+        return await get_password_hasher().hash(password)
 
     @staticmethod
-    def verify_password(plain_password: str, hashed_password: str) -> bool:
+    async def verify_password(plain_password: str, hashed_password: str) -> bool:
         """Verify password against hash"""
-        return pwd_context.verify(plain_password, hashed_password)
+        return await get_password_hasher().verify(plain_password, hashed_password)
+
+    @staticmethod
+    async def verify_login(
+        account: str,
+        plain_password: str,
+        hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """Rate-limited login check; returns (valid, new_hash) where new_hash
+        replaces the stored hash when it was made at a lower cost"""
+        return await get_password_hasher().verify_and_update(account, plain_password, hashed_password)
 
     @staticmethod
     def create_access_token(
@@ -46,11 +54,21 @@ class SecurityHandler:
     def verify_token(token: str) -> Union[dict, None]:
         """Verify JWT token"""
         try:
-            payload = jwt.decode(
+            payload = get_token_cache().verify(
                 token, 
                 settings.SECRET_KEY, 
-                algorithms=["HS256"]
+                ["HS256"]
             )
             return payload
         except JWTError:
-            return None
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def revoke_token(token: str) -> bool:
+        """Reject a token for the rest of its lifetime (e.g. on logout);
+        False if it isn't a valid token to begin with"""
+        try:
+            get_token_cache().revoke(token, settings.SECRET_KEY, ["HS256"])
+            return True
+        except JWTError:
+            return False
@@ -0,0 +1,149 @@
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from jose import JWTError, jwt
+import hashlib
+import heapq
+import logging
+import threading
+import time
+from core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+def _digest(value: str) -> bytes:
+    return hashlib.sha256(value.encode()).digest()
+
+class VerifiedTokenCache:
+    """Bounded LRU of JWT claims that already passed signature verification.
+
+    Entries are keyed by the SHA-256 of the token (the token itself is not
+    kept) and tagged with a fingerprint of the key and algorithms used, so
+    handlers configured with different secrets never share results. An
+    entry lives until the token's own `exp`, capped at `max_ttl`. Failed
+    verifications are not cached. Only verified tokens can be revoked;
+    they are rejected until they would have expired anyway, at most
+    `max_revocation_ttl` (the longest lifetime we issue) from now. At most
+    `max_revoked` revocations are kept, the soonest-expiring go first.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_ttl: Optional[float] = None,
+        max_revoked: Optional[int] = None,
+        max_revocation_ttl: Optional[float] = None
+    ):
+        self.max_entries = max_entries or settings.TOKEN_CACHE_SIZE
+        self.max_ttl = max_ttl or settings.TOKEN_CACHE_MAX_TTL
+        self.max_revoked = max_revoked or settings.TOKEN_REVOCATION_LIMIT
+        self.max_revocation_ttl = max_revocation_ttl or settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+        self._entries: "OrderedDict[bytes, Tuple[bytes, float, Dict[str, Any]]]" = OrderedDict()
+        self._revoked: Dict[bytes, float] = {}
+        # (expires_at, digest) min-heap so pruning only touches expired revocations
+        self._revocation_heap: List[Tuple[float, bytes]] = []
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0, "misses": 0, "evictions": 0, "expirations": 0,
+            "revoked_rejections": 0, "revocations_evicted": 0
+        }
+
+    def verify(self, token: str, key: str, algorithms: Sequence[str]) -> Dict[str, Any]:
+        """Claims of a valid token; raises JWTError like jwt.decode"""
+        token_digest = _digest(token)
+        fingerprint = _digest(f"{key}\0{','.join(sorted(algorithms))}")
+        now = time.time()
+
+        with self._lock:
+            if token_digest in self._revoked:
+                self.stats["revoked_rejections"] += 1
+                raise JWTError("Token has been revoked")
+
+            entry = self._entries.get(token_digest)
+            if entry is not None:
+                entry_fingerprint, expires_at, claims = entry
+                if entry_fingerprint == fingerprint and now < expires_at:
+                    self._entries.move_to_end(token_digest)
+                    self.stats["hits"] += 1
+                    return claims
+                if now >= expires_at:
+                    del self._entries[token_digest]
+                    self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+
+        # Signature check outside the lock so concurrent misses don't serialize
+        claims = jwt.decode(token, key, algorithms=list(algorithms))
+
+        expires_at = now + self.max_ttl
+        if claims.get("exp") is not None:
+            expires_at = min(expires_at, float(claims["exp"]))
+
+        with self._lock:
+            if token_digest not in self._revoked:
+                self._entries[token_digest] = (fingerprint, expires_at, claims)
+                self._entries.move_to_end(token_digest)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.stats["evictions"] += 1
+        return claims
+
+    def revoke(self, token: str, key: str, algorithms: Sequence[str]) -> Dict[str, Any]:
+        """Reject a valid token from now on (e.g. on logout) and return its
+        claims; raises JWTError, without revoking, if it doesn't verify"""
+        claims = self.verify(token, key, algorithms)
+        token_digest = _digest(token)
+        now = time.time()
+        # verify() has checked that exp, if present, is numeric
+        expires_at = now + self.max_revocation_ttl
+        if claims.get("exp") is not None:
+            expires_at = min(expires_at, float(claims["exp"]))
+
+        with self._lock:
+            self._entries.pop(token_digest, None)
+            self._prune_revoked(now)
+            self._revoked[token_digest] = expires_at
+            heapq.heappush(self._revocation_heap, (expires_at, token_digest))
+            while len(self._revoked) > self.max_revoked:
+                self._pop_revocation()
+                self.stats["revocations_evicted"] += 1
+        return claims
+
+    def clear(self) -> None:
+        """Drop all verified entries, e.g. after rotating the signing key"""
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "revoked": len(self._revoked),
+                "hit_ratio": self.stats["hits"] / lookups if lookups else 0.0
+            }
+
+    def _prune_revoked(self, now: float) -> None:
+        """Revocations only matter until the token would have expired"""
+        while self._revocation_heap and self._revocation_heap[0][0] <= now:
+            self._pop_revocation()
+
+    def _pop_revocation(self) -> None:
+        """Drop the soonest-expiring revocation (skipping stale heap entries)"""
+        while self._revocation_heap:
+            expires_at, digest = heapq.heappop(self._revocation_heap)
+            if self._revoked.get(digest) == expires_at:
+                del self._revoked[digest]
+                return
+
+_token_cache: Optional[VerifiedTokenCache] = None
+_token_cache_lock = threading.Lock()
+
+def get_token_cache() -> VerifiedTokenCache:
+    """Process-wide verified token cache"""
+    global _token_cache
+    with _token_cache_lock:
+        if _token_cache is None:
+            _token_cache = VerifiedTokenCache()
+        return _token_cache
@@ -0,0 +1,80 @@
+"""initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'patients',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('first_name', sa.String(length=50), nullable=False),
+        sa.Column('last_name', sa.String(length=50), nullable=False),
+        sa.Column('email', sa.String(length=100), nullable=True),
+        sa.Column('date_of_birth', sa.Date(), nullable=False),
+        sa.Column('gender', sa.String(length=10), nullable=True),
+        sa.Column('phone_number', sa.String(length=20), nullable=True),
+        sa.Column('address', sa.String(length=200), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_patients_id', 'patients', ['id'], unique=False)
+    op.create_index('ix_patients_email', 'patients', ['email'], unique=True)
+
+    op.create_table(
+        'medical_records',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('allergies', sa.JSON(), nullable=True),
+        sa.Column('medications', sa.JSON(), nullable=True),
+        sa.Column('chronic_conditions', sa.JSON(), nullable=True),
+        sa.Column('family_history', sa.JSON(), nullable=True),
+        sa.Column('height', sa.Float(), nullable=True),
+        sa.Column('weight', sa.Float(), nullable=True),
+        sa.Column('blood_type', sa.String(length=5), nullable=True),
+        sa.ForeignKeyConstraint(['patient_id'], ['patients.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_medical_records_id', 'medical_records', ['id'], unique=False)
+
+    op.create_table(
+        'diagnoses',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=True),
+        sa.Column('medical_record_id', sa.Integer(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=True),
+        sa.Column('symptoms', sa.JSON(), nullable=True),
+        sa.Column('diagnosis', sa.JSON(), nullable=True),
+        sa.Column('confidence_score', sa.Float(), nullable=True),
+        sa.Column('risk_level', sa.String(length=20), nullable=True),
+        sa.Column('recommendations', sa.JSON(), nullable=True),
+        sa.Column('notes', sa.String(length=500), nullable=True),
+        sa.ForeignKeyConstraint(['medical_record_id'], ['medical_records.id']),
+        sa.ForeignKeyConstraint(['patient_id'], ['patients.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_diagnoses_id', 'diagnoses', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_diagnoses_id', table_name='diagnoses')
+    op.drop_table('diagnoses')
+    op.drop_index('ix_medical_records_id', table_name='medical_records')
+    op.drop_table('medical_records')
+    op.drop_index('ix_patients_email', table_name='patients')
+    op.drop_index('ix_patients_id', table_name='patients')
+    op.drop_table('patients')
@@ -0,0 +1,36 @@
+"""patient history indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_diagnoses_patient_id_timestamp',
+        'diagnoses',
+        ['patient_id', 'timestamp', 'id'],
+        unique=False
+    )
+    op.create_index(
+        'ix_medical_records_patient_id_updated_at',
+        'medical_records',
+        ['patient_id', 'updated_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_medical_records_patient_id_updated_at', table_name='medical_records')
+    op.drop_index('ix_diagnoses_patient_id_timestamp', table_name='diagnoses')
@@ -0,0 +1,64 @@
+"""normalized diagnosis symptoms and conditions
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'diagnosis_symptoms',
+        sa.Column('diagnosis_id', sa.Integer(), nullable=False),
+        sa.Column('symptom', sa.String(length=100), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['diagnosis_id'], ['diagnoses.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('diagnosis_id', 'symptom')
+    )
+    op.create_index(
+        'ix_diagnosis_symptoms_symptom_timestamp',
+        'diagnosis_symptoms',
+        ['symptom', 'timestamp'],
+        unique=False
+    )
+    op.create_index('ix_diagnosis_symptoms_patient_id', 'diagnosis_symptoms', ['patient_id'], unique=False)
+
+    op.create_table(
+        'diagnosis_conditions',
+        sa.Column('diagnosis_id', sa.Integer(), nullable=False),
+        sa.Column('condition', sa.String(length=200), nullable=False),
+        sa.Column('probability', sa.Float(), nullable=True),
+        sa.Column('patient_id', sa.Integer(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['diagnosis_id'], ['diagnoses.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('diagnosis_id', 'condition')
+    )
+    op.create_index(
+        'ix_diagnosis_conditions_condition_timestamp',
+        'diagnosis_conditions',
+        ['condition', 'timestamp'],
+        unique=False
+    )
+    op.create_index('ix_diagnosis_conditions_patient_id', 'diagnosis_conditions', ['patient_id'], unique=False)
+
+    # Existing rows are populated by tests/scripts/backfill_diagnosis_terms.py
+
+
+def downgrade() -> None:
+    op.drop_index('ix_diagnosis_conditions_patient_id', table_name='diagnosis_conditions')
+    op.drop_index('ix_diagnosis_conditions_condition_timestamp', table_name='diagnosis_conditions')
+    op.drop_table('diagnosis_conditions')
+    op.drop_index('ix_diagnosis_symptoms_patient_id', table_name='diagnosis_symptoms')
+    op.drop_index('ix_diagnosis_symptoms_symptom_timestamp', table_name='diagnosis_symptoms')
+    op.drop_table('diagnosis_symptoms')
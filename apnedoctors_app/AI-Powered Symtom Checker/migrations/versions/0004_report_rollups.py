@@ -0,0 +1,49 @@
+"""report rollup tables
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'report_condition_daily',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('condition', sa.String(length=200), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'condition')
+    )
+    op.create_table(
+        'report_diagnosis_daily',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('risk_level', sa.String(length=20), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('confidence_sum', sa.Float(), nullable=False),
+        sa.Column('confidence_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'risk_level')
+    )
+    op.create_table(
+        'report_rollup_checkpoints',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('last_id', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+    # The first run of the rollup job (checkpoint 0) aggregates existing history
+
+
+def downgrade() -> None:
+    op.drop_table('report_rollup_checkpoints')
+    op.drop_table('report_diagnosis_daily')
+    op.drop_table('report_condition_daily')
@@ -0,0 +1,38 @@
+"""vital samples
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'vital_samples',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('metric', sa.String(length=20), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('value', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_vital_samples_patient_metric_timestamp',
+        'vital_samples',
+        ['patient_id', 'metric', 'timestamp']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vital_samples_patient_metric_timestamp', table_name='vital_samples')
+    op.drop_table('vital_samples')
@@ -0,0 +1,184 @@
+"""compressed vital chunks replace per-sample rows
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 15:30:00.000000
+
+"""
+from alembic import op
+from datetime import datetime, timedelta
+from itertools import groupby
+import struct
+import zlib
+import numpy as np
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of the vital chunk codec as of this revision (version 1):
+# raw chunks hold int64 milliseconds plus a float32 value, rollup chunks
+# int64 bucket starts in seconds plus min/max/sum/count.
+_CODEC_VERSION = 1
+_HEADER = struct.Struct("<BI")
+_EPOCH = datetime(1970, 1, 1)
+_RAW_COLUMNS = ("<f4",)
+_ROLLUP_COLUMNS = ("<f4", "<f4", "<f8", "<u4")
+_ROLLUP_WIDTHS = (("minute", 60), ("hour", 3600), ("day", 86400))
+_BATCH_ROWS = 10000
+
+_samples = sa.table(
+    'vital_samples',
+    sa.column('patient_id', sa.Integer), sa.column('metric', sa.String),
+    sa.column('timestamp', sa.DateTime), sa.column('value', sa.Float)
+)
+_chunks = sa.table(
+    'vital_chunks',
+    sa.column('patient_id', sa.Integer), sa.column('metric', sa.String), sa.column('tier', sa.String),
+    sa.column('start_time', sa.DateTime), sa.column('end_time', sa.DateTime),
+    sa.column('count', sa.Integer), sa.column('payload', sa.LargeBinary)
+)
+
+
+def _encode(times, columns, dtypes) -> bytes:
+    deltas = np.diff(times.astype("<i8"), prepend=np.int64(0))
+    parts = [_HEADER.pack(_CODEC_VERSION, len(times)), deltas.tobytes()]
+    parts.extend(np.ascontiguousarray(column, dtype=dtype).tobytes() for column, dtype in zip(columns, dtypes))
+    return zlib.compress(b"".join(parts), 6)
+
+
+def _decode(payload, dtypes):
+    raw = zlib.decompress(payload)
+    version, count = _HEADER.unpack_from(raw)
+    if version != _CODEC_VERSION:
+        raise ValueError(f"Unsupported vital chunk version: {version}")
+    offset = _HEADER.size
+    columns = [np.cumsum(np.frombuffer(raw, dtype="<i8", count=count, offset=offset))]
+    offset += 8 * count
+    for dtype in dtypes:
+        columns.append(np.frombuffer(raw, dtype=dtype, count=count, offset=offset))
+        offset += np.dtype(dtype).itemsize * count
+    return columns
+
+
+def _chunk(patient_id, metric, tier, times, columns, dtypes, first, last):
+    return {
+        'patient_id': patient_id,
+        'metric': metric,
+        'tier': tier,
+        'start_time': _EPOCH + timedelta(seconds=float(first)),
+        'end_time': _EPOCH + timedelta(seconds=float(last)),
+        'count': len(times),
+        'payload': _encode(times, columns, dtypes)
+    }
+
+
+def _series_day_chunks(patient_id, metric, rows):
+    """Raw chunk plus minute/hour/day rollups for one series and UTC day"""
+    seconds = np.array([(row.timestamp - _EPOCH).total_seconds() for row in rows])
+    values = np.array([row.value for row in rows], dtype=np.float32)
+    chunks = [_chunk(
+        patient_id, metric, 'raw', np.round(seconds * 1000).astype(np.int64), (values,), _RAW_COLUMNS,
+        seconds[0], seconds[-1]
+    )]
+    for tier, width in _ROLLUP_WIDTHS:
+        buckets = (seconds // width).astype(np.int64) * width
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        aggregates = (
+            np.minimum.reduceat(values, starts),
+            np.maximum.reduceat(values, starts),
+            np.add.reduceat(values.astype(np.float64), starts),
+            np.diff(np.r_[starts, len(values)]).astype(np.uint32)
+        )
+        chunks.append(_chunk(
+            patient_id, metric, tier, buckets[starts], aggregates, _ROLLUP_COLUMNS,
+            buckets[starts][0], buckets[starts][-1]
+        ))
+    return chunks
+
+
+def _copy_samples_to_chunks(bind) -> None:
+    """Stream vital_samples in series/time order and write one set of chunks per series and day"""
+    result = bind.execution_options(stream_results=True).execute(
+        sa.select(_samples.c.patient_id, _samples.c.metric, _samples.c.timestamp, _samples.c.value)
+        .order_by(_samples.c.patient_id, _samples.c.metric, _samples.c.timestamp)
+    )
+    pending = []
+    for (patient_id, metric, _), rows in groupby(
+        result, key=lambda row: (row.patient_id, row.metric, row.timestamp.date())
+    ):
+        pending.extend(_series_day_chunks(patient_id, metric, list(rows)))
+        if len(pending) >= _BATCH_ROWS // 10:
+            bind.execute(_chunks.insert(), pending)
+            pending = []
+    if pending:
+        bind.execute(_chunks.insert(), pending)
+
+
+def _copy_chunks_to_samples(bind) -> None:
+    """Expand raw chunks back into one row per sample"""
+    result = bind.execution_options(stream_results=True).execute(
+        sa.select(_chunks.c.patient_id, _chunks.c.metric, _chunks.c.payload).where(_chunks.c.tier == 'raw')
+    )
+    pending = []
+    for row in result:
+        times, values = _decode(row.payload, _RAW_COLUMNS)
+        for millis, value in zip(times.tolist(), values.tolist()):
+            pending.append({
+                'patient_id': row.patient_id,
+                'metric': row.metric,
+                'timestamp': _EPOCH + timedelta(milliseconds=millis),
+                'value': value
+            })
+        if len(pending) >= _BATCH_ROWS:
+            bind.execute(_samples.insert(), pending)
+            pending = []
+    if pending:
+        bind.execute(_samples.insert(), pending)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'vital_chunks',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('metric', sa.String(length=20), nullable=False),
+        sa.Column('tier', sa.String(length=10), nullable=False),
+        sa.Column('start_time', sa.DateTime(), nullable=False),
+        sa.Column('end_time', sa.DateTime(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('payload', sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_vital_chunks_series_tier_start',
+        'vital_chunks',
+        ['patient_id', 'metric', 'tier', 'start_time']
+    )
+    _copy_samples_to_chunks(op.get_bind())
+    op.drop_index('ix_vital_samples_patient_metric_timestamp', table_name='vital_samples')
+    op.drop_table('vital_samples')
+
+
+def downgrade() -> None:
+    op.create_table(
+        'vital_samples',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('metric', sa.String(length=20), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('value', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_vital_samples_patient_metric_timestamp',
+        'vital_samples',
+        ['patient_id', 'metric', 'timestamp']
+    )
+    _copy_chunks_to_samples(op.get_bind())
+    op.drop_index('ix_vital_chunks_series_tier_start', table_name='vital_chunks')
+    op.drop_table('vital_chunks')
@@ -0,0 +1,33 @@
+"""wearable sync cursors
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'wearable_sync_cursors',
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('device_type', sa.String(length=20), nullable=False),
+        sa.Column('high_water', sa.Float(), nullable=True),
+        sa.Column('last_synced_at', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.String(length=500), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('patient_id', 'device_type')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('wearable_sync_cursors')
@@ -0,0 +1,72 @@
+"""vital chunk compaction marker and millisecond rollups
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import struct
+import zlib
+import numpy as np
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+# Chunk codec version 2 stores rollup bucket starts in milliseconds instead
+# of seconds. The application still reads version 1, so upgrading leaves
+# payloads alone; downgrading rewrites version 2 payloads for the old code.
+_HEADER = struct.Struct("<BI")
+_BATCH_ROWS = 1000
+
+_chunks = sa.table(
+    'vital_chunks',
+    sa.column('id', sa.BigInteger), sa.column('tier', sa.String), sa.column('payload', sa.LargeBinary)
+)
+
+
+def _to_version_1(payload: bytes, tier: str) -> bytes:
+    raw = zlib.decompress(payload)
+    version, count = _HEADER.unpack_from(raw)
+    if version == 1:
+        return payload
+    body = raw[_HEADER.size:]
+    if tier != 'raw':
+        times = np.cumsum(np.frombuffer(body, dtype="<i8", count=count)) // 1000
+        body = np.diff(times, prepend=np.int64(0)).astype("<i8").tobytes() + body[8 * count:]
+    return zlib.compress(_HEADER.pack(1, count) + body, 6)
+
+
+def upgrade() -> None:
+    op.add_column(
+        'vital_chunks',
+        sa.Column('compacted', sa.Boolean(), nullable=False, server_default=sa.false())
+    )
+    op.create_index('ix_vital_chunks_compacted_end', 'vital_chunks', ['compacted', 'end_time'])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(_chunks.c.id, _chunks.c.tier, _chunks.c.payload)
+            .where(_chunks.c.id > last_id)
+            .order_by(_chunks.c.id)
+            .limit(_BATCH_ROWS)
+        ).fetchall()
+        if not rows:
+            break
+        for chunk_id, tier, payload in rows:
+            converted = _to_version_1(payload, tier)
+            if converted is not payload:
+                bind.execute(_chunks.update().where(_chunks.c.id == chunk_id).values(payload=converted))
+        last_id = rows[-1].id
+
+    op.drop_index('ix_vital_chunks_compacted_end', table_name='vital_chunks')
+    op.drop_column('vital_chunks', 'compacted')
@@ -0,0 +1,77 @@
+"""report rollups track folded diagnoses with a flag
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+_CHECKPOINT = 'diagnoses'
+
+_diagnoses = sa.table('diagnoses', sa.column('id', sa.Integer), sa.column('rolled_up', sa.Boolean))
+_checkpoints = sa.table(
+    'report_rollup_checkpoints',
+    sa.column('name', sa.String), sa.column('last_id', sa.Integer), sa.column('folded', sa.Integer)
+)
+
+
+def upgrade() -> None:
+    op.add_column(
+        'diagnoses',
+        sa.Column('rolled_up', sa.Boolean(), nullable=False, server_default=sa.false())
+    )
+    op.add_column(
+        'report_rollup_checkpoints',
+        sa.Column('folded', sa.Integer(), nullable=False, server_default='0')
+    )
+
+    # Everything up to the old ID checkpoint is already counted
+    bind = op.get_bind()
+    last_id = bind.execute(
+        sa.select(_checkpoints.c.last_id).where(_checkpoints.c.name == _CHECKPOINT)
+    ).scalar()
+    if last_id is None:
+        bind.execute(_checkpoints.insert().values(name=_CHECKPOINT, last_id=0, folded=0))
+    elif last_id:
+        bind.execute(_diagnoses.update().where(_diagnoses.c.id <= last_id).values(rolled_up=True))
+        bind.execute(
+            _checkpoints.update().where(_checkpoints.c.name == _CHECKPOINT).values(folded=last_id)
+        )
+
+    op.drop_column('report_rollup_checkpoints', 'last_id')
+    op.create_index(
+        'ix_diagnoses_rollup_pending', 'diagnoses', ['id'],
+        postgresql_where=sa.text('NOT rolled_up'), sqlite_where=sa.text('NOT rolled_up')
+    )
+
+
+def downgrade() -> None:
+    op.add_column(
+        'report_rollup_checkpoints',
+        sa.Column('last_id', sa.Integer(), nullable=False, server_default='0')
+    )
+
+    # The ID checkpoint can only cover the contiguous prefix of counted rows;
+    # counted rows after the first pending one will be counted again
+    bind = op.get_bind()
+    first_pending = bind.execute(
+        sa.select(sa.func.min(_diagnoses.c.id)).where(_diagnoses.c.rolled_up.is_(False))
+    ).scalar()
+    if first_pending is None:
+        last_id = bind.execute(sa.select(sa.func.max(_diagnoses.c.id))).scalar() or 0
+    else:
+        last_id = first_pending - 1
+    bind.execute(_checkpoints.update().where(_checkpoints.c.name == _CHECKPOINT).values(last_id=last_id))
+
+    op.drop_index('ix_diagnoses_rollup_pending', table_name='diagnoses')
+    op.drop_column('report_rollup_checkpoints', 'folded')
+    op.drop_column('diagnoses', 'rolled_up')
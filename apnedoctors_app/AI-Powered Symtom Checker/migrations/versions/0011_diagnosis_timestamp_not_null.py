@@ -0,0 +1,48 @@
+"""diagnoses.timestamp is required
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from alembic import op
+from datetime import datetime
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+# Stand-in for rows whose time was never recorded: they sort as the oldest
+_UNKNOWN_TIME = datetime(1970, 1, 1)
+
+_diagnoses = sa.table(
+    'diagnoses',
+    sa.column('medical_record_id', sa.Integer), sa.column('timestamp', sa.DateTime)
+)
+_medical_records = sa.table('medical_records', sa.column('id', sa.Integer), sa.column('created_at', sa.DateTime))
+
+
+def upgrade() -> None:
+    # Keyset pagination orders by (timestamp, id), which cannot place NULLs;
+    # backfill from the linked medical record where there is one
+    record_time = (
+        sa.select(_medical_records.c.created_at)
+        .where(_medical_records.c.id == _diagnoses.c.medical_record_id)
+        .scalar_subquery()
+    )
+    op.get_bind().execute(
+        _diagnoses.update()
+        .where(_diagnoses.c.timestamp.is_(None))
+        .values(timestamp=sa.func.coalesce(record_time, _UNKNOWN_TIME))
+    )
+    with op.batch_alter_table('diagnoses') as batch:
+        batch.alter_column('timestamp', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('diagnoses') as batch:
+        batch.alter_column('timestamp', existing_type=sa.DateTime(), nullable=True)
@@ -1,5 +1,9 @@
 from .bert_symptom import BERTSymptomClassifier
 from .diagnosis_model import DiagnosisModel
 from .risk_assessment import RiskAssessmentModel
+from .vitals_anomaly import StreamingAnomalyDetector, get_anomaly_detector
 
-__all__ = ['BERTSymptomClassifier', 'DiagnosisModel', 'RiskAssessmentModel']
\ No newline at end of file
+__all__ = [
+    'BERTSymptomClassifier', 'DiagnosisModel', 'RiskAssessmentModel',
+    'StreamingAnomalyDetector', 'get_anomaly_detector'
+]
\ No newline at end of file
@@ -2,6 +2,9 @@ import torch
 from transformers import AutoTokenizer, AutoModel
 from typing import List, Dict, Any
 import numpy as np
+from core.metrics import stage_timer
+from core.profiling import model_trace
+from utils.batching import EncoderBatcher
 
 class BERTSymptomClassifier:
     def __init__(self, model_path: str, device: str = None):
@@ -9,23 +12,14 @@ class BERTSymptomClassifier:
         self.tokenizer = AutoTokenizer.from_pretrained('microsoft/BiomedNLP-PubMedBERT-base-uncased')
         self.model = AutoModel.from_pretrained('microsoft/BiomedNLP-PubMedBERT-base-uncased')
         self.model.to(self.device)
+        self.batcher = EncoderBatcher(self.tokenizer, self._encode_batch)
         
     async def predict(self, text: str) -> Dict[str, Any]:
         """Predict symptoms from text input"""
         try:
-            # Tokenize input
-            inputs = self.tokenizer(
-                text,
-                return_tensors='pt',
-                truncation=True,
-                max_length=512,
-                padding=True
-            ).to(self.device)
-            
-            # Get model outputs
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                embeddings = outputs.last_hidden_state.mean(dim=1)
+            # Tokenized and encoded with concurrent requests of similar length
+            with stage_timer('forward', 'pubmedbert'), model_trace('pubmedbert'):
+                embeddings = (await self.batcher.submit(text)).unsqueeze(0)
                 
             # Process predictions (implement your symptom classification logic here)
             predictions = self._process_embeddings(embeddings)
@@ -38,6 +32,15 @@ class BERTSymptomClassifier:
         except Exception as e:
             raise ValueError(f"Prediction failed: {str(e)}")
             
+    def _encode_batch(self, inputs: Dict[str, torch.Tensor], lengths: List[int]) -> List[torch.Tensor]:
+        """Mean-pooled embeddings of one length bucket, ignoring padding"""
+        inputs = {name: tensor.to(self.device) for name, tensor in inputs.items()}
+        with torch.no_grad():
+            hidden = self.model(**inputs).last_hidden_state
+        mask = inputs['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+        embeddings = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+        return list(embeddings.cpu())
+            
     def _process_embeddings(self, embeddings: torch.Tensor) -> List[str]:
         """Process model embeddings into symptom predictions"""
         # Implement your symptom extraction logic here
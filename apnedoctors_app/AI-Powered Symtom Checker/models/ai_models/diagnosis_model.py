@@ -1,23 +1,86 @@
 import torch
 import torch.nn as nn
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
+from core.metrics import stage_timer
+from core.model_registry import ModelArtifact, register_architecture
+from core.profiling import model_trace
+
+def validate_diagnosis_manifest(manifest: Dict[str, Any]) -> None:
+    """A diagnosis model is only servable with a vocabulary matching its layers"""
+    vocabulary = manifest.get('vocabulary') or {}
+    if not vocabulary.get('symptoms') or not vocabulary.get('conditions'):
+        raise ValueError("diagnosis model manifests need a vocabulary with symptoms and conditions")
+    config = manifest.get('config', {})
+    if len(vocabulary['symptoms']) != config.get('input_size'):
+        raise ValueError(f"{len(vocabulary['symptoms'])} symptoms for input_size {config.get('input_size')}")
+    if len(vocabulary['conditions']) != config.get('num_classes'):
+        raise ValueError(f"{len(vocabulary['conditions'])} conditions for num_classes {config.get('num_classes')}")
+
+@register_architecture('diagnosis_mlp', validate_diagnosis_manifest)
+def build_diagnosis_mlp(config: Dict[str, Any]) -> nn.Module:
+    """Feed-forward classifier over multi-hot symptoms:
+    {"input_size", "hidden_sizes", "num_classes", "dropout"}"""
+    layers: List[nn.Module] = []
+    width = config['input_size']
+    for hidden in config.get('hidden_sizes', []):
+        layers += [nn.Linear(width, hidden), nn.ReLU(), nn.Dropout(config.get('dropout', 0.0))]
+        width = hidden
+    layers.append(nn.Linear(width, config['num_classes']))
+    return nn.Sequential(*layers)
 
 class DiagnosisModel:
-    def __init__(self, model_path: str, device: str = None):
+    def __init__(
+        self,
+        model: nn.Module,
+        vocabulary: Optional[Dict[str, List[str]]] = None,
+        device: str = None,
+        max_diagnoses: int = 5,
+        version: Optional[str] = None
+    ):
         self.device = device or ('cuda' if torch.cuda.is_available() else 'cpu')
-        self.model = self._load_model(model_path)
+        self.model = model
         self.model.to(self.device)
-        
-    def _load_model(self, model_path: str) -> nn.Module:
-        """Load the trained diagnosis model"""
+        self.model.eval()
+        self.max_diagnoses = max_diagnoses
+        self.version = version
+        self.symptom_index, self.conditions = self._index_vocabulary(vocabulary)
+
+    @classmethod
+    def from_artifact(cls, artifact: ModelArtifact, device: str = None, max_diagnoses: int = 5) -> 'DiagnosisModel':
+        """Load a registry version (safetensors weights, vocabulary from the manifest)"""
+        device = device or ('cuda' if torch.cuda.is_available() else 'cpu')
         try:
-            model = torch.load(model_path, map_location=self.device)
-            model.eval()
-            return model
+            model = artifact.build(device)
         except Exception as e:
             raise ValueError(f"Failed to load model: {str(e)}")
-            
+        return cls(model, artifact.manifest.get('vocabulary'), device, max_diagnoses, artifact.version)
+
+    def _index_vocabulary(
+        self, vocabulary: Optional[Dict[str, List[str]]]
+    ) -> Tuple[Optional[Dict[str, int]], Optional[List[str]]]:
+        """Input symptom positions and output conditions ({"symptoms", "conditions"})"""
+        if not vocabulary:
+            return None, None
+        symptom_index = {self._normalize(s): i for i, s in enumerate(vocabulary['symptoms'])}
+        return symptom_index, vocabulary['conditions']
+
+    @staticmethod
+    def _normalize(symptom: str) -> str:
+        return ' '.join(symptom.lower().split())
+
+    @property
+    def has_vocabulary(self) -> bool:
+        """Whether inputs and outputs can be mapped; predict() fails without it"""
+        return self.symptom_index is not None and self.conditions is not None
+
+    def coverage(self, symptoms: List[str]) -> float:
+        """Share of the symptoms the classifier was trained on (0.0 without a vocabulary)"""
+        if self.symptom_index is None or not symptoms:
+            return 0.0
+        known = sum(1 for s in symptoms if self._normalize(s) in self.symptom_index)
+        return known / len(symptoms)
+
     async def predict(self, symptoms: List[str]) -> Dict[str, Any]:
         """Generate diagnosis from symptoms"""
         try:
@@ -25,7 +88,7 @@ class DiagnosisModel:
             inputs = self._preprocess_symptoms(symptoms)
             
             # Get model predictions
-            with torch.no_grad():
+            with stage_timer('forward', 'diagnosis_model'), model_trace('diagnosis_model'), torch.no_grad():
                 outputs = self.model(inputs)
                 probabilities = torch.softmax(outputs, dim=1)
                 
@@ -34,7 +97,8 @@ class DiagnosisModel:
             
             return {
                 'diagnoses': diagnoses,
-                'confidence_scores': probabilities.cpu().numpy().tolist()
+                'confidence_scores': probabilities.cpu().numpy().tolist(),
+                'top_probability': float(probabilities.max())
             }
             
         except Exception as e:
@@ -42,10 +106,22 @@ class DiagnosisModel:
             
     def _preprocess_symptoms(self, symptoms: List[str]) -> torch.Tensor:
         """Preprocess symptoms for model input"""
-        # Implement symptom preprocessing logic
-        return torch.zeros(1, 100)  # Placeholder
+        if self.symptom_index is None:
+            raise ValueError("Model has no symptom vocabulary")
+        # Multi-hot over the training vocabulary; unknown symptoms are dropped
+        inputs = torch.zeros(1, len(self.symptom_index), device=self.device)
+        for symptom in symptoms:
+            index = self.symptom_index.get(self._normalize(symptom))
+            if index is not None:
+                inputs[0, index] = 1.0
+        return inputs
         
     def _process_predictions(self, probabilities: torch.Tensor) -> List[Dict[str, Any]]:
         """Process model outputs into diagnosis predictions"""
-        # Implement diagnosis processing logic
-        return [{"condition": "condition_1", "probability": 0.8}]  # Placeholder
\ No newline at end of file
+        if self.conditions is None:
+            raise ValueError("Model has no condition vocabulary")
+        top = torch.topk(probabilities[0], min(self.max_diagnoses, len(self.conditions)))
+        return [
+            {"condition": self.conditions[index], "probability": float(probability)}
+            for probability, index in zip(top.values.tolist(), top.indices.tolist())
+        ]
\ No newline at end of file
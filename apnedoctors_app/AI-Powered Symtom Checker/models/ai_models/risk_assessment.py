@@ -1,6 +1,7 @@
 import torch
 import numpy as np
 from typing import Dict, Any, List
+from .vitals_anomaly import get_anomaly_detector
 
 class RiskAssessmentModel:
     def __init__(self, model_path: str, device: str = None):
@@ -10,6 +11,8 @@ class RiskAssessmentModel:
             'medium': 0.6,
             'high': 0.8
         }
+        # Fed continuously by wearable ingestion
+        self.anomaly_detector = get_anomaly_detector()
         
     async def assess_risk(self, 
                          symptoms: List[str], 
@@ -39,12 +42,23 @@ class RiskAssessmentModel:
                             patient_data: Dict[str, Any]) -> Dict[str, float]:
         """Process symptoms and patient data into risk factors"""
         # Implement risk factor processing logic
-        return {'risk_factor_1': 0.5}  # Placeholder
+        risk_factors = {'risk_factor_1': 0.5}  # Placeholder
+
+        # Active vitals anomalies, already computed as samples streamed in
+        patient_id = patient_data.get('patient_id')
+        if patient_id is not None:
+            risk_factors.update(self.anomaly_detector.risk_factors(int(patient_id)))
+        return risk_factors
         
     def _calculate_risk_scores(self, risk_factors: Dict[str, float]) -> Dict[str, float]:
         """Calculate risk scores from risk factors"""
         # Implement risk score calculation logic
-        return {'score_1': 0.7}  # Placeholder
+        risk_scores = {'score_1': 0.7}  # Placeholder
+
+        vitals = [value for name, value in risk_factors.items() if name.startswith('vitals_')]
+        if vitals:
+            risk_scores['vitals'] = max(vitals)
+        return risk_scores
         
     def _determine_risk_level(self, risk_scores: Dict[str, float]) -> str:
         """Determine overall risk level"""
@@ -0,0 +1,356 @@
+import numpy as np
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import sqlite3
+import threading
+import time
+from core.config import get_settings
+
+settings = get_settings()
+
+# Per-metric noise floor for z-scores, hard clinical alert limits, and whether
+# statistical deviations are meaningful (step counts jump with activity)
+METRIC_CONFIG: Dict[str, Dict[str, Any]] = {
+    "heart_rate": {"min_std": 2.0, "limits": (40.0, 150.0), "zscore": True},
+    "spo2": {"min_std": 0.5, "limits": (90.0, np.inf), "zscore": True},
+    "respiratory_rate": {"min_std": 1.0, "limits": (8.0, 30.0), "zscore": True},
+    "skin_temperature": {"min_std": 0.2, "limits": (-np.inf, 38.5), "zscore": True},
+    "steps": {"min_std": 5.0, "limits": (-np.inf, np.inf), "zscore": False}
+}
+
+# Tails tracked by the streaming quantile estimates
+QUANTILES = (0.05, 0.95)
+
+# Per-slot running state and the value a fresh slot starts with
+_STATE = {
+    "count": (np.int64, 0),
+    "mean": (np.float64, 0.0),  # Welford
+    "m2": (np.float64, 0.0),
+    "ewma": (np.float64, 0.0),
+    "ewm_var": (np.float64, 0.0),
+    "q_low": (np.float64, 0.0),
+    "q_high": (np.float64, 0.0),
+    "last_ts": (np.float64, -np.inf),
+    "severity": (np.float64, 0.0),
+    "anomaly_ts": (np.float64, -np.inf)
+}
+
+def _group_starts(keys: np.ndarray) -> np.ndarray:
+    return np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+class _AnomalyStore:
+    """Latest flag per (patient, metric) in a local SQLite file, so every
+    worker on the host sees anomalies detected by the one that ingested them"""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS vital_anomalies ("
+            "patient_id INTEGER NOT NULL, metric TEXT NOT NULL, "
+            "severity REAL NOT NULL, anomaly_ts REAL NOT NULL, "
+            "PRIMARY KEY (patient_id, metric))"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_vital_anomalies_ts ON vital_anomalies (anomaly_ts)"
+        )
+
+    def publish(self, rows: List[Tuple[int, str, float, float]], expired_before: float) -> None:
+        """Upsert (patient_id, metric, severity, anomaly_ts) rows, keeping the
+        newest flag when workers race, and drop flags that have aged out"""
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._connection.executemany(
+                    "INSERT INTO vital_anomalies (patient_id, metric, severity, anomaly_ts) "
+                    "VALUES (?, ?, ?, ?) ON CONFLICT(patient_id, metric) DO UPDATE SET "
+                    "severity = excluded.severity, anomaly_ts = excluded.anomaly_ts "
+                    "WHERE excluded.anomaly_ts >= vital_anomalies.anomaly_ts",
+                    rows
+                )
+                self._connection.execute("DELETE FROM vital_anomalies WHERE anomaly_ts < ?", (expired_before,))
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    def for_patient(self, patient_id: int, since: float) -> List[Tuple[str, float]]:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT metric, severity FROM vital_anomalies WHERE patient_id = ? AND anomaly_ts >= ?",
+                (patient_id, since)
+            ).fetchall()
+
+    def active(self, since: float) -> List[Tuple[int, str, float, float]]:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT patient_id, metric, severity, anomaly_ts FROM vital_anomalies "
+                "WHERE anomaly_ts >= ? ORDER BY severity DESC, patient_id, metric",
+                (since,)
+            ).fetchall()
+
+class StreamingAnomalyDetector:
+    """Online per-patient, per-metric baselines and anomaly flags.
+
+    State lives in flat NumPy arrays with one slot per (patient, metric), so
+    each sample costs O(1) and a tick updates every active patient in a few
+    vectorized operations. Each slot keeps Welford mean/variance, an EWMA
+    with exponentially weighted variance, and stochastic estimates of the
+    5th/95th percentiles. A sample is anomalous if it breaches the metric's
+    clinical limits, or (once warmed up) sits more than z_threshold EW
+    standard deviations from the EWMA. Anomalies stay active as risk
+    factors for `window` seconds.
+
+    Baselines are per process and only see the samples this worker
+    ingested. Flags are also published to a SQLite file at `store_path`
+    (VITALS_ANOMALY_STORE_PATH; empty keeps them in-process), which is what
+    risk_factors() and active_anomalies() read, so every worker on the host
+    reports them. Workers on other hosts need their own ingestion traffic.
+    """
+
+    def __init__(
+        self,
+        alpha: Optional[float] = None,
+        z_threshold: Optional[float] = None,
+        warmup: Optional[int] = None,
+        window: Optional[float] = None,
+        quantile_step: Optional[float] = None,
+        initial_patients: int = 1024,
+        store_path: Optional[str] = None
+    ):
+        # 0 is a meaningful value for most of these (e.g. warmup=0 scores
+        # from the second sample), so only None falls back to the settings
+        self.alpha = settings.VITALS_ANOMALY_ALPHA if alpha is None else alpha
+        self.z_threshold = settings.VITALS_ANOMALY_Z_THRESHOLD if z_threshold is None else z_threshold
+        self.warmup = settings.VITALS_ANOMALY_WARMUP if warmup is None else warmup
+        self.window = settings.VITALS_ANOMALY_WINDOW if window is None else window
+        self.quantile_step = (
+            settings.VITALS_ANOMALY_QUANTILE_STEP if quantile_step is None else quantile_step
+        )
+
+        self.metrics: Tuple[str, ...] = tuple(METRIC_CONFIG)
+        self._metric_index = {metric: i for i, metric in enumerate(self.metrics)}
+        self._min_std = np.array([METRIC_CONFIG[m]["min_std"] for m in self.metrics])
+        self._low = np.array([METRIC_CONFIG[m]["limits"][0] for m in self.metrics])
+        self._high = np.array([METRIC_CONFIG[m]["limits"][1] for m in self.metrics])
+        self._zscore = np.array([METRIC_CONFIG[m]["zscore"] for m in self.metrics])
+
+        self._rows: Dict[int, int] = {}
+        self._patient_ids = np.empty(initial_patients, dtype=np.int64)
+        self._state = {
+            name: np.full(initial_patients * len(self.metrics), fill, dtype=dtype)
+            for name, (dtype, fill) in _STATE.items()
+        }
+        self._lock = threading.Lock()
+        store_path = settings.VITALS_ANOMALY_STORE_PATH if store_path is None else store_path
+        self._store = _AnomalyStore(store_path) if store_path else None
+        self.stats = {"samples": 0, "ticks": 0, "rounds": 0, "anomalies": 0}
+
+    def update(self, series: Sequence[Tuple[Tuple[int, str], np.ndarray, np.ndarray]]) -> int:
+        """Fold a tick's worth of ((patient_id, metric), timestamps, values)
+        into the running state; returns the number of anomalous samples.
+
+        The recurrences are sequential within a series, so a tick costs one
+        vectorized round per sample of its longest series rather than per
+        sample overall: cheap for many patients with a few samples each,
+        but a series with thousands of samples in one tick (a backfill) runs
+        thousands of small rounds. The ingestor bounds this at
+        VITALS_BUFFER_CAPACITY samples per series per flush.
+        """
+        with self._lock:
+            slots, timestamps, values = self._flatten(series)
+            if not len(slots):
+                return 0
+
+            # Samples of one series must be applied in time order, so split
+            # the tick into rounds holding at most one sample per slot
+            order = np.lexsort((timestamps, slots))
+            slots, timestamps, values = slots[order], timestamps[order], values[order]
+            starts = _group_starts(slots)
+            rank = np.arange(len(slots)) - np.repeat(starts, np.diff(np.r_[starts, len(slots)]))
+            by_rank = np.argsort(rank, kind="stable")
+            bounds = np.searchsorted(rank[by_rank], np.arange(rank.max() + 2))
+
+            flagged = []
+            for r in range(len(bounds) - 1):
+                idx = by_rank[bounds[r]:bounds[r + 1]]
+                flagged.append(self._step(slots[idx], timestamps[idx], values[idx]))
+            flagged = np.concatenate(flagged)
+            anomalies = len(flagged)
+
+            self.stats["samples"] += len(slots)
+            self.stats["ticks"] += 1
+            self.stats["rounds"] += len(bounds) - 1
+            self.stats["anomalies"] += anomalies
+            published = [
+                (
+                    int(self._patient_ids[slot // len(self.metrics)]),
+                    self.metrics[slot % len(self.metrics)],
+                    float(self._state["severity"][slot]),
+                    float(self._state["anomaly_ts"][slot])
+                )
+                for slot in np.unique(flagged)
+            ]
+
+        if self._store is not None:
+            self._store.publish(published, time.time() - self.window)
+        return anomalies
+
+    def risk_factors(self, patient_id: int, now: Optional[float] = None) -> Dict[str, float]:
+        """Active anomaly severities (0.5-1.0) for a patient, keyed
+        "vitals_<metric>_anomaly"; O(metrics), no history is read"""
+        now = time.time() if now is None else now
+        if self._store is not None:
+            return {
+                f"vitals_{metric}_anomaly": severity
+                for metric, severity in self._store.for_patient(patient_id, now - self.window)
+            }
+        with self._lock:
+            row = self._rows.get(patient_id)
+            if row is None:
+                return {}
+            window = slice(row * len(self.metrics), (row + 1) * len(self.metrics))
+            active = self._state["anomaly_ts"][window] >= now - self.window
+            severity = self._state["severity"][window]
+            return {
+                f"vitals_{metric}_anomaly": float(severity[i])
+                for i, metric in enumerate(self.metrics) if active[i]
+            }
+
+    def active_anomalies(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Every (patient, metric) currently flagged, most severe first"""
+        now = time.time() if now is None else now
+        if self._store is not None:
+            return [
+                {"patient_id": patient_id, "metric": metric, "severity": severity, "last_anomaly": anomaly_ts}
+                for patient_id, metric, severity, anomaly_ts in self._store.active(now - self.window)
+            ]
+        with self._lock:
+            used = len(self._rows) * len(self.metrics)
+            flagged = np.flatnonzero(self._state["anomaly_ts"][:used] >= now - self.window)
+            flagged = flagged[np.argsort(-self._state["severity"][flagged], kind="stable")]
+            return [
+                {
+                    "patient_id": int(self._patient_ids[slot // len(self.metrics)]),
+                    "metric": self.metrics[slot % len(self.metrics)],
+                    "severity": float(self._state["severity"][slot]),
+                    "last_anomaly": float(self._state["anomaly_ts"][slot])
+                }
+                for slot in flagged
+            ]
+
+    def baseline(self, patient_id: int, metric: str) -> Dict[str, float]:
+        """Current running statistics of one series"""
+        with self._lock:
+            row = self._rows.get(patient_id)
+            if row is None or metric not in self._metric_index:
+                return {}
+            slot = row * len(self.metrics) + self._metric_index[metric]
+            state = {name: float(values[slot]) for name, values in self._state.items()}
+            count = state["count"]
+            return {
+                "count": count,
+                "mean": state["mean"],
+                "std": float(np.sqrt(state["m2"] / (count - 1))) if count > 1 else 0.0,
+                "ewma": state["ewma"],
+                "ewm_std": float(np.sqrt(state["ewm_var"])),
+                "p05": state["q_low"],
+                "p95": state["q_high"]
+            }
+
+    def _flatten(self, series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        slots, timestamps, values = [], [], []
+        for (patient_id, metric), series_timestamps, series_values in series:
+            metric_index = self._metric_index.get(metric)
+            if metric_index is None or not len(series_timestamps):
+                continue
+            slot = self._row(patient_id) * len(self.metrics) + metric_index
+            slots.append(np.full(len(series_timestamps), slot, dtype=np.int64))
+            timestamps.append(np.asarray(series_timestamps, dtype=np.float64))
+            values.append(np.asarray(series_values, dtype=np.float64))
+        if not slots:
+            empty = np.empty(0)
+            return empty.astype(np.int64), empty, empty
+        return np.concatenate(slots), np.concatenate(timestamps), np.concatenate(values)
+
+    def _row(self, patient_id: int) -> int:
+        row = self._rows.get(patient_id)
+        if row is None:
+            row = self._rows[patient_id] = len(self._rows)
+            if row == len(self._patient_ids):
+                self._grow()
+            self._patient_ids[row] = patient_id
+        return row
+
+    def _grow(self) -> None:
+        """Double capacity; slot indices stay valid since rows are appended"""
+        capacity = len(self._patient_ids) * 2
+        self._patient_ids = np.resize(self._patient_ids, capacity)
+        for name, (dtype, fill) in _STATE.items():
+            grown = np.full(capacity * len(self.metrics), fill, dtype=dtype)
+            grown[:len(self._state[name])] = self._state[name]
+            self._state[name] = grown
+
+    def _step(self, slots: np.ndarray, timestamps: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Score then absorb one sample for each of the given (distinct)
+        slots; returns the slots flagged by this round"""
+        state = self._state
+        # Out-of-order or replayed samples (e.g. after a failed flush) are ignored
+        fresh = timestamps > state["last_ts"][slots]
+        if not fresh.all():
+            slots, timestamps, values = slots[fresh], timestamps[fresh], values[fresh]
+        if not len(slots):
+            return slots
+
+        metric = slots % len(self.metrics)
+        count = state["count"][slots]
+        first = count == 0
+        ewma = np.where(first, values, state["ewma"][slots])
+        ewm_var = np.where(first, 0.0, state["ewm_var"][slots])
+        std = np.maximum(np.sqrt(ewm_var), self._min_std[metric])
+
+        # Score against the baseline before this sample moves it
+        z = np.abs(values - ewma) / std
+        breach = (values < self._low[metric]) | (values > self._high[metric])
+        deviation = (count >= self.warmup) & self._zscore[metric] & (z > self.z_threshold)
+        flagged = breach | deviation
+        if flagged.any():
+            severity = np.where(breach, 1.0, np.clip(z / (2 * self.z_threshold), 0.5, 1.0))
+            state["severity"][slots[flagged]] = severity[flagged]
+            state["anomaly_ts"][slots[flagged]] = timestamps[flagged]
+
+        # Welford
+        count = count + 1
+        delta = values - state["mean"][slots]
+        mean = state["mean"][slots] + delta / count
+        state["m2"][slots] += delta * (values - mean)
+        state["mean"][slots] = mean
+        state["count"][slots] = count
+
+        # EWMA with incremental exponentially weighted variance
+        diff = values - ewma
+        increment = self.alpha * diff
+        state["ewma"][slots] = ewma + increment
+        state["ewm_var"][slots] = (1 - self.alpha) * (ewm_var + diff * increment)
+
+        # Stochastic-approximation quantiles, step scaled to the series' spread
+        step = self.quantile_step * std
+        for name, tau in zip(("q_low", "q_high"), QUANTILES):
+            quantile = np.where(first, values, state[name][slots])
+            state[name][slots] = quantile + step * (tau - (values < quantile))
+
+        state["last_ts"][slots] = timestamps
+        return slots[flagged]
+
+_detector: Optional[StreamingAnomalyDetector] = None
+_detector_lock = threading.Lock()
+
+def get_anomaly_detector() -> StreamingAnomalyDetector:
+    """Process-wide detector shared by ingestion and risk assessment"""
+    global _detector
+    with _detector_lock:
+        if _detector is None:
+            _detector = StreamingAnomalyDetector()
+        return _detector
@@ -1,5 +1,12 @@
 from .patients import Patient
 from .diagnosis import Diagnosis
 from .medical_record import MedicalRecord
+from .diagnosis_terms import DiagnosisSymptom, DiagnosisCondition
+from .report_rollups import ConditionDailyCount, DiagnosisDailySummary, RollupCheckpoint
+from .vitals import VitalChunk, WearableSyncCursor
 
-__all__ = ['Patient', 'Diagnosis', 'MedicalRecord']
\ No newline at end of file
+__all__ = [
+    'Patient', 'Diagnosis', 'MedicalRecord', 'DiagnosisSymptom', 'DiagnosisCondition',
+    'ConditionDailyCount', 'DiagnosisDailySummary', 'RollupCheckpoint', 'VitalChunk',
+    'WearableSyncCursor'
+]
\ No newline at end of file
@@ -1,20 +1,38 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Float
+from sqlalchemy import Column, Boolean, Integer, String, DateTime, ForeignKey, JSON, Float, Index, false, text
 from sqlalchemy.orm import relationship
 from core.database import Base
 from datetime import datetime
 
 class Diagnosis(Base):
     __tablename__ = "diagnoses"
+    __table_args__ = (
+        # Serves patient timelines and keyset pagination on (timestamp, id)
+        Index("ix_diagnoses_patient_id_timestamp", "patient_id", "timestamp", "id"),
+        # Diagnoses the report rollups have not folded in yet
+        Index(
+            "ix_diagnoses_rollup_pending", "id",
+            postgresql_where=text("NOT rolled_up"), sqlite_where=text("NOT rolled_up")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"))
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    medical_record_id = Column(Integer, ForeignKey("medical_records.id"))
+    timestamp = Column(DateTime, nullable=False, default=datetime.utcnow)  # keyset pagination needs it set
     symptoms = Column(JSON)  # List of symptoms
     diagnosis = Column(JSON)  # Diagnosis results
     confidence_score = Column(Float)
     risk_level = Column(String(20))
     recommendations = Column(JSON)  # List of recommendations
     notes = Column(String(500))
+    # Set by the report rollup job once the row is counted; later edits are not re-counted
+    rolled_up = Column(Boolean, nullable=False, default=False, server_default=false())
+
+    # Columns utils.serialization.dumps emits, matching to_dict()
+    __serialize__ = (
+        "id", "patient_id", "medical_record_id", "timestamp", "symptoms", "diagnosis",
+        "confidence_score", "risk_level", "recommendations", "notes"
+    )
 
     # Relationships
     patient = relationship("Patient", back_populates="diagnoses")
@@ -24,6 +42,7 @@ class Diagnosis(Base):
         return {
             "id": self.id,
             "patient_id": self.patient_id,
+            "medical_record_id": self.medical_record_id,
             "timestamp": self.timestamp.isoformat(),
             "symptoms": self.symptoms,
             "diagnosis": self.diagnosis,
@@ -0,0 +1,111 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Index, event, insert, delete, inspect
+from sqlalchemy.engine import Connection
+from core.database import Base
+from typing import List, Dict, Any, Iterable, Tuple
+from .diagnosis import Diagnosis
+
+class DiagnosisSymptom(Base):
+    """One row per (diagnosis, normalized symptom), written alongside the diagnosis"""
+    __tablename__ = "diagnosis_symptoms"
+    __table_args__ = (
+        Index("ix_diagnosis_symptoms_symptom_timestamp", "symptom", "timestamp"),
+    )
+
+    diagnosis_id = Column(Integer, ForeignKey("diagnoses.id", ondelete="CASCADE"), primary_key=True)
+    symptom = Column(String(100), primary_key=True)
+    patient_id = Column(Integer, index=True)
+    timestamp = Column(DateTime)
+
+class DiagnosisCondition(Base):
+    """One row per (diagnosis, normalized predicted condition)"""
+    __tablename__ = "diagnosis_conditions"
+    __table_args__ = (
+        Index("ix_diagnosis_conditions_condition_timestamp", "condition", "timestamp"),
+    )
+
+    diagnosis_id = Column(Integer, ForeignKey("diagnoses.id", ondelete="CASCADE"), primary_key=True)
+    condition = Column(String(200), primary_key=True)
+    probability = Column(Float)
+    patient_id = Column(Integer, index=True)
+    timestamp = Column(DateTime)
+
+def normalize_term(term: str) -> str:
+    """Canonical form used for storage and lookups"""
+    return " ".join(term.lower().split())
+
+def diagnosis_term_rows(diagnosis: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Split a diagnosis row into symptom and condition association rows"""
+    base = {
+        "diagnosis_id": diagnosis["id"],
+        "patient_id": diagnosis.get("patient_id"),
+        "timestamp": diagnosis.get("timestamp")
+    }
+
+    symptoms = list(dict.fromkeys(
+        normalize_term(symptom)[:100]
+        for symptom in diagnosis.get("symptoms") or []
+        if isinstance(symptom, str) and symptom.strip()
+    ))
+
+    conditions = {}
+    for result in diagnosis.get("diagnosis") or []:
+        if isinstance(result, dict):
+            name, probability = result.get("condition"), result.get("probability")
+        else:
+            name, probability = result, None
+        if isinstance(name, str) and name.strip():
+            key = normalize_term(name)[:200]
+            if key not in conditions or (probability or 0) > (conditions[key] or 0):
+                conditions[key] = probability
+
+    symptom_rows = [dict(base, symptom=symptom) for symptom in symptoms]
+    condition_rows = [
+        dict(base, condition=condition, probability=probability)
+        for condition, probability in conditions.items()
+    ]
+    return symptom_rows, condition_rows
+
+def index_diagnosis_terms(connection: Connection, diagnoses: Iterable[Dict[str, Any]]) -> None:
+    """Write association rows for already-inserted diagnoses in two bulk statements"""
+    symptom_rows, condition_rows = [], []
+    for diagnosis in diagnoses:
+        symptoms, conditions = diagnosis_term_rows(diagnosis)
+        symptom_rows.extend(symptoms)
+        condition_rows.extend(conditions)
+
+    if symptom_rows:
+        connection.execute(insert(DiagnosisSymptom.__table__), symptom_rows)
+    if condition_rows:
+        connection.execute(insert(DiagnosisCondition.__table__), condition_rows)
+
+def clear_diagnosis_terms(connection: Connection, diagnosis_ids: List[int]) -> None:
+    """Remove association rows so they can be rebuilt"""
+    for model in (DiagnosisSymptom, DiagnosisCondition):
+        connection.execute(
+            delete(model.__table__).where(model.__table__.c.diagnosis_id.in_(diagnosis_ids))
+        )
+
+def _as_row(target: Diagnosis) -> Dict[str, Any]:
+    return {
+        "id": target.id,
+        "patient_id": target.patient_id,
+        "timestamp": target.timestamp,
+        "symptoms": target.symptoms,
+        "diagnosis": target.diagnosis
+    }
+
+@event.listens_for(Diagnosis, "after_insert")
+def _index_inserted_diagnosis(mapper, connection, target):
+    """Keep the association tables in step with ORM inserts"""
+    index_diagnosis_terms(connection, [_as_row(target)])
+
+@event.listens_for(Diagnosis, "after_update")
+def _reindex_updated_diagnosis(mapper, connection, target):
+    """Rebuild association rows when the indexed JSON columns change"""
+    state = inspect(target)
+    if any(
+        state.attrs[name].history.has_changes()
+        for name in ("symptoms", "diagnosis", "timestamp", "patient_id")
+    ):
+        clear_diagnosis_terms(connection, [target.id])
+        index_diagnosis_terms(connection, [_as_row(target)])
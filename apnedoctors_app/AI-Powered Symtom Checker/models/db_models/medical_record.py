@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Table
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Float, Index
 from sqlalchemy.orm import relationship
 from core.database import Base
 from datetime import datetime
 
 class MedicalRecord(Base):
     __tablename__ = "medical_records"
+    __table_args__ = (
+        Index("ix_medical_records_patient_id_updated_at", "patient_id", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"))
@@ -21,6 +24,12 @@ class MedicalRecord(Base):
     height = Column(Float)  # in cm
     weight = Column(Float)  # in kg
     blood_type = Column(String(5))
+
+    # Columns utils.serialization.dumps emits, matching to_dict()
+    __serialize__ = (
+        "id", "patient_id", "created_at", "updated_at", "allergies", "medications",
+        "chronic_conditions", "family_history", "height", "weight", "blood_type"
+    )
     
     # Relationships
     patient = relationship("Patient", back_populates="medical_records")
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Date, Boolean
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean
 from sqlalchemy.orm import relationship
 from core.database import Base
-from datetime import date
+from datetime import date, datetime
 
 class Patient(Base):
     __tablename__ = "patients"
@@ -15,6 +15,13 @@ class Patient(Base):
     phone_number = Column(String(20))
     address = Column(String(200))
     is_active = Column(Boolean, default=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Columns utils.serialization.dumps emits, matching to_dict()
+    __serialize__ = (
+        "id", "first_name", "last_name", "email", "date_of_birth", "gender",
+        "phone_number", "address", "is_active"
+    )
 
     # Relationships
     medical_records = relationship("MedicalRecord", back_populates="patient")
@@ -25,4 +32,17 @@ class Patient(Base):
         today = date.today()
         return today.year - self.date_of_birth.year - (
             (today.month, today.day) < (self.date_of_birth.month, self.date_of_birth.day)
-        )
\ No newline at end of file
+        )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "first_name": self.first_name,
+            "last_name": self.last_name,
+            "email": self.email,
+            "date_of_birth": self.date_of_birth.isoformat(),
+            "gender": self.gender,
+            "phone_number": self.phone_number,
+            "address": self.address,
+            "is_active": self.is_active
+        }
\ No newline at end of file
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, Float
+from core.database import Base
+from datetime import datetime
+
+class ConditionDailyCount(Base):
+    """Diagnoses per predicted condition per day"""
+    __tablename__ = "report_condition_daily"
+
+    day = Column(Date, primary_key=True)
+    condition = Column(String(200), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class DiagnosisDailySummary(Base):
+    """Diagnoses per risk level per day, with running confidence totals"""
+    __tablename__ = "report_diagnosis_daily"
+
+    day = Column(Date, primary_key=True)
+    risk_level = Column(String(20), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    confidence_sum = Column(Float, nullable=False, default=0.0)
+    confidence_count = Column(Integer, nullable=False, default=0)
+
+class RollupCheckpoint(Base):
+    """Rollup progress; its row is locked while a batch is applied"""
+    __tablename__ = "report_rollup_checkpoints"
+
+    name = Column(String(50), primary_key=True)
+    folded = Column(Integer, nullable=False, default=0)  # diagnoses counted so far
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, BigInteger, Boolean, Integer, String, DateTime, Float, LargeBinary, Index, false
+from core.database import Base
+from datetime import datetime
+
+class VitalChunk(Base):
+    """Compressed, delta-encoded block of one patient's metric at one tier.
+
+    Tier "raw" holds (timestamp, value) samples; "minute", "hour" and "day"
+    hold per-bucket min/max/sum/count rollups computed at write time.
+    Times in the payload are epoch milliseconds. Chunks are append-only;
+    overlapping buckets are merged when read.
+    """
+    __tablename__ = "vital_chunks"
+    __table_args__ = (
+        Index("ix_vital_chunks_series_tier_start", "patient_id", "metric", "tier", "start_time"),
+        Index("ix_vital_chunks_compacted_end", "compacted", "end_time"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    # No foreign key: append-only, high-volume stream written in bulk
+    patient_id = Column(Integer, nullable=False)
+    metric = Column(String(20), nullable=False)
+    tier = Column(String(10), nullable=False)
+    start_time = Column(DateTime, nullable=False)  # first sample/bucket
+    end_time = Column(DateTime, nullable=False)  # last sample/bucket start
+    count = Column(Integer, nullable=False)  # rows (samples or buckets) in payload
+    compacted = Column(Boolean, nullable=False, default=False, server_default=false())  # merged day chunk
+    payload = Column(LargeBinary, nullable=False)
+
+class WearableSyncCursor(Base):
+    """A patient's linked wearable account and how far it has been synced"""
+    __tablename__ = "wearable_sync_cursors"
+
+    patient_id = Column(Integer, primary_key=True)
+    device_type = Column(String(20), primary_key=True)
+    high_water = Column(Float)  # newest provider sample timestamp ingested (epoch seconds)
+    last_synced_at = Column(DateTime)
+    last_error = Column(String(500))
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -2,5 +2,9 @@ from .ai_service import AIService
 from .diagnosis_service import DiagnosisService
 from .medical_api_service import MedicalAPIService
 from .wearable_service import WearableService
+from .diagnosis_writer import DiagnosisBatchWriter, get_diagnosis_writer
 
-__all__ = ['AIService', 'DiagnosisService', 'MedicalAPIService', 'WearableService']
\ No newline at end of file
+__all__ = [
+    'AIService', 'DiagnosisService', 'MedicalAPIService', 'WearableService',
+    'DiagnosisBatchWriter', 'get_diagnosis_writer'
+]
\ No newline at end of file
@@ -1,5 +1,7 @@
-from models.ai_models import BERTSymptomClassifier, DiagnosisModel, RiskAssessmentModel
+from models.ai_models import BERTSymptomClassifier, RiskAssessmentModel
 from core.config import get_settings
+from core.model_registry import get_model_registry
+from services.diagnosis_cascade import DIAGNOSIS_MODEL
 from typing import List, Dict, Any
 import logging
 
@@ -11,9 +13,6 @@ class AIService:
         self.symptom_classifier = BERTSymptomClassifier(
             model_path=settings.MODEL_PATHS["symptom_classifier"]
         )
-        self.diagnosis_model = DiagnosisModel(
-            model_path=settings.MODEL_PATHS["diagnosis_model"]
-        )
         self.risk_model = RiskAssessmentModel(
             model_path=settings.MODEL_PATHS["risk_assessment"]
         )
@@ -30,7 +29,8 @@ class AIService:
     async def get_diagnosis(self, symptoms: List[str]) -> Dict[str, Any]:
         """Generate diagnosis from symptoms"""
         try:
-            diagnosis = await self.diagnosis_model.predict(symptoms)
+            # Looked up per call so a hot-swapped version is used straight away
+            diagnosis = await get_model_registry().current(DIAGNOSIS_MODEL).predict(symptoms)
             return diagnosis
         except Exception as e:
             logger.error(f"Diagnosis generation failed: {str(e)}")
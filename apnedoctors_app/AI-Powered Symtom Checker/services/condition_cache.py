@@ -0,0 +1,188 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from core.config import get_settings
+from utils.singleflight import SingleFlight
+from .resilience import deadline_scope
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CacheEntry:
+    value: Dict[str, Any]
+    expires_at: float  # fresh until
+    stale_until: float  # may be served (while refreshing) until
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+    def is_servable(self, now: float) -> bool:
+        return now < self.stale_until
+
+class _SQLiteStore:
+    """Persistent second tier; survives restarts and is shared by workers on one host"""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS condition_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, stale_until REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at, stale_until FROM condition_cache WHERE key = ?",
+                (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(json.loads(row[0]), row[1], row[2])
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO condition_cache VALUES (?, ?, ?, ?)",
+                (key, json.dumps(entry.value), entry.expires_at, entry.stale_until)
+            )
+
+    def delete_expired(self, now: float) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM condition_cache WHERE stale_until < ?", (now,))
+
+class ConditionInfoCache:
+    """Two-tier (in-process LRU + SQLite) cache with stale-while-revalidate"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None,
+        negative_ttl: Optional[float] = None
+    ):
+        self.max_entries = max_entries or settings.CONDITION_CACHE_SIZE
+        self.ttl = ttl or settings.CONDITION_CACHE_TTL
+        self.stale_ttl = stale_ttl or settings.CONDITION_CACHE_STALE_TTL
+        self.negative_ttl = negative_ttl or settings.CONDITION_CACHE_NEGATIVE_TTL
+
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._store = _SQLiteStore(path or settings.CONDITION_CACHE_PATH)
+        self._flights = SingleFlight()
+        self._refreshes: Set[asyncio.Task] = set()
+        self.stats = {"memory_hits": 0, "store_hits": 0, "stale_hits": 0, "misses": 0}
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Return the cached value, fetching upstream at most once per key at a time"""
+        now = time.time()
+        entry = self._memory_get(key)
+        if entry is not None:
+            self.stats["memory_hits"] += 1
+        else:
+            entry = await asyncio.to_thread(self._store.get, key)
+            if entry is not None:
+                self.stats["store_hits"] += 1
+                self._memory_set(key, entry)
+
+        if entry is not None and entry.is_fresh(now):
+            return entry.value
+
+        if entry is not None and entry.is_servable(now):
+            self.stats["stale_hits"] += 1
+            self._refresh_in_background(key, fetch)
+            return entry.value
+
+        self.stats["misses"] += 1
+        return await self._flights.do(key, lambda: self._fetch_and_store(key, fetch))
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """Store a value in both tiers; empty values get the short negative TTL"""
+        now = time.time()
+        if ttl is None:
+            ttl = self.ttl if value else self.negative_ttl
+        entry = CacheEntry(value, now + ttl, now + ttl + (self.stale_ttl if value else 0))
+        self._memory_set(key, entry)
+        await asyncio.to_thread(self._store.set, key, entry)
+
+    async def warm(
+        self,
+        keys: Iterable[str],
+        fetch_for: Callable[[str], Awaitable[Dict[str, Any]]],
+        concurrency: int = 8
+    ) -> int:
+        """Load keys that are missing or expired; returns how many were fetched"""
+        semaphore = asyncio.Semaphore(concurrency)
+        now = time.time()
+
+        async def warm_one(key: str) -> bool:
+            entry = self._memory_get(key) or await asyncio.to_thread(self._store.get, key)
+            if entry is not None and entry.is_fresh(now):
+                self._memory_set(key, entry)
+                return False
+            async with semaphore:
+                await self._flights.do(key, lambda: self._fetch_and_store(key, lambda: fetch_for(key)))
+            return True
+
+        results = await asyncio.gather(*(warm_one(key) for key in keys), return_exceptions=True)
+        await asyncio.to_thread(self._store.delete_expired, now)
+        return sum(1 for result in results if result is True)
+
+    async def _fetch_and_store(self, key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        value = await fetch()
+        await self.set(key, value)
+        return value
+
+    def _refresh_in_background(self, key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> None:
+        if self._flights.in_flight(key):
+            return
+        task = asyncio.ensure_future(self._refresh(key, fetch))
+        self._refreshes.add(task)
+        task.add_done_callback(self._refreshes.discard)
+
+    async def _refresh(self, key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> None:
+        try:
+            # Not bound by the deadline of the request that noticed the stale entry
+            with deadline_scope(None):
+                # Keep serving the stale value if the refresh comes back empty
+                value = await self._flights.do(key, fetch)
+            if value:
+                await self.set(key, value)
+        except Exception as e:
+            logger.error(f"Condition cache refresh for {key} failed: {str(e)}")
+
+    def _memory_get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+        return entry
+
+    def _memory_set(self, key: str, entry: CacheEntry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+_cache: Optional[ConditionInfoCache] = None
+
+def get_condition_cache() -> ConditionInfoCache:
+    """Process-wide condition information cache"""
+    global _cache
+    if _cache is None:
+        _cache = ConditionInfoCache()
+    return _cache
@@ -0,0 +1,163 @@
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import logging
+import threading
+from core.config import get_settings
+from core.ai_models.disease_predictor import DiseasePredictor
+from core.metrics import DIAGNOSIS_CASCADE_DECISIONS
+from core.model_registry import ModelArtifact, get_model_registry
+from models.ai_models import DiagnosisModel
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+ACCEPTED = "accepted"
+LOW_CONFIDENCE = "low_confidence"
+OUT_OF_VOCABULARY = "out_of_vocabulary"
+CLASSIFIER_UNAVAILABLE = "classifier_unavailable"
+CLASSIFIER_ERROR = "classifier_error"
+
+DIAGNOSIS_MODEL = "diagnosis_model"
+
+def load_diagnosis_model(artifact: ModelArtifact) -> DiagnosisModel:
+    return DiagnosisModel.from_artifact(artifact, max_diagnoses=settings.MODEL_PARAMS["diagnosis_model"]["max_diagnoses"])
+
+async def warm_up_diagnosis_model(model: DiagnosisModel) -> None:
+    """Run a few predictions so a new version is checked and its first
+    real request doesn't pay for lazy initialisation"""
+    if not model.has_vocabulary:
+        raise ValueError("Model has no symptom/condition vocabulary")
+    samples = list(model.symptom_index)[:3]
+    for _ in range(settings.MODEL_WARMUP_RUNS):
+        result = await model.predict(samples)
+        if len(result["confidence_scores"][0]) != len(model.conditions):
+            raise ValueError("Model outputs don't match the conditions in its manifest")
+
+get_model_registry().register(DIAGNOSIS_MODEL, load_diagnosis_model, warm_up_diagnosis_model)
+
+class DiagnosisCascade:
+    """The cheap DiagnosisModel classifier first, BioGPT only when it is unsure.
+
+    A request escalates to the generative DiseasePredictor when the top
+    class probability is below the confidence threshold, when fewer than
+    `min_coverage` of its symptoms are in the classifier's vocabulary
+    (checked before the classifier runs), or when there is no usable
+    classifier: none loaded, or one without a symptom/condition
+    vocabulary. The generator is loaded on the first escalation.
+
+    `classifier` may be replaced at any time by a model hot swap; each
+    request reads it once and finishes on that instance.
+    """
+
+    def __init__(
+        self,
+        classifier: Optional[Any],
+        generator_factory: Callable[[], Any],
+        threshold: Optional[float] = None,
+        min_coverage: Optional[float] = None
+    ):
+        self.classifier = classifier
+        self.generator_factory = generator_factory
+        self.threshold = threshold if threshold is not None else settings.MODEL_PARAMS["diagnosis_model"]["confidence_threshold"]
+        self.min_coverage = min_coverage if min_coverage is not None else settings.CASCADE_MIN_COVERAGE
+        self._generator = None
+        self._generator_lock = threading.Lock()
+        self.outcomes: Dict[str, int] = {}
+
+    def gate(self, coverage: float, top_probability: Optional[float] = None) -> Optional[str]:
+        """Escalation reason for a request, or None to keep the classifier's answer.
+        Call with only `coverage` to decide whether the classifier should run at all."""
+        if coverage < self.min_coverage:
+            return OUT_OF_VOCABULARY
+        if top_probability is not None and top_probability < self.threshold:
+            return LOW_CONFIDENCE
+        return None
+
+    async def diagnose(self, symptoms: List[str]) -> Dict[str, Any]:
+        """Diagnoses from whichever model answered, with the reason for escalating"""
+        classifier = self.classifier
+        if classifier is None or not classifier.has_vocabulary:
+            # Without a vocabulary its outputs can't be mapped to conditions
+            reason = CLASSIFIER_UNAVAILABLE
+        else:
+            reason = self.gate(classifier.coverage(symptoms))
+        confidence = None
+        if reason is None:
+            try:
+                result = await classifier.predict(symptoms)
+                confidence = result["top_probability"]
+                reason = self.gate(1.0, confidence)
+                if reason is None:
+                    self._record(ACCEPTED)
+                    return {
+                        "diagnoses": result["diagnoses"],
+                        "model": DIAGNOSIS_MODEL,
+                        "model_version": classifier.version,
+                        "confidence": confidence,
+                        "escalation_reason": None
+                    }
+            except ValueError as e:
+                logger.error(f"Diagnosis classifier failed, escalating: {str(e)}")
+                reason = CLASSIFIER_ERROR
+
+        self._record(reason)
+        generator = await self._get_generator()
+        generated = await generator.predict_diseases(symptoms)
+        return {
+            "diagnoses": [{"condition": text, "probability": None} for text in generated],
+            "model": "biogpt",
+            "model_version": None,
+            "confidence": confidence,
+            "escalation_reason": reason
+        }
+
+    async def _get_generator(self):
+        if self._generator is None:
+            await asyncio.to_thread(self._load_generator)
+        return self._generator
+
+    def _load_generator(self) -> None:
+        with self._generator_lock:
+            if self._generator is None:
+                self._generator = self.generator_factory()
+
+    def _record(self, outcome: str) -> None:
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        DIAGNOSIS_CASCADE_DECISIONS.labels(outcome).inc()
+
+    def metrics(self) -> Dict[str, Any]:
+        total = sum(self.outcomes.values())
+        escalated = total - self.outcomes.get(ACCEPTED, 0)
+        return {
+            "threshold": self.threshold,
+            "min_coverage": self.min_coverage,
+            "requests": total,
+            "escalation_rate": escalated / total if total else 0.0,
+            "outcomes": dict(self.outcomes),
+            "classifier_version": getattr(self.classifier, "version", None),
+            "generator_loaded": self._generator is not None
+        }
+
+_cascade: Optional[DiagnosisCascade] = None
+_cascade_lock = threading.Lock()
+
+def get_diagnosis_cascade() -> DiagnosisCascade:
+    """Process-wide cascade over the registry's active diagnosis model, following
+    its hot swaps; every request escalates if no version can be loaded"""
+    global _cascade
+    with _cascade_lock:
+        if _cascade is None:
+            registry = get_model_registry()
+            try:
+                classifier = registry.current(DIAGNOSIS_MODEL)
+            except (LookupError, ValueError) as e:
+                logger.error(f"Diagnosis classifier unavailable, cascade will always escalate: {str(e)}")
+                classifier = None
+            cascade = DiagnosisCascade(classifier, DiseasePredictor)
+            registry.on_activate(DIAGNOSIS_MODEL, lambda model: setattr(cascade, "classifier", model))
+            _cascade = cascade
+        return _cascade
+
+def cascade_metrics() -> Optional[Dict[str, Any]]:
+    """Escalation counters, without loading the models if nothing used them yet"""
+    return _cascade.metrics() if _cascade is not None else None
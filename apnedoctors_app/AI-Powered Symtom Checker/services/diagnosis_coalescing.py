@@ -0,0 +1,123 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import hashlib
+import logging
+import re
+import time
+import orjson
+from core.config import get_settings
+from core.metrics import DIAGNOSIS_INFERENCES_SAVED
+from utils.singleflight import SingleFlight
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+class InvalidIdempotencyKey(ValueError):
+    """The Idempotency-Key header is empty or too long"""
+
+class IdempotencyConflict(Exception):
+    """The Idempotency-Key was already used for a different request"""
+
+def request_fingerprint(text: str, patient_info: Dict[str, Any]) -> str:
+    """Identity of a diagnosis request: case- and whitespace-insensitive
+    text plus patient_info with its keys in canonical order"""
+    normalized = re.sub(r"\s+", " ", text).strip().casefold()
+    payload = orjson.dumps([normalized, patient_info], option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return hashlib.sha256(payload).hexdigest()
+
+class _IdempotencyRecord:
+    __slots__ = ("fingerprint", "result", "expires_at")
+
+    def __init__(self, fingerprint: str, expires_at: float):
+        self.fingerprint = fingerprint
+        self.result: Optional[Dict[str, Any]] = None
+        self.expires_at = expires_at
+
+class DiagnosisCoalescer:
+    """Runs each distinct diagnosis request once, however often it arrives.
+
+    Concurrent requests with the same fingerprint share one in-flight
+    pipeline run and all receive its result or its exception. Requests
+    with an Idempotency-Key (scoped to the client) additionally get the
+    stored result of a completed run for IDEMPOTENCY_KEY_TTL seconds;
+    failed runs are not stored, so retrying them runs the pipeline again.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_keys: Optional[int] = None):
+        self.ttl = ttl or settings.IDEMPOTENCY_KEY_TTL
+        self.max_keys = max_keys or settings.IDEMPOTENCY_MAX_KEYS
+        self._flights = SingleFlight()
+        self._records: "OrderedDict[Tuple[str, str], _IdempotencyRecord]" = OrderedDict()
+        self.replayed = 0
+
+    async def diagnose(
+        self,
+        text: str,
+        patient_info: Dict[str, Any],
+        run: Callable[[], Awaitable[Dict[str, Any]]],
+        client: str = "",
+        idempotency_key: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Result of run() for this request and whether it is a stored replay"""
+        fingerprint = request_fingerprint(text, patient_info)
+
+        record = None
+        if idempotency_key is not None:
+            if not idempotency_key or len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+                raise InvalidIdempotencyKey(f"Idempotency-Key must be 1 to {MAX_IDEMPOTENCY_KEY_LENGTH} characters")
+            record = self._reserve((client, idempotency_key), fingerprint)
+            if record.result is not None:
+                self.replayed += 1
+                DIAGNOSIS_INFERENCES_SAVED.labels("idempotent_replay").inc()
+                return record.result, True
+
+        if self._flights.in_flight(fingerprint):
+            DIAGNOSIS_INFERENCES_SAVED.labels("coalesced").inc()
+        try:
+            result = await self._flights.do(fingerprint, run)
+        except BaseException:
+            if record is not None and record.result is None:
+                self._release((client, idempotency_key), record)
+            raise
+
+        if record is not None:
+            record.result = result
+        return result, False
+
+    def _reserve(self, key: Tuple[str, str], fingerprint: str) -> _IdempotencyRecord:
+        now = time.monotonic()
+        record = self._records.get(key)
+        if record is not None and record.expires_at <= now:
+            del self._records[key]
+            record = None
+        if record is None:
+            record = self._records[key] = _IdempotencyRecord(fingerprint, now + self.ttl)
+            while len(self._records) > self.max_keys:
+                self._records.popitem(last=False)
+        elif record.fingerprint != fingerprint:
+            raise IdempotencyConflict("Idempotency-Key was already used with a different request")
+        self._records.move_to_end(key)
+        return record
+
+    def _release(self, key: Tuple[str, str], record: _IdempotencyRecord) -> None:
+        if self._records.get(key) is record:
+            del self._records[key]
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "executions": self._flights.executions,
+            "coalesced": self._flights.coalesced,
+            "replayed": self.replayed,
+            "idempotency_keys": len(self._records)
+        }
+
+_coalescer: Optional[DiagnosisCoalescer] = None
+
+def get_diagnosis_coalescer() -> DiagnosisCoalescer:
+    """Process-wide diagnosis coalescer"""
+    global _coalescer
+    if _coalescer is None:
+        _coalescer = DiagnosisCoalescer()
+    return _coalescer
@@ -1,7 +1,10 @@
 from .ai_service import AIService
 from .medical_api_service import MedicalAPIService
+from .diagnosis_writer import get_diagnosis_writer
+from core.metrics import stage_timer
 from models.db_models import Diagnosis, Patient
 from sqlalchemy.orm import Session
+from datetime import datetime
 from typing import List, Dict, Any
 import logging
 
@@ -21,7 +24,8 @@ class DiagnosisService:
         """Create a new diagnosis for a patient"""
         try:
             # Get patient
-            patient = self.db.query(Patient).filter(Patient.id == patient_id).first()
+            with stage_timer("db"):
+                patient = self.db.query(Patient).filter(Patient.id == patient_id).first()
             if not patient:
                 raise ValueError("Patient not found")
 
@@ -37,21 +41,31 @@ class DiagnosisService:
             )
             
             # Create diagnosis record
-            diagnosis = Diagnosis(
-                patient_id=patient_id,
-                symptoms=symptoms['symptoms'],
-                diagnosis=diagnosis_result['diagnoses'],
-                confidence_score=diagnosis_result['confidence_scores'][0],
-                recommendations=medical_info.get('recommendations', [])
-            )
-            
-            self.db.add(diagnosis)
-            self.db.commit()
-            self.db.refresh(diagnosis)
-            
-            return diagnosis.to_dict()
+            record = {
+                "patient_id": patient_id,
+                "timestamp": datetime.utcnow(),
+                "symptoms": symptoms['symptoms'],
+                "diagnosis": diagnosis_result['diagnoses'],
+                "confidence_score": diagnosis_result['confidence_scores'][0],
+                "recommendations": medical_info.get('recommendations', [])
+            }
+
+            # Committed with other requests' diagnoses in one batch; the
+            # writer invalidates the patient's cached history afterwards
+            with stage_timer("db"):
+                diagnosis_id = await get_diagnosis_writer().write(record)
+
+            return Diagnosis(id=diagnosis_id, **record).to_dict()
             
         except Exception as e:
             logger.error(f"Diagnosis creation failed: {str(e)}")
             self.db.rollback()
+            raise
+
+    def import_diagnoses(self, records: List[Dict[str, Any]]) -> List[int]:
+        """Bulk persist pre-computed diagnoses and return their IDs"""
+        try:
+            return get_diagnosis_writer().write_many(records)
+        except Exception as e:
+            logger.error(f"Diagnosis import failed: {str(e)}")
             raise
\ No newline at end of file
@@ -0,0 +1,221 @@
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.orm import Session
+from concurrent.futures import Future
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Callable, Tuple
+import asyncio
+import atexit
+import threading
+import logging
+from core.config import get_settings
+from core.database import SessionLocal
+from core.response_cache import invalidate_patient
+from models.db_models import Diagnosis
+from models.db_models.diagnosis_terms import index_diagnosis_terms
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# "strict" waits for the WAL fsync on every batch commit; "relaxed" lets
+# PostgreSQL acknowledge the commit before the fsync (synchronous_commit=off),
+# trading the last few hundred milliseconds of writes on a crash for throughput.
+DURABILITY_MODES = ("strict", "relaxed")
+
+# Keeps multi-row INSERT statements well below PostgreSQL's bind parameter limit
+MAX_ROWS_PER_STATEMENT = 1000
+
+# rolled_up is bookkeeping for the report rollups and starts at its default
+WRITABLE_COLUMNS = tuple(
+    column.name for column in Diagnosis.__table__.columns if column.name not in ("id", "rolled_up")
+)
+
+class DiagnosisBatchWriter:
+    """Buffered bulk writer for Diagnosis records.
+
+    add() queues fire-and-forget rows that are flushed every flush_interval
+    or once batch_size are waiting. write() wakes the flusher at once, so an
+    awaited write costs a single commit when the writer is idle; writes that
+    arrive while a commit is in progress share the next one. A
+    flush_interval of 0 flushes as soon as anything is queued.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        durability: Optional[str] = None
+    ):
+        self.session_factory = session_factory
+        self.batch_size = settings.DIAGNOSIS_BATCH_SIZE if batch_size is None else batch_size
+        self.flush_interval = settings.DIAGNOSIS_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.durability = settings.DIAGNOSIS_WRITE_DURABILITY if durability is None else durability
+
+        if self.durability not in DURABILITY_MODES:
+            raise ValueError(f"Unsupported durability mode: {self.durability}")
+
+        self._buffer: List[Tuple[Dict[str, Any], Future]] = []
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name="diagnosis-batch-writer",
+            daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def add(self, record: Dict[str, Any]) -> Future:
+        """Queue a diagnosis; the returned future resolves to its generated ID"""
+        row = self._normalize(record)
+        future: Future = Future()
+
+        with self._buffer_lock:
+            if self._closed:
+                raise RuntimeError("Diagnosis writer is closed")
+            self._buffer.append((row, future))
+            buffered = len(self._buffer)
+
+        if buffered >= self.batch_size or not self.flush_interval:
+            self._wakeup.set()
+
+        return future
+
+    async def write(self, record: Dict[str, Any]) -> int:
+        """Queue a diagnosis and wait until its batch is committed"""
+        future = self.add(record)
+        # Someone is waiting on this row: don't hold it for the interval timer
+        self._wakeup.set()
+        return await asyncio.wrap_future(future)
+
+    def write_many(self, records: List[Dict[str, Any]]) -> List[int]:
+        """Persist records immediately in bulk, bypassing the buffer"""
+        rows = [self._normalize(record) for record in records]
+        ids = []
+        for start in range(0, len(rows), MAX_ROWS_PER_STATEMENT):
+            ids.extend(self._persist(rows[start:start + MAX_ROWS_PER_STATEMENT]))
+        return ids
+
+    def flush(self) -> List[int]:
+        """Commit everything currently buffered and return the new IDs"""
+        with self._flush_lock:
+            with self._buffer_lock:
+                pending, self._buffer = self._buffer, []
+
+            ids = []
+            for start in range(0, len(pending), MAX_ROWS_PER_STATEMENT):
+                chunk = pending[start:start + MAX_ROWS_PER_STATEMENT]
+                try:
+                    chunk_ids = self._persist([row for row, _ in chunk])
+                except Exception as e:
+                    logger.error(f"Diagnosis batch flush failed: {str(e)}")
+                    for _, future in chunk:
+                        future.set_exception(e)
+                    continue
+
+                for (_, future), diagnosis_id in zip(chunk, chunk_ids):
+                    future.set_result(diagnosis_id)
+                ids.extend(chunk_ids)
+
+            return ids
+
+    def close(self) -> None:
+        """Stop the background flusher and write out anything still buffered"""
+        with self._buffer_lock:
+            if self._closed:
+                return
+            self._closed = True
+
+        self._wakeup.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+        atexit.unregister(self.close)
+
+    def _run(self) -> None:
+        """Flush when woken (by size, write() or close) or when the flush interval elapses"""
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval or None)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Diagnosis writer loop failed: {str(e)}")
+
+    def _normalize(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Give every row the same column set so batches share one statement"""
+        unknown = set(record) - set(WRITABLE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown diagnosis fields: {', '.join(sorted(unknown))}")
+
+        row = {column: record.get(column) for column in WRITABLE_COLUMNS}
+        if row["timestamp"] is None:
+            row["timestamp"] = datetime.utcnow()
+        return row
+
+    def _persist(self, rows: List[Dict[str, Any]]) -> List[int]:
+        """Insert rows in a single transaction and return their IDs in order"""
+        session = self.session_factory()
+        try:
+            dialect = session.get_bind().dialect.name
+            if self.durability == "relaxed" and dialect == "postgresql":
+                session.execute(text("SET LOCAL synchronous_commit TO OFF"))
+
+            ids = self._insert(session, rows, dialect)
+            # Bulk inserts bypass ORM events, so index symptoms explicitly
+            index_diagnosis_terms(
+                session.connection(),
+                [dict(row, id=diagnosis_id) for row, diagnosis_id in zip(rows, ids)]
+            )
+            session.commit()
+            invalidate_patient(*{row["patient_id"] for row in rows if row["patient_id"] is not None})
+            return ids
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _insert(self, session: Session, rows: List[Dict[str, Any]], dialect: str) -> List[int]:
+        """Issue the bulk INSERT using the fastest ID-returning form available"""
+        table = Diagnosis.__table__
+
+        if dialect == "postgresql":
+            # One multi-row INSERT ... RETURNING round trip per chunk
+            result = session.execute(
+                insert(table).values(rows).returning(table.c.id)
+            )
+            return [row.id for row in result]
+
+        if dialect == "sqlite":
+            # One executemany. The transaction holds SQLite's write lock and
+            # new rowids are max(rowid) + 1, so the batch's IDs are the
+            # contiguous range ending at the new maximum
+            session.execute(insert(table), rows)
+            last_id = session.execute(select(func.max(table.c.id))).scalar()
+            return list(range(last_id - len(rows) + 1, last_id + 1))
+
+        # Other dialects: the ORM fetches each generated ID, one row at a time
+        objects = [Diagnosis(**row) for row in rows]
+        session.bulk_save_objects(objects, return_defaults=True)
+        return [obj.id for obj in objects]
+
+_writer: Optional[DiagnosisBatchWriter] = None
+_writer_lock = threading.Lock()
+
+def get_diagnosis_writer() -> DiagnosisBatchWriter:
+    """Shared application-wide diagnosis writer"""
+    global _writer
+    with _writer_lock:
+        if _writer is None or _writer._closed:
+            _writer = DiagnosisBatchWriter()
+        return _writer
+
+def shutdown_diagnosis_writer() -> None:
+    """Flush and stop the shared writer if it was ever started"""
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
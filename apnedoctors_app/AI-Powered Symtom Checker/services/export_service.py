@@ -0,0 +1,196 @@
+from sqlalchemy import select, Table, Integer, Float, DateTime, Date, Boolean, JSON
+from sqlalchemy.engine import Engine
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterator, Sequence
+import csv
+import io
+import json
+import logging
+import zlib
+from core.config import get_settings
+from core.database import engine
+from models.db_models import Diagnosis, MedicalRecord
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+EXPORT_TABLES: Dict[str, Table] = {
+    "diagnoses": Diagnosis.__table__,
+    "medical_records": MedicalRecord.__table__
+}
+
+# Column used for the start/end filter of each table
+TIME_COLUMNS = {
+    "diagnoses": "timestamp",
+    "medical_records": "updated_at"
+}
+
+# The CSV body is itself a gzip file, so it is served as one rather than
+# as text/csv, which clients would save without decompressing
+EXPORT_FORMATS = {
+    "csv": ("application/gzip", "csv.gz"),
+    "parquet": ("application/vnd.apache.parquet", "parquet")
+}
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+class DataExportService:
+    """Streams table exports in fixed-size batches with bounded memory"""
+
+    def __init__(self, bind: Engine = engine, batch_size: Optional[int] = None):
+        self.bind = bind
+        self.batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+
+    def export(
+        self,
+        table_name: str,
+        export_format: str = "parquet",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        patient_id: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """Yield the encoded export chunk by chunk"""
+        if table_name not in EXPORT_TABLES:
+            raise ValueError(f"Unsupported export table: {table_name}")
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+
+        table = EXPORT_TABLES[table_name]
+        batches = self.iter_batches(table_name, start, end, patient_id)
+
+        if export_format == "parquet":
+            return self._write_parquet(table, batches)
+        return self._write_csv(table, batches)
+
+    def iter_batches(
+        self,
+        table_name: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        patient_id: Optional[int] = None
+    ) -> Iterator[Sequence[Any]]:
+        """Stream rows through a server-side cursor, batch_size rows at a time"""
+        table = EXPORT_TABLES[table_name]
+        time_column = table.c[TIME_COLUMNS[table_name]]
+
+        query = select(*table.columns).order_by(table.c.id)
+        if start is not None:
+            query = query.where(time_column >= start)
+        if end is not None:
+            query = query.where(time_column < end)
+        if patient_id is not None:
+            query = query.where(table.c.patient_id == patient_id)
+
+        try:
+            with self.bind.connect() as connection:
+                result = connection.execution_options(
+                    stream_results=True,
+                    max_row_buffer=self.batch_size
+                ).execute(query)
+                for batch in result.partitions(self.batch_size):
+                    yield batch
+        except Exception as e:
+            logger.error(f"Export of {table_name} failed: {str(e)}")
+            raise
+
+    def _write_csv(self, table: Table, batches: Iterator[Sequence[Any]]) -> Iterator[bytes]:
+        """Gzip-compressed CSV; JSON columns are embedded as JSON text"""
+        json_columns = [isinstance(column.type, JSON) for column in table.columns]
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        writer.writerow([column.name for column in table.columns])
+        for batch in batches:
+            for row in batch:
+                writer.writerow([
+                    json.dumps(value) if is_json and value is not None
+                    else value.isoformat() if hasattr(value, "isoformat")
+                    else value
+                    for value, is_json in zip(row, json_columns)
+                ])
+            chunk = compressor.compress(buffer.getvalue().encode())
+            buffer.seek(0)
+            buffer.truncate()
+            if chunk:
+                yield chunk
+
+        tail = compressor.compress(buffer.getvalue().encode()) + compressor.flush()
+        if tail:
+            yield tail
+
+    def _write_parquet(self, table: Table, batches: Iterator[Sequence[Any]]) -> Iterator[bytes]:
+        """Zstd-compressed Parquet with one row group per batch"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            pa.field(column.name, self._arrow_type(column.type, pa))
+            for column in table.columns
+        ])
+        json_columns = {column.name for column in table.columns if isinstance(column.type, JSON)}
+
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(
+            pa.PythonFile(sink, mode="w"),
+            schema,
+            compression="zstd",
+            use_dictionary=True
+        )
+        try:
+            for batch in batches:
+                columns = list(zip(*batch))
+                arrays = {}
+                for field, values in zip(schema, columns):
+                    if field.name in json_columns:
+                        values = [json.dumps(value) if value is not None else None for value in values]
+                    arrays[field.name] = pa.array(values, type=field.type)
+                writer.write_batch(pa.RecordBatch.from_pydict(arrays, schema=schema))
+
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+        finally:
+            writer.close()
+
+        tail = sink.drain()
+        if tail:
+            yield tail
+
+    @staticmethod
+    def _arrow_type(column_type, pa):
+        """Arrow type for a SQLAlchemy column type"""
+        if isinstance(column_type, Integer):
+            return pa.int64()
+        if isinstance(column_type, Float):
+            return pa.float64()
+        if isinstance(column_type, DateTime):
+            return pa.timestamp("us")
+        if isinstance(column_type, Date):
+            return pa.date32()
+        if isinstance(column_type, Boolean):
+            return pa.bool_()
+        # String and JSON (serialized) columns
+        return pa.string()
@@ -0,0 +1,59 @@
+import aiohttp
+from collections import deque
+from typing import Deque, Optional
+import logging
+from core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_session: Optional[aiohttp.ClientSession] = None
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Application-lifetime HTTP session with a keep-alive connection pool.
+
+    Must be called from inside the running event loop. Connections (and TLS
+    sessions) are reused across requests instead of being re-established
+    for every external API call.
+    """
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=settings.HTTP_POOL_SIZE,
+            limit_per_host=settings.HTTP_POOL_PER_HOST,
+            keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=300
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(
+                total=settings.EXTERNAL_API_TIMEOUT,
+                sock_connect=settings.EXTERNAL_API_CONNECT_TIMEOUT
+            )
+        )
+    return _session
+
+async def close_http_session() -> None:
+    """Close the shared session and its pooled connections"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+class LatencyTracker:
+    """Rolling window of observed latencies for percentile estimates"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Latency at the given percentile, or None until enough samples exist"""
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+        return ordered[index]
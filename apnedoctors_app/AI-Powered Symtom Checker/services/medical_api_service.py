@@ -1,37 +1,155 @@
 import aiohttp
+import asyncio
 from core.config import get_settings
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import quote
 import logging
+import time
+from core.database import SessionLocal
+from core.metrics import stage_timer
+from models.db_models.diagnosis_terms import normalize_term
+from .http_client import get_http_session, LatencyTracker
+from .condition_cache import get_condition_cache
+from .report_service import ReportService
+from .resilience import call_with_resilience, parse_retry_after, CircuitOpenError, RateLimited, UpstreamError
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Shared across service instances so hedge delays reflect all traffic
+_latency_trackers: Dict[str, LatencyTracker] = {}
+
+def _tracker(source: str) -> LatencyTracker:
+    if source not in _latency_trackers:
+        _latency_trackers[source] = LatencyTracker()
+    return _latency_trackers[source]
+
 class MedicalAPIService:
     def __init__(self):
         self.mayo_clinic_api = settings.MAYO_CLINIC_API
         self.nih_api = settings.NIH_API
         self.who_api = settings.WHO_API
 
+    @property
+    def sources(self) -> List[Tuple[str, str]]:
+        """Configured sources in order of preference"""
+        candidates = [
+            ("mayo_clinic", self.mayo_clinic_api),
+            ("nih", self.nih_api),
+            ("who", self.who_api)
+        ]
+        return [(name, url) for name, url in candidates if url]
+
     async def get_condition_info(self, condition: str) -> Dict[str, Any]:
-        """Get detailed information about a medical condition"""
+        """Get detailed information about a medical condition (cached)"""
+        try:
+            return await get_condition_cache().get_or_fetch(
+                normalize_term(condition),
+                lambda: self.lookup_condition_info(condition)
+            )
+        except Exception as e:
+            logger.error(f"Condition info lookup failed: {str(e)}")
+            return {}
+
+    async def warm_cache(self, conditions: List[str]) -> int:
+        """Pre-load condition information, e.g. the most frequent conditions at startup"""
         try:
-            async with aiohttp.ClientSession() as session:
-                # Try Mayo Clinic API first
-                async with session.get(
-                    f"{self.mayo_clinic_api}/conditions/{condition}"
-                ) as response:
-                    if response.status == 200:
-                        return await response.json()
-                        
-                # Fallback to NIH API
-                async with session.get(
-                    f"{self.nih_api}/conditions/{condition}"
-                ) as response:
-                    if response.status == 200:
-                        return await response.json()
-                        
+            return await get_condition_cache().warm(
+                [normalize_term(condition) for condition in conditions],
+                self.lookup_condition_info
+            )
+        except Exception as e:
+            logger.error(f"Condition cache warm-up failed: {str(e)}")
+            return 0
+
+    async def lookup_condition_info(self, condition: str) -> Dict[str, Any]:
+        """Query the external sources directly, bypassing the cache.
+
+        Sources are queried as hedged requests: the preferred source goes
+        first and the next one is fired if no answer has arrived within the
+        preferred source's observed latency percentile (or immediately if it
+        fails). The first good answer wins and the rest are cancelled.
+        """
+        pending = set()
+        try:
+            remaining = list(self.sources)
+            last_source = None
+
+            while remaining or pending:
+                if remaining:
+                    last_source, base_url = remaining.pop(0)
+                    pending.add(asyncio.create_task(
+                        self._fetch(last_source, base_url, condition)
+                    ))
+
+                timeout = self._hedge_delay(last_source) if remaining else None
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    result = task.result()
+                    if result:
+                        return result
+
             return {}  # Return empty if no data found
-            
+
         except Exception as e:
             logger.error(f"Medical API request failed: {str(e)}")
-            return {}
\ No newline at end of file
+            return {}
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _hedge_delay(self, source: str) -> float:
+        """How long to wait on a source before hedging to the next one"""
+        observed = _tracker(source).percentile(settings.MEDICAL_API_HEDGE_PERCENTILE)
+        return observed if observed is not None else settings.MEDICAL_API_HEDGE_DELAY
+
+    async def _fetch(self, source: str, base_url: str, condition: str) -> Optional[Dict[str, Any]]:
+        """Query one source through its circuit breaker; None means no usable answer"""
+        url = f"{base_url}/conditions/{quote(condition, safe='')}"
+
+        async def request() -> Optional[Dict[str, Any]]:
+            started = time.perf_counter()
+            async with get_http_session().get(url) as response:
+                if response.status == 429:
+                    raise RateLimited(f"{source} returned 429", parse_retry_after(response.headers.get("Retry-After")))
+                if response.status >= 500:
+                    raise UpstreamError(f"{source} returned {response.status}")
+                if response.status != 200:
+                    return None
+                data = await response.json()
+                _tracker(source).record(time.perf_counter() - started)
+                return data
+
+        try:
+            with stage_timer("medical_api", source):
+                return await call_with_resilience(f"medical_api.{source}", request)
+        except CircuitOpenError:
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError, UpstreamError, ValueError) as e:
+            logger.warning(f"{source} lookup for {condition} failed: {str(e) or type(e).__name__}")
+            return None
+
+
+def _top_conditions(limit: int) -> List[str]:
+    db = SessionLocal()
+    try:
+        return [row["condition"] for row in ReportService(db).condition_totals(limit=limit)]
+    finally:
+        db.close()
+
+async def prewarm_condition_cache() -> int:
+    """Warm the condition cache with the most frequently diagnosed conditions"""
+    try:
+        conditions = await asyncio.to_thread(_top_conditions, settings.CONDITION_CACHE_PREWARM_COUNT)
+    except Exception as e:
+        logger.error(f"Could not load top conditions for cache warm-up: {str(e)}")
+        return 0
+
+    warmed = await MedicalAPIService().warm_cache(conditions)
+    logger.info(f"Condition cache warmed with {warmed} of {len(conditions)} conditions")
+    return warmed
@@ -0,0 +1,130 @@
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session, selectinload
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+import base64
+import json
+import logging
+from models.db_models import Patient, Diagnosis, MedicalRecord
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+def encode_cursor(timestamp: datetime, diagnosis_id: int) -> str:
+    """Encode the position of the last returned row as an opaque cursor"""
+    raw = json.dumps([timestamp.isoformat(), diagnosis_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, diagnosis_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(timestamp), int(diagnosis_id)
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+class PatientHistoryService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_patient(self, patient_id: int) -> Patient:
+        """Load a patient together with all medical records in two queries"""
+        patient = (
+            self.db.query(Patient)
+            .options(selectinload(Patient.medical_records))
+            .filter(Patient.id == patient_id)
+            .first()
+        )
+        if not patient:
+            raise ValueError("Patient not found")
+        return patient
+
+    def history_version(self, patient_id: int) -> Optional[str]:
+        """Fingerprint of everything get_history returns, used as its ETag.
+
+        One query of index-only aggregates: the patient's updated_at, the
+        count and latest updated_at of their records, and the count and
+        highest ID of their diagnoses (which are append-only). None if the
+        patient does not exist.
+        """
+        def per_patient(column, model):
+            return self.db.query(column).filter(model.patient_id == Patient.id).scalar_subquery()
+
+        row = (
+            self.db.query(
+                Patient.updated_at,
+                per_patient(func.count(MedicalRecord.id), MedicalRecord),
+                per_patient(func.max(MedicalRecord.updated_at), MedicalRecord),
+                per_patient(func.count(Diagnosis.id), Diagnosis),
+                per_patient(func.max(Diagnosis.id), Diagnosis)
+            )
+            .filter(Patient.id == patient_id)
+            .first()
+        )
+        if row is None:
+            return None
+        return "|".join(str(value) for value in row)
+
+    def get_diagnosis_page(
+        self,
+        patient_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Return one page of a patient's diagnoses, newest first.
+
+        Pages are addressed by a (timestamp, id) keyset rather than an offset,
+        so every page is a range scan on ix_diagnoses_patient_id_timestamp and
+        deep pages cost the same as the first one.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        query = self.db.query(Diagnosis).filter(Diagnosis.patient_id == patient_id)
+
+        if cursor:
+            timestamp, diagnosis_id = decode_cursor(cursor)
+            query = query.filter(
+                tuple_(Diagnosis.timestamp, Diagnosis.id) < tuple_(timestamp, diagnosis_id)
+            )
+
+        # Fetch one extra row to learn whether another page exists
+        rows = (
+            query.order_by(Diagnosis.timestamp.desc(), Diagnosis.id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id) if has_more else None
+
+        return {
+            "diagnoses": rows,
+            "next_cursor": next_cursor
+        }
+
+    def get_history(
+        self,
+        patient_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Patient timeline: profile, medical records and a page of diagnoses"""
+        try:
+            patient = self.get_patient(patient_id)
+            page = self.get_diagnosis_page(patient_id, limit, cursor)
+
+            # ORM instances are serialized directly by utils.serialization.dumps
+            return {
+                "patient": patient,
+                "medical_records": patient.medical_records,
+                "diagnoses": page["diagnoses"],
+                "next_cursor": page["next_cursor"]
+            }
+
+        except Exception as e:
+            logger.error(f"Patient history lookup failed: {str(e)}")
+            raise
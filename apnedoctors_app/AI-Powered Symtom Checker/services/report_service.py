@@ -0,0 +1,273 @@
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from datetime import date
+from typing import List, Dict, Any, Optional
+import asyncio
+import logging
+from core.config import get_settings
+from core.database import SessionLocal
+from core.response_cache import invalidate_reports
+from models.db_models import (
+    Diagnosis, DiagnosisCondition, ConditionDailyCount, DiagnosisDailySummary, RollupCheckpoint
+)
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_NAME = "diagnoses"
+UNKNOWN_RISK_LEVEL = "unknown"
+
+def _as_date(value) -> date:
+    """func.date() yields a date on PostgreSQL and an ISO string on SQLite"""
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+class ReportRollupService:
+    """Maintains the report rollup tables from the diagnoses delta.
+
+    A diagnosis is part of the delta until its rolled_up flag is set, so
+    rows are counted whenever they commit, whatever their ID or timestamp.
+    Rollups are insert-only: edits to a diagnosis after it was counted
+    (e.g. a changed risk level) are not reflected.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def refresh(self, batch_size: Optional[int] = None) -> int:
+        """Fold every diagnosis not yet rolled up into the rollups.
+
+        Each batch is flagged, aggregated in SQL and applied in one
+        transaction that holds the checkpoint row lock, so a crash or a
+        concurrent run never double counts.
+        """
+        batch_size = batch_size or settings.REPORT_ROLLUP_BATCH_SIZE
+        processed = 0
+
+        try:
+            while True:
+                applied = self._apply_next_batch(batch_size)
+                processed += applied
+                if applied < batch_size:
+                    break
+
+            if processed:
+                invalidate_reports()
+                logger.info(f"Report rollups advanced by {processed} diagnoses")
+            return processed
+
+        except Exception as e:
+            logger.error(f"Report rollup refresh failed: {str(e)}")
+            self.db.rollback()
+            raise
+
+    def _apply_next_batch(self, batch_size: int) -> int:
+        checkpoint = self._lock_checkpoint()
+        ids = [
+            diagnosis_id for diagnosis_id, in
+            self.db.query(Diagnosis.id)
+            .filter(Diagnosis.rolled_up.is_(False))
+            .order_by(Diagnosis.id)
+            .limit(batch_size)
+        ]
+        if not ids:
+            self.db.commit()
+            return 0
+
+        claimed = (
+            self.db.query(Diagnosis)
+            .filter(Diagnosis.id.in_(ids), Diagnosis.rolled_up.is_(False))
+            .update({Diagnosis.rolled_up: True}, synchronize_session=False)
+        )
+        if claimed != len(ids):
+            # Another run got some of these first (no row locks on SQLite)
+            self.db.rollback()
+            return 0
+
+        self._apply_diagnosis_summary(ids)
+        self._apply_condition_counts(ids)
+
+        checkpoint.folded += len(ids)
+        self.db.commit()
+        return len(ids)
+
+    def _lock_checkpoint(self) -> RollupCheckpoint:
+        """The checkpoint row, locked for this transaction where the database
+        supports it. Migrations create it; schemas made without them may not."""
+        query = (
+            self.db.query(RollupCheckpoint)
+            .filter(RollupCheckpoint.name == CHECKPOINT_NAME)
+            .with_for_update()
+        )
+        checkpoint = query.first()
+        if checkpoint is not None:
+            return checkpoint
+        try:
+            self.db.add(RollupCheckpoint(name=CHECKPOINT_NAME, folded=0))
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+        return query.one()
+
+    def _apply_diagnosis_summary(self, ids: List[int]) -> None:
+        day = func.date(Diagnosis.timestamp)
+        risk_level = func.coalesce(Diagnosis.risk_level, UNKNOWN_RISK_LEVEL)
+        deltas = (
+            self.db.query(
+                day.label("day"),
+                risk_level.label("risk_level"),
+                func.count().label("count"),
+                func.coalesce(func.sum(Diagnosis.confidence_score), 0.0).label("confidence_sum"),
+                func.count(Diagnosis.confidence_score).label("confidence_count")
+            )
+            .filter(Diagnosis.id.in_(ids))
+            .filter(Diagnosis.timestamp.isnot(None))
+            .group_by(day, risk_level)
+            .all()
+        )
+
+        for delta in deltas:
+            key = (_as_date(delta.day), delta.risk_level)
+            summary = self.db.query(DiagnosisDailySummary).get(key)
+            if summary is None:
+                summary = DiagnosisDailySummary(
+                    day=key[0], risk_level=key[1],
+                    count=0, confidence_sum=0.0, confidence_count=0
+                )
+                self.db.add(summary)
+            summary.count += delta.count
+            summary.confidence_sum += float(delta.confidence_sum)
+            summary.confidence_count += delta.confidence_count
+
+    def _apply_condition_counts(self, ids: List[int]) -> None:
+        day = func.date(DiagnosisCondition.timestamp)
+        deltas = (
+            self.db.query(
+                day.label("day"),
+                DiagnosisCondition.condition,
+                func.count().label("count")
+            )
+            .filter(DiagnosisCondition.diagnosis_id.in_(ids))
+            .filter(DiagnosisCondition.timestamp.isnot(None))
+            .group_by(day, DiagnosisCondition.condition)
+            .all()
+        )
+
+        for delta in deltas:
+            key = (_as_date(delta.day), delta.condition)
+            rollup = self.db.query(ConditionDailyCount).get(key)
+            if rollup is None:
+                rollup = ConditionDailyCount(day=key[0], condition=key[1], count=0)
+                self.db.add(rollup)
+            rollup.count += delta.count
+
+class ReportService:
+    """Report queries that read only the rollup tables"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def version(self) -> str:
+        """Rollup checkpoint position; the reports only change when it moves"""
+        folded = (
+            self.db.query(RollupCheckpoint.folded)
+            .filter(RollupCheckpoint.name == CHECKPOINT_NAME)
+            .scalar()
+        )
+        return f"rollups:{folded or 0}"
+
+    @staticmethod
+    def _in_range(query, column, start: Optional[date], end: Optional[date]):
+        if start is not None:
+            query = query.filter(column >= start)
+        if end is not None:
+            query = query.filter(column <= end)
+        return query
+
+    def condition_totals(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """Most frequent conditions over a date range"""
+        total = func.sum(ConditionDailyCount.count).label("count")
+        query = self.db.query(ConditionDailyCount.condition, total)
+        query = self._in_range(query, ConditionDailyCount.day, start, end)
+        query = query.group_by(ConditionDailyCount.condition).order_by(total.desc()).limit(limit)
+        return [{"condition": row.condition, "count": int(row.count)} for row in query]
+
+    def condition_daily(
+        self,
+        condition: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> List[Dict[str, Any]]:
+        """Daily counts for one condition"""
+        query = self.db.query(ConditionDailyCount).filter(
+            ConditionDailyCount.condition == condition
+        )
+        query = self._in_range(query, ConditionDailyCount.day, start, end)
+        return [
+            {"day": row.day.isoformat(), "count": row.count}
+            for row in query.order_by(ConditionDailyCount.day)
+        ]
+
+    def risk_level_distribution(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> Dict[str, int]:
+        """Diagnosis counts per risk level over a date range"""
+        total = func.sum(DiagnosisDailySummary.count).label("count")
+        query = self.db.query(DiagnosisDailySummary.risk_level, total)
+        query = self._in_range(query, DiagnosisDailySummary.day, start, end)
+        query = query.group_by(DiagnosisDailySummary.risk_level)
+        return {row.risk_level: int(row.count) for row in query}
+
+    def confidence_summary(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """Average confidence overall and per day"""
+        confidence_sum = func.sum(DiagnosisDailySummary.confidence_sum).label("confidence_sum")
+        confidence_count = func.sum(DiagnosisDailySummary.confidence_count).label("confidence_count")
+        query = self.db.query(DiagnosisDailySummary.day, confidence_sum, confidence_count)
+        query = self._in_range(query, DiagnosisDailySummary.day, start, end)
+        rows = query.group_by(DiagnosisDailySummary.day).order_by(DiagnosisDailySummary.day).all()
+
+        total_sum = sum(float(row.confidence_sum or 0) for row in rows)
+        total_count = sum(int(row.confidence_count or 0) for row in rows)
+
+        return {
+            "average_confidence": total_sum / total_count if total_count else None,
+            "daily": [
+                {
+                    "day": row.day.isoformat(),
+                    "average_confidence": (
+                        float(row.confidence_sum) / row.confidence_count
+                        if row.confidence_count else None
+                    )
+                }
+                for row in rows
+            ]
+        }
+
+def refresh_report_rollups() -> int:
+    """Run one delta pass with a dedicated session"""
+    db = SessionLocal()
+    try:
+        return ReportRollupService(db).refresh()
+    finally:
+        db.close()
+
+async def run_rollup_job(interval: Optional[float] = None) -> None:
+    """Periodically fold new diagnoses into the rollups until cancelled"""
+    interval = interval or settings.REPORT_ROLLUP_INTERVAL
+    while True:
+        try:
+            await asyncio.to_thread(refresh_report_rollups)
+        except Exception as e:
+            logger.error(f"Report rollup job failed: {str(e)}")
+        await asyncio.sleep(interval)
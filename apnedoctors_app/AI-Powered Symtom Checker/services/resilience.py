@@ -0,0 +1,237 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+import asyncio
+import logging
+import random
+import time
+from core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Absolute time.monotonic() by which the current request must be answered
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open"""
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """The request's latency budget is used up"""
+
+class UpstreamError(Exception):
+    """Retryable upstream failure, e.g. a 5xx response"""
+
+class RateLimited(UpstreamError):
+    """The dependency answered 429; it is healthy, just asking us to slow down"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[None]:
+    """Bound every resilient call made inside the block; None lifts the bound"""
+    if seconds is None:
+        token = _deadline.set(None)
+    else:
+        new_deadline = time.monotonic() + seconds
+        current = _deadline.get()
+        token = _deadline.set(new_deadline if current is None else min(current, new_deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def remaining_time() -> Optional[float]:
+    """Seconds left in the current deadline, or None if unbounded"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+class CircuitBreaker:
+    """Per-endpoint breaker: closed -> open after repeated failures -> half-open probe"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[int] = None,
+        recovery_timeout: Optional[float] = None
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD
+        self.recovery_timeout = recovery_timeout or settings.CIRCUIT_BREAKER_RECOVERY_TIMEOUT
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self.counters = {"successes": 0, "failures": 0, "rejections": 0, "opened": 0}
+
+    def allow(self) -> bool:
+        """Whether a call may go through right now"""
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+
+        self.counters["rejections"] += 1
+        return False
+
+    def record_success(self) -> None:
+        self.counters["successes"] += 1
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit {self.name} closed")
+        self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self.counters["failures"] += 1
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.counters["opened"] += 1
+                logger.warning(f"Circuit {self.name} opened after {self.consecutive_failures} failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def record_cancelled(self) -> None:
+        """The call was abandoned (e.g. a losing hedge); free the probe slot"""
+        self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            **self.counters
+        }
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Shared breaker for an endpoint, created on first use"""
+    if name not in _breakers:
+        _breakers[name] = CircuitBreaker(name)
+    return _breakers[name]
+
+def breaker_metrics() -> List[Dict[str, Any]]:
+    """State and counters of every breaker"""
+    return [breaker.snapshot() for breaker in _breakers.values()]
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff"""
+    ceiling = min(settings.EXTERNAL_API_BACKOFF_MAX, settings.EXTERNAL_API_BACKOFF_BASE * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+async def _retry_pause(name: str, attempt: int, outcome: str) -> None:
+    """Back off before the next attempt; re-raises the current error if the deadline can't fit it"""
+    delay = _backoff(attempt)
+    remaining = remaining_time()
+    if remaining is not None and remaining <= delay:
+        raise
+    logger.warning(f"{name} attempt {attempt + 1} {outcome}, retrying in {delay:.2f}s")
+    await asyncio.sleep(delay)
+
+async def call_with_resilience(
+    name: str,
+    call: Callable[[], Awaitable[Any]],
+    retries: Optional[int] = None,
+    attempt_timeout: Optional[float] = None,
+    acquire: Optional[Callable[[], Awaitable[Any]]] = None
+) -> Any:
+    """Run call() behind the named breaker, within the request deadline.
+
+    Each attempt is cut off at the smaller of attempt_timeout and the time
+    left in the deadline. Exceptions, timeouts and UpstreamError count as
+    failures and are retried with jittered backoff while attempts and
+    deadline remain. A timeout only counts when the dependency had the
+    full attempt_timeout: one cut short by the request's own deadline
+    raises DeadlineExceeded without touching the breaker. Anything call()
+    returns (including None for "not found") is a success. RateLimited is not a failure: the retry waits
+    for its Retry-After, and gives up at once if that wait would not fit
+    in the deadline or EXTERNAL_API_MAX_RETRY_AFTER. `acquire`, if given,
+    is awaited before every attempt (e.g. a client-side token bucket).
+    """
+    breaker = get_breaker(name)
+    retries = settings.EXTERNAL_API_MAX_RETRIES if retries is None else retries
+    attempt_timeout = attempt_timeout or settings.EXTERNAL_API_TIMEOUT
+
+    for attempt in range(retries + 1):
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit {name} is open")
+        try:
+            if acquire is not None:
+                await acquire()
+            remaining = remaining_time()
+            if remaining is not None and remaining <= 0:
+                raise DeadlineExceeded(f"Deadline exceeded before calling {name}")
+        except BaseException:
+            # allow() may have handed us the half-open probe; give it back
+            breaker.record_cancelled()
+            raise
+        timeout = attempt_timeout if remaining is None else min(attempt_timeout, remaining)
+
+        try:
+            result = await asyncio.wait_for(call(), timeout)
+            breaker.record_success()
+            return result
+        except asyncio.CancelledError:
+            breaker.record_cancelled()
+            raise
+        except DeadlineExceeded:
+            # Raised by a nested resilient call: our budget, not this dependency
+            breaker.record_cancelled()
+            raise
+        except asyncio.TimeoutError as e:
+            if timeout < attempt_timeout:
+                # Cut short by our deadline; the dependency may be fine
+                breaker.record_cancelled()
+                raise DeadlineExceeded(f"Deadline exceeded while calling {name}") from e
+            breaker.record_failure()
+            if attempt == retries:
+                raise
+            await _retry_pause(name, attempt, "timed out")
+        except RateLimited as e:
+            breaker.record_cancelled()
+            if attempt == retries:
+                raise
+            delay = e.retry_after if e.retry_after is not None else _backoff(attempt)
+            remaining = remaining_time()
+            if delay > settings.EXTERNAL_API_MAX_RETRY_AFTER or (remaining is not None and remaining <= delay):
+                raise
+            logger.warning(f"{name} rate limited us, retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+        except Exception as e:
+            breaker.record_failure()
+            if attempt == retries:
+                raise
+            await _retry_pause(name, attempt, f"failed ({type(e).__name__})")
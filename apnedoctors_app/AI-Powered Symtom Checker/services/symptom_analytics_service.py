@@ -0,0 +1,120 @@
+from sqlalchemy import func, distinct
+from sqlalchemy.orm import Session, Query
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+from models.db_models import Diagnosis, DiagnosisSymptom, DiagnosisCondition
+from models.db_models.diagnosis_terms import normalize_term
+
+class SymptomAnalyticsService:
+    """Symptom and condition queries served from the normalized association tables"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def _in_range(query: Query, column, start: Optional[datetime], end: Optional[datetime]) -> Query:
+        if start is not None:
+            query = query.filter(column >= start)
+        if end is not None:
+            query = query.filter(column < end)
+        return query
+
+    def count_cases_with_symptom(
+        self,
+        symptom: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> int:
+        """Number of diagnoses reporting a symptom, e.g. fever this week"""
+        query = self.db.query(func.count()).select_from(DiagnosisSymptom).filter(
+            DiagnosisSymptom.symptom == normalize_term(symptom)
+        )
+        return self._in_range(query, DiagnosisSymptom.timestamp, start, end).scalar()
+
+    def count_cases_with_condition(
+        self,
+        condition: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        min_probability: Optional[float] = None
+    ) -> int:
+        """Number of diagnoses that predicted a condition"""
+        query = self.db.query(func.count()).select_from(DiagnosisCondition).filter(
+            DiagnosisCondition.condition == normalize_term(condition)
+        )
+        if min_probability is not None:
+            query = query.filter(DiagnosisCondition.probability >= min_probability)
+        return self._in_range(query, DiagnosisCondition.timestamp, start, end).scalar()
+
+    def find_diagnosis_ids(
+        self,
+        symptoms: List[str],
+        match_all: bool = True,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 100
+    ) -> List[int]:
+        """IDs of diagnoses with all (or any) of the given symptoms, newest first"""
+        terms = list({normalize_term(symptom) for symptom in symptoms})
+        if not terms:
+            return []
+
+        query = self.db.query(DiagnosisSymptom.diagnosis_id).filter(
+            DiagnosisSymptom.symptom.in_(terms)
+        )
+        query = self._in_range(query, DiagnosisSymptom.timestamp, start, end)
+        query = query.group_by(DiagnosisSymptom.diagnosis_id)
+        if match_all:
+            query = query.having(func.count(DiagnosisSymptom.symptom) == len(terms))
+
+        query = query.order_by(DiagnosisSymptom.diagnosis_id.desc()).limit(limit)
+        return [row.diagnosis_id for row in query]
+
+    def find_diagnoses(
+        self,
+        symptoms: List[str],
+        match_all: bool = True,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 100
+    ) -> List[Diagnosis]:
+        """Diagnoses with all (or any) of the given symptoms, newest first"""
+        ids = self.find_diagnosis_ids(symptoms, match_all, start, end, limit)
+        if not ids:
+            return []
+        return (
+            self.db.query(Diagnosis)
+            .filter(Diagnosis.id.in_(ids))
+            .order_by(Diagnosis.id.desc())
+            .all()
+        )
+
+    def top_symptoms(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Most frequently reported symptoms in a period"""
+        count = func.count().label("count")
+        query = self.db.query(DiagnosisSymptom.symptom, count)
+        query = self._in_range(query, DiagnosisSymptom.timestamp, start, end)
+        query = query.group_by(DiagnosisSymptom.symptom).order_by(count.desc()).limit(limit)
+        return [{"symptom": row.symptom, "count": row.count} for row in query]
+
+    def condition_counts(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Most frequently predicted conditions in a period"""
+        count = func.count().label("count")
+        patients = func.count(distinct(DiagnosisCondition.patient_id)).label("patients")
+        query = self.db.query(DiagnosisCondition.condition, count, patients)
+        query = self._in_range(query, DiagnosisCondition.timestamp, start, end)
+        query = query.group_by(DiagnosisCondition.condition).order_by(count.desc()).limit(limit)
+        return [
+            {"condition": row.condition, "count": row.count, "patients": row.patients}
+            for row in query
+        ]
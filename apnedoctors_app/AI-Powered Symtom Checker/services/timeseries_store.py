@@ -0,0 +1,349 @@
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import asyncio
+import logging
+import struct
+import zlib
+from core.config import get_settings
+from core.database import SessionLocal
+from models.db_models import VitalChunk
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Bucket width in seconds per tier; "raw" keeps every sample
+TIERS: Dict[str, Optional[int]] = {"raw": None, "minute": 60, "hour": 3600, "day": 86400}
+ROLLUP_TIERS = ("minute", "hour", "day")
+
+# Column layouts after the delta-encoded int64 time column (milliseconds;
+# sample times in raw chunks, bucket starts in rollup chunks)
+RAW_COLUMNS = ("<f4",)  # value
+ROLLUP_COLUMNS = ("<f4", "<f4", "<f8", "<u4")  # min, max, sum, count
+
+# Version 1 stored rollup bucket starts in seconds rather than milliseconds
+CODEC_VERSION = 2
+_LEGACY_VERSIONS = (1,)
+_HEADER = struct.Struct("<BI")
+_EPOCH = datetime(1970, 1, 1)
+
+SeriesKey = Tuple[int, str]
+
+def _to_seconds(moment: datetime) -> float:
+    return (moment - _EPOCH).total_seconds()
+
+def _to_datetime(seconds: float) -> datetime:
+    return _EPOCH + timedelta(seconds=float(seconds))
+
+def _to_millis(seconds: np.ndarray) -> np.ndarray:
+    return np.round(seconds * 1000).astype(np.int64)
+
+def encode_columns(times: np.ndarray, columns: Sequence[np.ndarray], dtypes: Sequence[str]) -> bytes:
+    """Pack an int64 time column (delta-encoded) plus value columns and compress.
+
+    Regularly sampled series turn into runs of identical deltas, which zlib
+    shrinks to almost nothing.
+    """
+    deltas = np.diff(times.astype("<i8"), prepend=np.int64(0))
+    parts = [_HEADER.pack(CODEC_VERSION, len(times)), deltas.tobytes()]
+    parts.extend(np.ascontiguousarray(column, dtype=dtype).tobytes() for column, dtype in zip(columns, dtypes))
+    return zlib.compress(b"".join(parts), 6)
+
+def decode_columns(payload: bytes, dtypes: Sequence[str], v1_time_scale: int = 1) -> List[np.ndarray]:
+    """Inverse of encode_columns: [times, *columns]. Times of version 1
+    payloads are multiplied by v1_time_scale (1000 for rollup chunks)."""
+    raw = zlib.decompress(payload)
+    version, count = _HEADER.unpack_from(raw)
+    if version != CODEC_VERSION and version not in _LEGACY_VERSIONS:
+        raise ValueError(f"Unsupported vital chunk version: {version}")
+
+    offset = _HEADER.size
+    times = np.cumsum(np.frombuffer(raw, dtype="<i8", count=count, offset=offset))
+    if version == 1 and v1_time_scale != 1:
+        times = times * v1_time_scale
+    offset += 8 * count
+    columns = [times]
+    for dtype in dtypes:
+        columns.append(np.frombuffer(raw, dtype=dtype, count=count, offset=offset))
+        offset += np.dtype(dtype).itemsize * count
+    return columns
+
+def decode_chunk(payload: bytes, tier: str) -> List[np.ndarray]:
+    """[times in milliseconds, *columns] of a chunk of the given tier"""
+    if tier == "raw":
+        return decode_columns(payload, RAW_COLUMNS)
+    return decode_columns(payload, ROLLUP_COLUMNS, v1_time_scale=1000)
+
+def _group_starts(keys: np.ndarray) -> np.ndarray:
+    """Start index of each run of equal keys in a sorted array"""
+    return np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+def compute_rollup(timestamps: np.ndarray, values: np.ndarray, width: int) -> Tuple[np.ndarray, ...]:
+    """Per-bucket (start, min, max, sum, count) of time-sorted samples"""
+    buckets = (timestamps // width).astype(np.int64) * width
+    starts = _group_starts(buckets)
+    return (
+        buckets[starts],
+        np.minimum.reduceat(values, starts),
+        np.maximum.reduceat(values, starts),
+        np.add.reduceat(values.astype(np.float64), starts),
+        np.diff(np.r_[starts, len(values)]).astype(np.uint32)
+    )
+
+def merge_rollups(buckets, mins, maxs, sums, counts) -> Tuple[np.ndarray, ...]:
+    """Combine partial rollups of the same buckets (from different chunks)"""
+    order = np.argsort(buckets, kind="stable")
+    buckets, mins, maxs, sums, counts = (column[order] for column in (buckets, mins, maxs, sums, counts))
+    starts = _group_starts(buckets)
+    return (
+        buckets[starts],
+        np.minimum.reduceat(mins, starts),
+        np.maximum.reduceat(maxs, starts),
+        np.add.reduceat(sums, starts),
+        np.add.reduceat(counts, starts)
+    )
+
+class TimeSeriesStore:
+    """Append-only store of wearable vitals in compressed chunks with
+    minute/hour/day rollups maintained at write time.
+
+    Chunk payload times are epoch milliseconds in every tier. Compaction
+    merges each series, tier and day into one chunk marked `compacted`, so
+    later passes only read chunks written since.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def append(self, drained: List[Tuple[SeriesKey, np.ndarray, np.ndarray]]) -> int:
+        """Write one raw chunk and one chunk per rollup tier for every series"""
+        rows = []
+        written = 0
+        for (patient_id, metric), timestamps, values in drained:
+            if not len(timestamps):
+                continue
+            order = np.argsort(timestamps, kind="stable")
+            timestamps, values = timestamps[order], values[order]
+
+            rows.append(self._chunk_row(
+                patient_id, metric, "raw", _to_millis(timestamps), (values,), RAW_COLUMNS
+            ))
+            for tier in ROLLUP_TIERS:
+                buckets, *aggregates = compute_rollup(timestamps, values, TIERS[tier])
+                rows.append(self._chunk_row(
+                    patient_id, metric, tier, buckets * 1000, aggregates, ROLLUP_COLUMNS
+                ))
+            written += len(timestamps)
+
+        if rows:
+            self.db.execute(VitalChunk.__table__.insert(), rows)
+            self.db.commit()
+        return written
+
+    @staticmethod
+    def select_tier(start: datetime, end: datetime, resolution: str = "auto", max_points: int = 1000) -> str:
+        """Resolve "auto" to the finest tier that keeps the chart under max_points"""
+        if resolution != "auto":
+            if resolution not in TIERS:
+                raise ValueError(f"Unsupported resolution: {resolution}")
+            return resolution
+
+        span = max((end - start).total_seconds(), 0)
+        # Wearables sample at most about once a second
+        if span <= max_points:
+            return "raw"
+        for tier in ROLLUP_TIERS:
+            if span / TIERS[tier] <= max_points:
+                return tier
+        return "day"
+
+    def query(
+        self,
+        patient_id: int,
+        metric: str,
+        start: datetime,
+        end: datetime,
+        resolution: str = "auto",
+        max_points: int = 1000
+    ) -> Dict[str, Any]:
+        """Columnar series for a chart, read from a single tier"""
+        tier = self.select_tier(start, end, resolution, max_points)
+        width = TIERS[tier]
+        start_seconds, end_seconds = _to_seconds(start), _to_seconds(end)
+        if width:
+            # Include the bucket that contains start
+            start_seconds = start_seconds // width * width
+
+        payloads = [
+            payload for payload, in self.db.query(VitalChunk.payload).filter(
+                VitalChunk.patient_id == patient_id,
+                VitalChunk.metric == metric,
+                VitalChunk.tier == tier,
+                VitalChunk.start_time <= end,
+                VitalChunk.end_time >= _to_datetime(start_seconds)
+            ).order_by(VitalChunk.start_time)
+        ]
+
+        if tier == "raw":
+            times, values = self._concat([decode_chunk(p, tier) for p in payloads], 2)
+            seconds = times / 1000.0
+            keep = (seconds >= start_seconds) & (seconds <= end_seconds)
+            order = np.argsort(seconds[keep], kind="stable")
+            return {
+                "tier": tier,
+                "timestamps": seconds[keep][order],
+                "values": values[keep][order]
+            }
+
+        columns = self._concat([decode_chunk(p, tier) for p in payloads], 5)
+        seconds = columns[0] / 1000.0
+        keep = (seconds >= start_seconds) & (seconds <= end_seconds)
+        columns = [column[keep] for column in columns]
+        if len(columns[0]):
+            columns = merge_rollups(*columns)
+        buckets, mins, maxs, sums, counts = columns
+        return {
+            "tier": tier,
+            "timestamps": buckets / 1000.0,
+            "min": mins,
+            "max": maxs,
+            "mean": sums / np.maximum(counts, 1),
+            "count": counts
+        }
+
+    def compact(self, older_than: datetime, max_groups: int = 1000, batch_size: Optional[int] = None) -> int:
+        """Merge the uncompacted chunks of each series, tier and day that
+        ended before older_than into that day's compacted chunk; returns the
+        number of chunks removed. Candidates are read in keyset batches."""
+        batch_size = batch_size or settings.VITALS_COMPACTION_BATCH_SIZE
+        order = (VitalChunk.patient_id, VitalChunk.metric, VitalChunk.tier, VitalChunk.start_time, VitalChunk.id)
+        after = None
+        removed = groups = 0
+
+        while groups < max_groups:
+            query = self.db.query(*order).filter(
+                VitalChunk.compacted.is_(False),
+                VitalChunk.end_time < older_than
+            )
+            if after is not None:
+                query = query.filter(tuple_(*order) > after)
+            batch = query.order_by(*order).limit(batch_size).all()
+            if not batch:
+                break
+
+            grouped = [
+                (key, list(members)) for key, members in
+                groupby(batch, key=lambda c: (c.patient_id, c.metric, c.tier, c.start_time.date()))
+            ]
+            # The last group may continue in the next batch; leave it for then
+            if len(batch) == batch_size and len(grouped) > 1:
+                grouped.pop()
+            for (patient_id, metric, tier, day), members in grouped:
+                removed += self._compact_day(patient_id, metric, tier, day, [member.id for member in members])
+                groups += 1
+                after = tuple(members[-1])
+                if groups >= max_groups:
+                    break
+        return removed
+
+    def _compact_day(self, patient_id: int, metric: str, tier: str, day, ids: List[int]) -> int:
+        """Fold new chunks into the day's compacted chunk; returns chunks removed"""
+        day_start = datetime.combine(day, datetime.min.time())
+        ids = ids + [
+            chunk_id for chunk_id, in self.db.query(VitalChunk.id).filter(
+                VitalChunk.patient_id == patient_id,
+                VitalChunk.metric == metric,
+                VitalChunk.tier == tier,
+                VitalChunk.start_time >= day_start,
+                VitalChunk.start_time < day_start + timedelta(days=1),
+                VitalChunk.compacted.is_(True)
+            )
+        ]
+        try:
+            if len(ids) < 2:
+                self.db.query(VitalChunk).filter(VitalChunk.id.in_(ids)).update(
+                    {VitalChunk.compacted: True}, synchronize_session=False
+                )
+                self.db.commit()
+                return 0
+            self._merge_chunks(patient_id, metric, tier, ids)
+            return len(ids) - 1
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def _merge_chunks(self, patient_id: int, metric: str, tier: str, ids: List[int]) -> None:
+        payloads = [
+            payload for payload, in
+            self.db.query(VitalChunk.payload).filter(VitalChunk.id.in_(ids))
+        ]
+        if tier == "raw":
+            times, values = self._concat([decode_chunk(p, tier) for p in payloads], 2)
+            order = np.argsort(times, kind="stable")
+            times, columns = times[order], (values[order],)
+            dtypes = RAW_COLUMNS
+        else:
+            times, *columns = merge_rollups(*self._concat([decode_chunk(p, tier) for p in payloads], 5))
+            dtypes = ROLLUP_COLUMNS
+
+        self.db.query(VitalChunk).filter(VitalChunk.id.in_(ids)).delete(synchronize_session=False)
+        self.db.execute(VitalChunk.__table__.insert(), [
+            {**self._chunk_row(patient_id, metric, tier, times, columns, dtypes), "compacted": True}
+        ])
+        self.db.commit()
+
+    @staticmethod
+    def _concat(decoded: List[List[np.ndarray]], width: int) -> List[np.ndarray]:
+        if not decoded:
+            dtypes = ("<i8",) + (RAW_COLUMNS if width == 2 else ROLLUP_COLUMNS)
+            return [np.empty(0, dtype=dtype) for dtype in dtypes]
+        return [np.concatenate([columns[i] for columns in decoded]) for i in range(width)]
+
+    @staticmethod
+    def _chunk_row(patient_id, metric, tier, times, columns, dtypes) -> Dict[str, Any]:
+        """Insert row for a chunk whose (sorted) times are in milliseconds"""
+        return {
+            "patient_id": patient_id,
+            "metric": metric,
+            "tier": tier,
+            "start_time": _to_datetime(times[0] / 1000.0),
+            "end_time": _to_datetime(times[-1] / 1000.0),
+            "count": len(times),
+            "compacted": False,
+            "payload": encode_columns(times, columns, dtypes)
+        }
+
+def append_vitals(drained: List[Tuple[SeriesKey, np.ndarray, np.ndarray]]) -> int:
+    """Ingestion sink: persist drained ring buffers with a dedicated session"""
+    db = SessionLocal()
+    try:
+        return TimeSeriesStore(db).append(drained)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def compact_vitals() -> int:
+    """Run one compaction pass with a dedicated session"""
+    db = SessionLocal()
+    try:
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.VITALS_COMPACTION_AGE)
+        return TimeSeriesStore(db).compact(cutoff)
+    finally:
+        db.close()
+
+async def run_vitals_compaction_job(interval: Optional[float] = None) -> None:
+    """Periodically merge small chunks written by frequent flushes until cancelled"""
+    interval = interval or settings.VITALS_COMPACTION_INTERVAL
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed = await asyncio.to_thread(compact_vitals)
+            if removed:
+                logger.info(f"Vitals compaction merged away {removed} chunks")
+        except Exception as e:
+            logger.error(f"Vitals compaction job failed: {str(e)}")
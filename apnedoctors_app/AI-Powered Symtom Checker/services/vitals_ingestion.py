@@ -0,0 +1,328 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+import atexit
+import logging
+import threading
+import time
+from core.config import get_settings
+from core.database import SessionLocal
+from models.ai_models.vitals_anomaly import StreamingAnomalyDetector, get_anomaly_detector
+from models.db_models import Patient
+from .timeseries_store import append_vitals
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Plausible physical range per metric; anything outside is rejected at ingest
+METRIC_RANGES: Dict[str, Tuple[float, float]] = {
+    "heart_rate": (20.0, 250.0),  # bpm
+    "spo2": (50.0, 100.0),  # %
+    "steps": (0.0, 10000.0),  # per sample interval
+    "respiratory_rate": (4.0, 60.0),  # breaths/min
+    "skin_temperature": (25.0, 45.0)  # °C
+}
+
+SeriesKey = Tuple[int, str]
+
+def existing_patient_ids(patient_ids: Iterable[int]) -> Set[int]:
+    """The subset of patient_ids that exist in the database"""
+    db = SessionLocal()
+    try:
+        rows = db.query(Patient.id).filter(Patient.id.in_(list(patient_ids))).all()
+        return {row.id for row in rows}
+    finally:
+        db.close()
+
+class VitalRingBuffer:
+    """Fixed-capacity circular buffer of (timestamp, value) samples.
+
+    Memory is allocated once. When producers outrun the flusher the oldest
+    samples are overwritten and counted in `dropped`.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.timestamps = np.empty(capacity, dtype=np.float64)
+        self.values = np.empty(capacity, dtype=np.float32)
+        self.start = 0
+        self.size = 0
+        self.dropped = 0
+        self.last_write = time.monotonic()
+
+    def extend(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """Append samples, overwriting the oldest ones on overflow"""
+        count = len(timestamps)
+        self.last_write = time.monotonic()
+        if count >= self.capacity:
+            self.dropped += self.size + count - self.capacity
+            self.timestamps[:] = timestamps[-self.capacity:]
+            self.values[:] = values[-self.capacity:]
+            self.start, self.size = 0, self.capacity
+            return
+
+        overflow = self.size + count - self.capacity
+        if overflow > 0:
+            self.start = (self.start + overflow) % self.capacity
+            self.size -= overflow
+            self.dropped += overflow
+
+        end = (self.start + self.size) % self.capacity
+        first = min(count, self.capacity - end)
+        self.timestamps[end:end + first] = timestamps[:first]
+        self.values[end:end + first] = values[:first]
+        if first < count:
+            self.timestamps[:count - first] = timestamps[first:]
+            self.values[:count - first] = values[first:]
+        self.size += count
+
+    def drain(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Copy out all buffered samples, oldest first, and empty the buffer"""
+        end = self.start + self.size
+        if end <= self.capacity:
+            timestamps = self.timestamps[self.start:end].copy()
+            values = self.values[self.start:end].copy()
+        else:
+            wrapped = end - self.capacity
+            timestamps = np.concatenate((self.timestamps[self.start:], self.timestamps[:wrapped]))
+            values = np.concatenate((self.values[self.start:], self.values[:wrapped]))
+        self.start = self.size = 0
+        return timestamps, values
+
+PreparedSeries = Tuple[SeriesKey, np.ndarray, np.ndarray, int]
+
+class VitalsIngestor:
+    """Validates batched wearable samples into per-series ring buffers and
+    flushes them to the time-series store in bulk from a background thread.
+
+    Samples are only buffered for patients `patient_lookup` confirms exist
+    (positive answers are cached for VITALS_PATIENT_CACHE_TTL). Buffers that
+    stay empty for VITALS_BUFFER_IDLE_TIMEOUT are released.
+    """
+
+    def __init__(
+        self,
+        capacity: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        sink: Optional[Callable[[List[Tuple[SeriesKey, np.ndarray, np.ndarray]]], int]] = None,
+        detector: Optional[StreamingAnomalyDetector] = None,
+        patient_lookup: Optional[Callable[[Iterable[int]], Set[int]]] = None
+    ):
+        self.capacity = capacity or settings.VITALS_BUFFER_CAPACITY
+        self.flush_interval = flush_interval or settings.VITALS_FLUSH_INTERVAL
+        self.high_water = int(self.capacity * settings.VITALS_FLUSH_HIGH_WATER)
+        self.sink = sink or append_vitals
+        self.detector = detector or get_anomaly_detector()
+        self.patient_lookup = patient_lookup or existing_patient_ids
+
+        self._buffers: Dict[SeriesKey, VitalRingBuffer] = {}
+        # patient_id -> monotonic time until which it is known to exist
+        self._known_patients: Dict[int, float] = {}
+        self._evicted_dropped = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self.stats = {"accepted": 0, "rejected": 0, "flushed": 0, "flush_errors": 0}
+
+        self._thread = threading.Thread(target=self._run, name="vitals-flusher", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def dropped(self) -> int:
+        with self._lock:
+            return self._evicted_dropped + sum(buffer.dropped for buffer in self._buffers.values())
+
+    def series_dropped(self, patient_id: int, metric: str) -> int:
+        """Samples of one series lost to buffer overflow so far"""
+        with self._lock:
+            buffer = self._buffers.get((patient_id, metric))
+            return buffer.dropped if buffer is not None else 0
+
+    def check_patients(self, patient_ids: Iterable[int]) -> None:
+        """Raise ValueError unless every patient exists (may query the database)"""
+        now = time.monotonic()
+        with self._lock:
+            unknown = {
+                patient_id for patient_id in patient_ids
+                if self._known_patients.get(patient_id, 0.0) <= now
+            }
+        if not unknown:
+            return
+
+        found = self.patient_lookup(unknown)
+        expires = now + settings.VITALS_PATIENT_CACHE_TTL
+        with self._lock:
+            for patient_id in found:
+                self._known_patients[patient_id] = expires
+        missing = unknown - found
+        if missing:
+            raise ValueError(f"Unknown patient_id: {', '.join(str(p) for p in sorted(missing))}")
+
+    def ingest(self, patient_id: int, metric: str, timestamps: Any, values: Any) -> Tuple[int, int]:
+        """Validate and buffer one series; returns (accepted, rejected)"""
+        prepared = self._prepare(patient_id, metric, timestamps, values)
+        self.check_patients([patient_id])
+        return self._apply([prepared])
+
+    def ingest_batch(self, series: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Ingest columnar series of the form
+        {"patient_id", "metric", "timestamps": [...], "values": [...]}.
+        The whole batch is validated before anything is buffered, so a bad
+        series rejects the batch without a partial write."""
+        prepared = []
+        for item in series:
+            try:
+                patient_id = int(item["patient_id"])
+                metric = item["metric"]
+                timestamps, values = item["timestamps"], item["values"]
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"Malformed series: {str(e)}")
+            prepared.append(self._prepare(patient_id, metric, timestamps, values))
+        self.check_patients({key[0] for key, _, _, _ in prepared})
+
+        accepted, rejected = self._apply(prepared)
+        return {"accepted": accepted, "rejected": rejected}
+
+    def _prepare(self, patient_id: int, metric: str, timestamps: Any, values: Any) -> PreparedSeries:
+        """Validate one series without side effects: (key, valid timestamps, valid values, rejected)"""
+        if metric not in METRIC_RANGES:
+            raise ValueError(f"Unsupported metric: {metric}")
+
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float32)
+        if timestamps.ndim != 1 or timestamps.shape != values.shape:
+            raise ValueError("timestamps and values must be flat arrays of equal length")
+
+        low, high = METRIC_RANGES[metric]
+        now = time.time()
+        valid = (
+            np.isfinite(values) & (values >= low) & (values <= high)
+            & np.isfinite(timestamps)
+            & (timestamps >= now - settings.VITALS_MAX_SAMPLE_AGE)
+            & (timestamps <= now + settings.VITALS_MAX_CLOCK_SKEW)
+        )
+        accepted = int(valid.sum())
+        if accepted < len(valid):
+            timestamps, values = timestamps[valid], values[valid]
+        return (patient_id, metric), timestamps, values, len(valid) - accepted
+
+    def _apply(self, prepared: List[PreparedSeries]) -> Tuple[int, int]:
+        """Buffer validated series; returns (accepted, rejected)"""
+        accepted = rejected = 0
+        full = False
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Vitals ingestor is closed")
+            for key, timestamps, values, bad in prepared:
+                rejected += bad
+                if not len(timestamps):
+                    continue
+                buffer = self._buffers.get(key)
+                if buffer is None:
+                    buffer = self._buffers[key] = VitalRingBuffer(self.capacity)
+                buffer.extend(timestamps, values)
+                accepted += len(timestamps)
+                full = full or buffer.size >= self.high_water
+            self.stats["accepted"] += accepted
+            self.stats["rejected"] += rejected
+        if full:
+            self._wakeup.set()
+        return accepted, rejected
+
+    def flush(self) -> int:
+        """Write out everything buffered; returns the number of samples stored"""
+        with self._flush_lock:
+            with self._lock:
+                self._evict_idle()
+                drained = [
+                    (key, *buffer.drain())
+                    for key, buffer in self._buffers.items()
+                    if buffer.size
+                ]
+            if not drained:
+                return 0
+
+            # Each flush is one detector tick across all active patients
+            try:
+                self.detector.update(drained)
+            except Exception as e:
+                logger.error(f"Vitals anomaly detection failed: {str(e)}")
+
+            try:
+                written = self.sink(drained)
+            except Exception as e:
+                logger.error(f"Vitals flush failed: {str(e)}")
+                self._requeue(drained)
+                with self._lock:
+                    self.stats["flush_errors"] += 1
+                return 0
+
+            with self._lock:
+                self.stats["flushed"] += written
+            return written
+
+    def close(self) -> None:
+        """Stop the background flusher and write out anything still buffered"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+        self._wakeup.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+        atexit.unregister(self.close)
+
+    def _evict_idle(self) -> None:
+        """Release empty buffers nobody has written to lately (caller holds _lock)"""
+        cutoff = time.monotonic() - settings.VITALS_BUFFER_IDLE_TIMEOUT
+        idle = [
+            key for key, buffer in self._buffers.items()
+            if not buffer.size and buffer.last_write < cutoff
+        ]
+        for key in idle:
+            self._evicted_dropped += self._buffers.pop(key).dropped
+        now = time.monotonic()
+        expired = [patient_id for patient_id, until in self._known_patients.items() if until <= now]
+        for patient_id in expired:
+            del self._known_patients[patient_id]
+
+    def _requeue(self, drained: List[Tuple[SeriesKey, np.ndarray, np.ndarray]]) -> None:
+        """Put samples from a failed flush back, ahead of anything newer"""
+        with self._lock:
+            for key, timestamps, values in drained:
+                buffer = self._buffers.get(key)
+                if buffer is None:
+                    buffer = self._buffers[key] = VitalRingBuffer(self.capacity)
+                newer = buffer.drain()
+                buffer.extend(timestamps, values)
+                buffer.extend(*newer)
+
+    def _run(self) -> None:
+        """Flush when a buffer passes the high-water mark or the interval elapses"""
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Vitals flusher loop failed: {str(e)}")
+
+_ingestor: Optional[VitalsIngestor] = None
+_ingestor_lock = threading.Lock()
+
+def get_vitals_ingestor() -> VitalsIngestor:
+    """Shared application-wide vitals ingestor"""
+    global _ingestor
+    with _ingestor_lock:
+        if _ingestor is None or _ingestor._closed:
+            _ingestor = VitalsIngestor()
+        return _ingestor
+
+def shutdown_vitals_ingestor() -> None:
+    """Flush and stop the shared ingestor if it was ever started"""
+    with _ingestor_lock:
+        if _ingestor is not None:
+            _ingestor.close()
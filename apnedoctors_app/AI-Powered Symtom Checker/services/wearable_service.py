@@ -1,15 +1,51 @@
-import aiohttp
-from typing import Dict, Any
+from sqlalchemy import tuple_
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from datetime import datetime
+import asyncio
 import logging
+import time
+import numpy as np
+from core.config import get_settings
+from core.database import SessionLocal
+from models.db_models import WearableSyncCursor
+from utils.token_bucket import TokenBucket
+from .http_client import get_http_session
+from .resilience import call_with_resilience, parse_retry_after, CircuitOpenError, RateLimited, UpstreamError
+from .vitals_ingestion import get_vitals_ingestor, VitalsIngestor, METRIC_RANGES
 
+settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Keys per IN (...) lookup when saving cursors
+CURSOR_LOOKUP_CHUNK = 500
+
+# Shared by every sync so provider quotas hold process-wide
+_provider_buckets: Dict[str, TokenBucket] = {}
+provider_metrics: Dict[str, Dict[str, float]] = {}
+
+def _provider_bucket(device_type: str) -> TokenBucket:
+    if device_type not in _provider_buckets:
+        limits = settings.WEARABLE_PROVIDER_RATE_LIMITS[device_type]
+        _provider_buckets[device_type] = TokenBucket(limits["rate"], limits["burst"])
+        provider_metrics[device_type] = {
+            "requests": 0, "throttled_requests": 0, "throttled_seconds": 0.0, "rate_limited": 0, "rejected_samples": 0
+        }
+    return _provider_buckets[device_type]
+
+class SyncInterrupted(Exception):
+    """A sync stopped part-way; `high_water` covers only what was stored"""
+
+    def __init__(self, samples: int, high_water: Optional[float], cause: Exception):
+        super().__init__(str(cause))
+        self.samples = samples
+        self.high_water = high_water
+
 class WearableService:
     def __init__(self):
         self.supported_devices = {
-            "apple_health": "https://api.apple.com/health",
-            "fitbit": "https://api.fitbit.com/1",
-            "google_fit": "https://www.googleapis.com/fitness/v1"
+            "apple_health": settings.APPLE_HEALTH_API,
+            "fitbit": settings.FITBIT_API,
+            "google_fit": settings.GOOGLE_FIT_API
         }
 
     async def get_vitals(self, device_type: str, user_id: str) -> Dict[str, Any]:
@@ -18,15 +54,23 @@ class WearableService:
             if device_type not in self.supported_devices:
                 raise ValueError(f"Unsupported device type: {device_type}")
 
-            async with aiohttp.ClientSession() as session:
-                api_url = self.supported_devices[device_type]
-                async with session.get(
+            api_url = self.supported_devices[device_type]
+
+            async def request() -> Dict[str, Any]:
+                async with get_http_session().get(
                     f"{api_url}/user/{user_id}/vitals"
                 ) as response:
+                    _raise_for_upstream(device_type, response)
                     if response.status == 200:
                         return await response.json()
                     return {}
 
+            return await call_with_resilience(
+                f"wearable.{device_type}", request, acquire=lambda: _throttle(device_type)
+            )
+
+        except CircuitOpenError:
+            return {}
         except Exception as e:
             logger.error(f"Wearable data fetch failed: {str(e)}")
             return {}
@@ -34,8 +78,211 @@ class WearableService:
     async def sync_data(self, device_type: str, user_id: str) -> bool:
         """Sync latest data from wearable device"""
         try:
-            # Implement device-specific sync logic here
+            if device_type not in self.supported_devices:
+                raise ValueError(f"Unsupported device type: {device_type}")
+
+            patient_id = int(user_id)
+            since = await asyncio.to_thread(load_sync_cursor, patient_id, device_type)
+            try:
+                samples, high_water = await self.fetch_new_data(device_type, user_id, since)
+            except SyncInterrupted as e:
+                # Keep the progress that did reach the store
+                await asyncio.to_thread(save_sync_cursors, [
+                    {"patient_id": patient_id, "device_type": device_type,
+                     "high_water": e.high_water, "last_error": str(e)[:500]}
+                ])
+                raise
+
+            await asyncio.to_thread(save_sync_cursors, [
+                {"patient_id": patient_id, "device_type": device_type, "high_water": high_water, "last_error": None}
+            ])
+            logger.info(f"Synced {samples} samples from {device_type} for user {user_id}")
             return True
         except Exception as e:
             logger.error(f"Wearable sync failed: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+
+    async def fetch_new_data(
+        self,
+        device_type: str,
+        user_id: str,
+        since: Optional[float]
+    ) -> Tuple[int, Optional[float]]:
+        """Pull samples newer than `since` page by page into the vitals
+        ingestor, flushing each page to the store before fetching the next.
+
+        Returns (samples accepted, new high-water mark). The mark only moves
+        past samples that are stored or were rejected for good; samples
+        ahead of the clock are fetched again later. If a page fails, raises
+        SyncInterrupted with the mark reached by the pages before it.
+        """
+        ingestor = get_vitals_ingestor()
+        patient_id = int(user_id)
+        high_water = since
+        accepted = 0
+
+        for _ in range(settings.WEARABLE_SYNC_MAX_PAGES):
+            try:
+                page = await self._fetch_page(device_type, user_id, high_water)
+                count, newest = await self._store_page(ingestor, patient_id, device_type, page)
+            except Exception as e:
+                raise SyncInterrupted(accepted, high_water, e) from e
+            accepted += count
+            if newest is not None:
+                high_water = newest if high_water is None else max(high_water, newest)
+
+            if not page.get("has_more"):
+                break
+
+        return accepted, high_water
+
+    async def _store_page(
+        self,
+        ingestor: VitalsIngestor,
+        patient_id: int,
+        device_type: str,
+        page: Dict[str, Any]
+    ) -> Tuple[int, Optional[float]]:
+        """Buffer one page and flush it; returns (accepted, newest timestamp
+        the cursor may move past). Raises if any of it did not reach the store."""
+        await asyncio.to_thread(ingestor.check_patients, [patient_id])
+        horizon = time.time() + settings.VITALS_MAX_CLOCK_SKEW
+        newest = None
+        accepted = rejected = 0
+        dropped = {}
+
+        for series in page.get("series", []):
+            timestamps = np.asarray(series.get("timestamps") or [], dtype=np.float64)
+            if not len(timestamps):
+                continue
+            # Samples ahead of the clock may become valid later, so the cursor
+            # stays behind them; unsupported metrics are passed over for good
+            settled = timestamps[timestamps <= horizon]
+            if len(settled):
+                newest = float(settled.max()) if newest is None else max(newest, float(settled.max()))
+
+            metric = series.get("metric")
+            if metric in METRIC_RANGES:
+                dropped.setdefault(metric, ingestor.series_dropped(patient_id, metric))
+                ok, bad = ingestor.ingest(patient_id, metric, timestamps, series.get("values") or [])
+                accepted += ok
+                rejected += bad
+
+        flush_errors = ingestor.stats["flush_errors"]
+        await asyncio.to_thread(ingestor.flush)
+        if ingestor.stats["flush_errors"] > flush_errors:
+            raise RuntimeError("Vitals flush failed")
+        overflowed = sum(ingestor.series_dropped(patient_id, metric) - before for metric, before in dropped.items())
+        if overflowed:
+            raise RuntimeError(f"{overflowed} samples overflowed the vitals buffer before they were stored")
+
+        if rejected:
+            provider_metrics[device_type]["rejected_samples"] += rejected
+            logger.warning(f"Rejected {rejected} invalid samples from {device_type} for patient {patient_id}")
+        return accepted, newest
+
+    async def _fetch_page(self, device_type: str, user_id: str, since: Optional[float]) -> Dict[str, Any]:
+        """One rate-limited page of samples newer than `since`, in columnar form:
+        {"series": [{"metric", "timestamps", "values"}], "has_more": bool}"""
+        url = f"{self.supported_devices[device_type]}/user/{user_id}/vitals"
+        # A page never holds more than one ring buffer of samples per series
+        params = {"limit": min(settings.WEARABLE_SYNC_PAGE_SIZE, get_vitals_ingestor().capacity)}
+        if since is not None:
+            params["since"] = repr(since)
+
+        async def request() -> Dict[str, Any]:
+            async with get_http_session().get(url, params=params) as response:
+                _raise_for_upstream(device_type, response)
+                if response.status != 200:
+                    raise ValueError(f"{device_type} returned {response.status}")
+                return await response.json()
+
+        return await call_with_resilience(
+            f"wearable.{device_type}", request, acquire=lambda: _throttle(device_type)
+        )
+
+async def _throttle(device_type: str) -> None:
+    """Wait for the provider's token bucket; taken again for every retry"""
+    waited = await _provider_bucket(device_type).acquire()
+    metrics = provider_metrics[device_type]
+    metrics["requests"] += 1
+    if waited:
+        metrics["throttled_requests"] += 1
+        metrics["throttled_seconds"] += waited
+
+def _raise_for_upstream(device_type: str, response) -> None:
+    if response.status == 429:
+        provider_metrics[device_type]["rate_limited"] += 1
+        raise RateLimited(f"{device_type} returned 429", parse_retry_after(response.headers.get("Retry-After")))
+    if response.status >= 500:
+        raise UpstreamError(f"{device_type} returned {response.status}")
+
+def load_sync_cursor(patient_id: int, device_type: str) -> Optional[float]:
+    """High-water mark of a linked device, or None before its first sync"""
+    db = SessionLocal()
+    try:
+        cursor = db.query(WearableSyncCursor).get((patient_id, device_type))
+        return cursor.high_water if cursor is not None else None
+    finally:
+        db.close()
+
+def list_sync_cursors() -> List[Tuple[int, str, Optional[float]]]:
+    """(patient_id, device_type, high_water) for every linked device"""
+    db = SessionLocal()
+    try:
+        return [
+            tuple(row) for row in db.query(
+                WearableSyncCursor.patient_id,
+                WearableSyncCursor.device_type,
+                WearableSyncCursor.high_water
+            )
+        ]
+    finally:
+        db.close()
+
+def save_sync_cursors(updates: Iterable[Dict[str, Any]]) -> None:
+    """Persist sync results; creates cursors for devices synced for the first time"""
+    updates = list(updates)
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        existing = {}
+        keys = [(update["patient_id"], update["device_type"]) for update in updates]
+        for start in range(0, len(keys), CURSOR_LOOKUP_CHUNK):
+            for cursor in db.query(WearableSyncCursor).filter(
+                tuple_(WearableSyncCursor.patient_id, WearableSyncCursor.device_type).in_(
+                    keys[start:start + CURSOR_LOOKUP_CHUNK]
+                )
+            ):
+                existing[(cursor.patient_id, cursor.device_type)] = cursor
+
+        for key, update in zip(keys, updates):
+            cursor = existing.get(key)
+            if cursor is None:
+                cursor = existing[key] = WearableSyncCursor(patient_id=key[0], device_type=key[1])
+                db.add(cursor)
+            if update.get("high_water") is not None:
+                cursor.high_water = update["high_water"]
+            cursor.last_error = update.get("last_error")
+            cursor.last_synced_at = now
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def link_device(patient_id: int, device_type: str) -> bool:
+    """Register a patient's device for scheduled sync; False if already linked"""
+    db = SessionLocal()
+    try:
+        if db.query(WearableSyncCursor).get((patient_id, device_type)) is not None:
+            return False
+        db.add(WearableSyncCursor(patient_id=patient_id, device_type=device_type))
+        db.commit()
+        return True
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
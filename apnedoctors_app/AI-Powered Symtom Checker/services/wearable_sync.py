@@ -0,0 +1,117 @@
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import logging
+import time
+from core.config import get_settings
+from .wearable_service import (
+    WearableService, SyncInterrupted, list_sync_cursors, save_sync_cursors, provider_metrics
+)
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+class WearableSyncScheduler:
+    """Syncs every linked wearable device in rounds.
+
+    Users are synced concurrently (bounded by a semaphore) while each
+    provider's token bucket in WearableService paces its requests. Every
+    page is flushed to the time-series store as it is fetched, and each
+    user's high-water mark is saved at the end of the round, covering
+    exactly the pages that were stored (also for syncs that failed later).
+    """
+
+    def __init__(self, service: Optional[WearableService] = None, concurrency: Optional[int] = None):
+        self.service = service or WearableService()
+        self.concurrency = concurrency or settings.WEARABLE_SYNC_CONCURRENCY
+        self.stats = {
+            "rounds": 0,
+            "syncs": 0,
+            "failures": 0,
+            "samples": 0,
+            "last_round_seconds": 0.0,
+            "last_round_samples_per_second": 0.0
+        }
+        # Seconds between now and each device's newest synced sample
+        self.lag: Dict[Tuple[int, str], float] = {}
+
+    async def run_once(self) -> Dict[str, int]:
+        """Sync all linked devices once; returns counts for this round"""
+        started = time.perf_counter()
+        cursors = await asyncio.to_thread(list_sync_cursors)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def sync_one(patient_id: int, device_type: str, high_water: Optional[float]):
+            async with semaphore:
+                try:
+                    samples, new_high_water = await self.service.fetch_new_data(
+                        device_type, str(patient_id), high_water
+                    )
+                    return {"patient_id": patient_id, "device_type": device_type,
+                            "high_water": new_high_water, "last_error": None}, samples
+                except SyncInterrupted as e:
+                    logger.warning(f"Sync of {device_type} for patient {patient_id} failed: {str(e)}")
+                    return {"patient_id": patient_id, "device_type": device_type,
+                            "high_water": e.high_water, "last_error": str(e)[:500]}, e.samples
+                except Exception as e:
+                    logger.warning(f"Sync of {device_type} for patient {patient_id} failed: {str(e)}")
+                    return {"patient_id": patient_id, "device_type": device_type,
+                            "high_water": None, "last_error": str(e)[:500]}, 0
+
+        results = await asyncio.gather(*(sync_one(*cursor) for cursor in cursors))
+        updates = [update for update, _ in results]
+        samples = sum(count for _, count in results)
+        failures = sum(1 for update in updates if update["last_error"])
+
+        if updates:
+            await asyncio.to_thread(save_sync_cursors, updates)
+
+        elapsed = time.perf_counter() - started
+        now = time.time()
+        for update, (_, _, previous) in zip(updates, cursors):
+            high_water = update["high_water"] if update["high_water"] is not None else previous
+            if high_water is not None:
+                self.lag[(update["patient_id"], update["device_type"])] = now - high_water
+
+        self.stats["rounds"] += 1
+        self.stats["syncs"] += len(updates) - failures
+        self.stats["failures"] += failures
+        self.stats["samples"] += samples
+        self.stats["last_round_seconds"] = elapsed
+        self.stats["last_round_samples_per_second"] = samples / elapsed if elapsed else 0.0
+        return {"devices": len(updates), "failures": failures, "samples": samples}
+
+    def metrics(self, top: int = 10) -> Dict[str, Any]:
+        """Throughput, per-user lag and provider throttling"""
+        lags = sorted(self.lag.items(), key=lambda item: item[1], reverse=True)
+        return {
+            **self.stats,
+            "lag_seconds": {
+                "max": lags[0][1] if lags else None,
+                "mean": sum(lag for _, lag in lags) / len(lags) if lags else None,
+                "most_behind": [
+                    {"patient_id": patient_id, "device_type": device_type, "lag": lag}
+                    for (patient_id, device_type), lag in lags[:top]
+                ]
+            },
+            "providers": provider_metrics
+        }
+
+_scheduler: Optional[WearableSyncScheduler] = None
+
+def get_sync_scheduler() -> WearableSyncScheduler:
+    """Process-wide wearable sync scheduler"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = WearableSyncScheduler()
+    return _scheduler
+
+async def run_wearable_sync_job(interval: Optional[float] = None) -> None:
+    """Run sync rounds until cancelled"""
+    interval = interval or settings.WEARABLE_SYNC_INTERVAL
+    while True:
+        try:
+            result = await get_sync_scheduler().run_once()
+            logger.info(f"Wearable sync round: {result}")
+        except Exception as e:
+            logger.error(f"Wearable sync job failed: {str(e)}")
+        await asyncio.sleep(interval)
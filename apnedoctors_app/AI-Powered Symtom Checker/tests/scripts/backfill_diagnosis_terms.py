@@ -0,0 +1,71 @@
+from sqlalchemy import select
+import argparse
+import logging
+from core.config import get_settings
+from core.database import engine
+from models.db_models import Diagnosis
+from models.db_models.diagnosis_terms import clear_diagnosis_terms, index_diagnosis_terms
+from core.logging_config import setup_logging
+
+settings = get_settings()
+setup_logging(json_format=False)
+logger = logging.getLogger(__name__)
+
+class DiagnosisTermBackfill:
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+        self.table = Diagnosis.__table__
+
+    def backfill(self, start_id: int = 0) -> bool:
+        """Populate diagnosis_symptoms/diagnosis_conditions for existing rows.
+
+        Walks diagnoses in primary-key order, one transaction per batch.
+        Each batch clears and rewrites its association rows, so the job is
+        idempotent and can be resumed from the last logged ID.
+        """
+        try:
+            last_id = start_id
+            total = 0
+            columns = [
+                self.table.c.id,
+                self.table.c.patient_id,
+                self.table.c.timestamp,
+                self.table.c.symptoms,
+                self.table.c.diagnosis
+            ]
+
+            while True:
+                with engine.begin() as connection:
+                    rows = connection.execute(
+                        select(*columns)
+                        .where(self.table.c.id > last_id)
+                        .order_by(self.table.c.id)
+                        .limit(self.batch_size)
+                    ).mappings().all()
+
+                    if not rows:
+                        break
+
+                    ids = [row["id"] for row in rows]
+                    clear_diagnosis_terms(connection, ids)
+                    index_diagnosis_terms(connection, rows)
+
+                last_id = ids[-1]
+                total += len(rows)
+                logger.info(f"Backfilled {total} diagnoses (last id {last_id})")
+
+            logger.info("Diagnosis term backfill completed")
+            return True
+
+        except Exception as e:
+            logger.error(f"Diagnosis term backfill failed: {str(e)}")
+            return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill normalized diagnosis symptoms")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--start-id", type=int, default=0)
+    args = parser.parse_args()
+
+    backfill = DiagnosisTermBackfill(batch_size=args.batch_size)
+    backfill.backfill(start_id=args.start_id)
@@ -0,0 +1,63 @@
+import argparse
+import logging
+import time
+import numpy as np
+from models.ai_models.vitals_anomaly import StreamingAnomalyDetector, METRIC_CONFIG
+from core.logging_config import setup_logging
+
+setup_logging(json_format=False)
+logger = logging.getLogger(__name__)
+
+class AnomalyDetectorBenchmark:
+    """CPU cost per sample of StreamingAnomalyDetector.update at realistic tick sizes"""
+
+    def __init__(self, patients: int = 5000, samples_per_tick: int = 10, ticks: int = 30):
+        self.patients = patients
+        self.samples_per_tick = samples_per_tick
+        self.ticks = ticks
+        self.rng = np.random.default_rng(0)
+
+    def make_tick(self, start: float):
+        """One flush worth of 1 Hz samples for every patient and metric"""
+        timestamps = start + np.arange(self.samples_per_tick, dtype=np.float64)
+        baselines = {"heart_rate": 70, "spo2": 97, "respiratory_rate": 15, "skin_temperature": 33, "steps": 20}
+        series = []
+        for patient_id in range(self.patients):
+            for metric in METRIC_CONFIG:
+                values = baselines[metric] + self.rng.normal(0, 1, self.samples_per_tick)
+                series.append(((patient_id, metric), timestamps, values))
+        return series
+
+    def run(self) -> None:
+        detector = StreamingAnomalyDetector()
+        now = time.time() - self.ticks * self.samples_per_tick
+        ticks = [self.make_tick(now + i * self.samples_per_tick) for i in range(self.ticks)]
+
+        # First tick allocates slots for every patient; time the steady state
+        detector.update(ticks[0])
+        started = time.process_time()
+        for tick in ticks[1:]:
+            detector.update(tick)
+        cpu = time.process_time() - started
+
+        samples = (self.ticks - 1) * self.patients * len(METRIC_CONFIG) * self.samples_per_tick
+        logger.info(
+            f"{samples} samples over {self.ticks - 1} ticks: {cpu * 1e9 / samples:.0f} ns CPU/sample, "
+            f"{cpu * 1000 / (self.ticks - 1):.1f} ms per tick for {self.patients} patients"
+        )
+
+        started = time.process_time()
+        for patient_id in range(self.patients):
+            detector.risk_factors(patient_id)
+        lookup = time.process_time() - started
+        logger.info(f"risk factor lookup: {lookup * 1e6 / self.patients:.1f} us per patient")
+        logger.info(f"detector stats: {detector.stats}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark streaming vitals anomaly detection")
+    parser.add_argument("--patients", type=int, default=5000)
+    parser.add_argument("--samples", type=int, default=10, help="samples per series per tick")
+    parser.add_argument("--ticks", type=int, default=30)
+    args = parser.parse_args()
+
+    AnomalyDetectorBenchmark(args.patients, args.samples, args.ticks).run()
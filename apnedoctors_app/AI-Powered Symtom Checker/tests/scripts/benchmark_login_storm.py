@@ -0,0 +1,145 @@
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+import aiohttp
+import argparse
+import asyncio
+import logging
+import statistics
+import threading
+import time
+import uvicorn
+from core.password_hasher import LoginThrottled, PasswordHasher, PasswordHasherBusy
+from core.logging_config import setup_logging
+
+setup_logging(json_format=False)
+logger = logging.getLogger(__name__)
+
+class Credentials(BaseModel):
+    username: str
+    password: str
+
+class LoginStormBenchmark:
+    """Login throughput, and latency of a cheap endpoint, during a login spike.
+
+    Serves a minimal app with POST /login (bcrypt check against an
+    in-memory user table) and GET /ping. Runs the same spike twice: once
+    with bcrypt called inline on the event loop, as AuthHandler used to,
+    and once through PasswordHasher's worker pool. /ping latency should
+    stay flat in the second run.
+    """
+
+    def __init__(self, users: int = 200, logins: int = 400, concurrency: int = 50, rounds: int = 10, port: int = 8093):
+        self.users = users
+        self.logins = logins
+        self.concurrency = concurrency
+        self.rounds = rounds
+        self.port = port
+
+    def build_app(self, hasher: PasswordHasher, inline: bool) -> FastAPI:
+        app = FastAPI()
+        stored = {f"user{i}": hasher.context.hash(f"password{i}") for i in range(self.users)}
+
+        @app.post("/login")
+        async def login(credentials: Credentials):
+            hashed = stored.get(credentials.username)
+            if hashed is None:
+                raise HTTPException(status_code=401)
+            try:
+                if inline:
+                    valid = hasher.context.verify(credentials.password, hashed)
+                else:
+                    valid, new_hash = await hasher.verify_and_update(credentials.username, credentials.password, hashed)
+                    if new_hash:
+                        stored[credentials.username] = new_hash
+            except LoginThrottled as e:
+                raise HTTPException(status_code=429, headers={"Retry-After": str(int(e.retry_after) + 1)})
+            except PasswordHasherBusy:
+                raise HTTPException(status_code=503)
+            if not valid:
+                raise HTTPException(status_code=401)
+            return {"ok": True}
+
+        @app.get("/ping")
+        async def ping():
+            return {"ok": True}
+
+        return app
+
+    def serve(self, app: FastAPI) -> uvicorn.Server:
+        server = uvicorn.Server(uvicorn.Config(app, port=self.port, log_level="warning"))
+        server.install_signal_handlers = lambda: None
+        threading.Thread(target=server.run, daemon=True).start()
+        while not server.started:
+            time.sleep(0.05)
+        return server
+
+    async def spike(self) -> dict:
+        base = f"http://127.0.0.1:{self.port}"
+        connector = aiohttp.TCPConnector(limit=self.concurrency + 1)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            statuses = []
+
+            async def login(i: int):
+                user = i % self.users
+                async with semaphore:
+                    payload = {"username": f"user{user}", "password": f"password{user}"}
+                    async with session.post(f"{base}/login", json=payload) as response:
+                        statuses.append(response.status)
+
+            ping_latencies = []
+            done = asyncio.Event()
+
+            async def probe():
+                while not done.is_set():
+                    started = time.perf_counter()
+                    async with session.get(f"{base}/ping") as response:
+                        await response.read()
+                    ping_latencies.append(time.perf_counter() - started)
+                    await asyncio.sleep(0.01)
+
+            prober = asyncio.create_task(probe())
+            started = time.perf_counter()
+            await asyncio.gather(*(login(i) for i in range(self.logins)))
+            elapsed = time.perf_counter() - started
+            done.set()
+            await prober
+
+        ping_latencies.sort()
+        return {
+            "logins_per_second": self.logins / elapsed,
+            "ok": statuses.count(200),
+            "throttled": statuses.count(429),
+            "ping_p50_ms": statistics.median(ping_latencies) * 1000,
+            "ping_p99_ms": ping_latencies[int(len(ping_latencies) * 0.99) - 1] * 1000,
+            "ping_max_ms": ping_latencies[-1] * 1000
+        }
+
+    def run(self) -> None:
+        for inline in (True, False):
+            # Generous attempt budget so only the bcrypt path is measured
+            hasher = PasswordHasher(rounds=self.rounds, attempts_per_minute=6000, attempt_burst=100)
+            server = self.serve(self.build_app(hasher, inline))
+            try:
+                result = asyncio.run(self.spike())
+            finally:
+                server.should_exit = True
+                time.sleep(0.2)
+                hasher.close()
+            mode = "inline bcrypt" if inline else f"hasher pool ({hasher.workers} workers)"
+            logger.info(
+                f"{mode}: {result['logins_per_second']:.1f} logins/s ({result['ok']} ok, "
+                f"{result['throttled']} throttled); /ping p50 {result['ping_p50_ms']:.1f} ms, "
+                f"p99 {result['ping_p99_ms']:.1f} ms, max {result['ping_max_ms']:.1f} ms"
+            )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark logins and unrelated endpoint latency during a login spike")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--logins", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=10, help="bcrypt cost")
+    parser.add_argument("--port", type=int, default=8093)
+    args = parser.parse_args()
+
+    LoginStormBenchmark(args.users, args.logins, args.concurrency, args.rounds, args.port).run()
@@ -0,0 +1,116 @@
+from fastapi import FastAPI
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from typing import List
+import argparse
+import asyncio
+import logging
+import time
+from api import build_middleware
+from api.middleware import RateLimitMiddleware
+from api.middleware.auth import AuthHandler
+from core.rate_limiter import RateLimiter
+from core.logging_config import setup_logging
+
+setup_logging(json_format=False)
+logger = logging.getLogger(__name__)
+
+async def _passthrough(request, call_next):
+    return await call_next(request)
+
+class MiddlewareOverheadBenchmark:
+    """Per-request cost of the middleware stack on an empty route.
+
+    Requests are driven straight through the ASGI interface, so the
+    numbers exclude the server and network. Compares a bare app, the
+    app's pure-ASGI stack, and the same number of call_next-style
+    BaseHTTPMiddleware layers doing nothing.
+    """
+
+    def __init__(self, requests: int = 20000):
+        self.requests = requests
+        token = AuthHandler.create_access_token({"sub": "benchmark"})
+        self.headers = [(b"host", b"bench"), (b"authorization", f"Bearer {token}".encode())]
+
+    def pure_asgi_stack(self) -> List[Middleware]:
+        """The production stack with a limiter that never throttles"""
+        stack = []
+        for middleware in build_middleware():
+            if middleware.cls is RateLimitMiddleware:
+                middleware = Middleware(RateLimitMiddleware, limiter=RateLimiter(per_minute=1e12, burst=1e12))
+            stack.append(middleware)
+        return stack
+
+    def build_app(self, middleware: List[Middleware]) -> FastAPI:
+        app = FastAPI(middleware=middleware)
+
+        @app.get("/empty")
+        async def empty():
+            return {}
+
+        return app
+
+    async def drive(self, app: FastAPI) -> float:
+        """Seconds per request over `requests` sequential requests"""
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": "/empty", "raw_path": b"/empty",
+            "query_string": b"", "root_path": "", "headers": self.headers,
+            "client": ("127.0.0.1", 50000), "server": ("bench", 80)
+        }
+        statuses = []
+        never = asyncio.Event()
+
+        async def request():
+            # Like a server: the body once, then block until disconnect
+            body_sent = False
+
+            async def receive():
+                nonlocal body_sent
+                if body_sent:
+                    await never.wait()
+                body_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            await app(dict(scope), receive, send)
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+
+        # Warm up route matching, token cache and lazy imports
+        for _ in range(100):
+            await request()
+        if set(statuses) != {200}:
+            raise RuntimeError(f"Unexpected statuses during warmup: {set(statuses)}")
+
+        started = time.perf_counter()
+        for _ in range(self.requests):
+            await request()
+        return (time.perf_counter() - started) / self.requests
+
+    def run(self) -> None:
+        stack = self.pure_asgi_stack()
+        variants = {
+            "bare": [],
+            f"pure ASGI ({len(stack)} layers)": stack,
+            f"BaseHTTPMiddleware ({len(stack)} no-op layers)": [
+                Middleware(BaseHTTPMiddleware, dispatch=_passthrough) for _ in stack
+            ]
+        }
+
+        bare = None
+        for name, middleware in variants.items():
+            per_request = asyncio.run(self.drive(self.build_app(middleware)))
+            bare = per_request if bare is None else bare
+            logger.info(
+                f"{name}: {per_request * 1e6:.1f} us/request "
+                f"(+{(per_request - bare) * 1e6:.1f} us over bare)"
+            )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-request middleware overhead")
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    MiddlewareOverheadBenchmark(args.requests).run()
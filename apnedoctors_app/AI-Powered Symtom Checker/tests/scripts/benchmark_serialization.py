@@ -0,0 +1,97 @@
+from datetime import date, datetime, timedelta
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+import argparse
+import logging
+import timeit
+from models.db_models import Patient, MedicalRecord, Diagnosis
+from utils.serialization import dumps
+from core.logging_config import setup_logging
+
+setup_logging(json_format=False)
+logger = logging.getLogger(__name__)
+
+class SerializationBenchmark:
+    """Compares the default FastAPI response path with utils.serialization.dumps"""
+
+    def __init__(self, history_size: int = 1000, report_days: int = 365):
+        self.history_size = history_size
+        self.report_days = report_days
+
+    def history_payload(self):
+        """Patient history page built from transient ORM objects"""
+        now = datetime.utcnow()
+        patient = Patient(
+            id=1, first_name="Test", last_name="Patient", email="test@example.com",
+            date_of_birth=date(1990, 1, 1), gender="F", is_active=True
+        )
+        records = [
+            MedicalRecord(
+                id=i, patient_id=1, created_at=now, updated_at=now,
+                allergies=["penicillin"], medications=["aspirin"],
+                chronic_conditions=["hypertension"], family_history=[],
+                height=170.0, weight=65.0, blood_type="A+"
+            )
+            for i in range(3)
+        ]
+        diagnoses = [
+            Diagnosis(
+                id=i, patient_id=1, timestamp=now - timedelta(hours=i),
+                symptoms=["headache", "fever", "fatigue"],
+                diagnosis=[{"condition": "flu", "probability": 0.85}, {"condition": "cold", "probability": 0.1}],
+                confidence_score=0.85, risk_level="medium",
+                recommendations=["Rest and hydrate", "Monitor symptoms"], notes=""
+            )
+            for i in range(self.history_size)
+        ]
+        return {"patient": patient, "medical_records": records, "diagnoses": diagnoses, "next_cursor": None}
+
+    def report_payload(self):
+        """Daily confidence report of the shape returned by ReportService"""
+        start = date(2025, 1, 1)
+        return {
+            "average_confidence": 0.82,
+            "daily": [
+                {"day": (start + timedelta(days=i)).isoformat(), "average_confidence": 0.8 + (i % 10) / 100}
+                for i in range(self.report_days)
+            ]
+        }
+
+    @staticmethod
+    def baseline_history(payload) -> bytes:
+        """to_dict() per row, jsonable_encoder, then Starlette's json.dumps"""
+        content = {
+            "patient": {c.key: getattr(payload["patient"], c.key) for c in Patient.__table__.columns},
+            "medical_records": [record.to_dict() for record in payload["medical_records"]],
+            "diagnoses": [diagnosis.to_dict() for diagnosis in payload["diagnoses"]],
+            "next_cursor": payload["next_cursor"]
+        }
+        return JSONResponse(jsonable_encoder(content)).body
+
+    @staticmethod
+    def baseline_report(payload) -> bytes:
+        return JSONResponse(jsonable_encoder(payload)).body
+
+    def run(self, repeat: int = 20) -> None:
+        """Log the best-of-N time per payload for both paths"""
+        cases = [
+            ("history", self.history_payload(), self.baseline_history),
+            ("report", self.report_payload(), self.baseline_report)
+        ]
+        for name, payload, baseline in cases:
+            baseline_time = min(timeit.repeat(lambda: baseline(payload), number=1, repeat=repeat))
+            fast_time = min(timeit.repeat(lambda: dumps(payload), number=1, repeat=repeat))
+            logger.info(
+                f"{name}: baseline {baseline_time * 1000:.2f} ms, "
+                f"orjson {fast_time * 1000:.2f} ms ({baseline_time / fast_time:.1f}x), "
+                f"{len(dumps(payload))} bytes"
+            )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark API response serialization")
+    parser.add_argument("--history-size", type=int, default=1000)
+    parser.add_argument("--report-days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    SerializationBenchmark(args.history_size, args.report_days).run(args.repeat)
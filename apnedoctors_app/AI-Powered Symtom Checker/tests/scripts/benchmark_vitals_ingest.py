@@ -0,0 +1,78 @@
+import argparse
+import logging
+import time
+import numpy as np
+from services.vitals_ingestion import VitalsIngestor, METRIC_RANGES
+from utils.serialization import dumps, loads
+from core.logging_config import setup_logging
+
+setup_logging(json_format=False)
+logger = logging.getLogger(__name__)
+
+class VitalsIngestBenchmark:
+    """Measures single-core ingest throughput (parse, validate, buffer) without a database"""
+
+    def __init__(self, patients: int = 1000, samples_per_series: int = 60, batches: int = 50):
+        self.patients = patients
+        self.samples_per_series = samples_per_series
+        self.batches = batches
+
+    def make_body(self, patient_ids) -> bytes:
+        """One request body of columnar series, as a gateway would post it"""
+        now = time.time()
+        timestamps = (now - np.arange(self.samples_per_series)[::-1]).tolist()
+        series = []
+        for patient_id in patient_ids:
+            for metric, (low, high) in METRIC_RANGES.items():
+                values = np.random.uniform(low, high, self.samples_per_series).round(1)
+                series.append({
+                    "patient_id": int(patient_id),
+                    "metric": metric,
+                    "timestamps": timestamps,
+                    "values": values.tolist()
+                })
+        return dumps({"series": series})
+
+    def run(self) -> None:
+        flushed = []
+        ingestor = VitalsIngestor(
+            flush_interval=3600,
+            patient_lookup=set,
+            sink=lambda drained: flushed.append(sum(len(t) for _, t, _ in drained)) or flushed[-1]
+        )
+        per_batch = max(1, self.patients // self.batches)
+        bodies = [
+            self.make_body(range(start, start + per_batch))
+            for start in range(0, self.patients, per_batch)
+        ]
+
+        started = time.perf_counter()
+        samples = 0
+        for body in bodies:
+            result = ingestor.ingest_batch(loads(body)["series"])
+            samples += result["accepted"] + result["rejected"]
+        ingest_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        ingestor.flush()
+        drain_seconds = time.perf_counter() - started
+        ingestor.close()
+
+        buffer_bytes = ingestor.capacity * (8 + 4)
+        logger.info(
+            f"ingested {samples} samples in {ingest_seconds:.3f}s "
+            f"({samples / ingest_seconds:,.0f} samples/s), drained {sum(flushed)} in {drain_seconds:.3f}s"
+        )
+        logger.info(
+            f"buffer memory: {buffer_bytes / 1024:.0f} KiB per series, "
+            f"{buffer_bytes * len(METRIC_RANGES) / 1024:.0f} KiB per patient at most"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark wearable vitals ingestion")
+    parser.add_argument("--patients", type=int, default=1000)
+    parser.add_argument("--samples", type=int, default=60, help="samples per series per request")
+    parser.add_argument("--batches", type=int, default=50, help="number of request bodies")
+    args = parser.parse_args()
+
+    VitalsIngestBenchmark(args.patients, args.samples, args.batches).run()
@@ -0,0 +1,131 @@
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import argparse
+import asyncio
+import json
+import logging
+import time
+from core.config import get_settings
+from core.logging_config import setup_logging
+from services.diagnosis_cascade import DiagnosisCascade, get_diagnosis_cascade, OUT_OF_VOCABULARY
+
+settings = get_settings()
+setup_logging(json_format=False)
+logger = logging.getLogger(__name__)
+
+def _normalize(term: str) -> str:
+    return " ".join(term.lower().split())
+
+class CascadeEvaluator:
+    """Latency and accuracy of the diagnosis cascade at different thresholds.
+
+    Reads labelled cases (JSON lines with "symptoms" and "condition"),
+    runs the classifier on every case and the generator on every case
+    that would escalate at the highest threshold, timing each call once.
+    Each threshold is then scored from those measurements: the classifier
+    answer is correct if its top condition matches the label, the
+    generator answer if any generated text mentions it. Out-of-vocabulary
+    cases skip the classifier, as they do in the service.
+    """
+
+    def __init__(self, cascade: DiagnosisCascade, cases: List[Dict[str, Any]]):
+        self.cascade = cascade
+        self.cases = cases
+        self.measurements: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def load_cases(path: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        cases = []
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    cases.append(json.loads(line))
+                if limit and len(cases) >= limit:
+                    break
+        return cases
+
+    async def measure(self, highest_threshold: float) -> None:
+        classifier = self.cascade.classifier
+        generator = None
+        for case in self.cases:
+            symptoms, label = case["symptoms"], _normalize(case["condition"])
+            measurement = {"coverage": classifier.coverage(symptoms), "top_probability": None}
+
+            if self.cascade.gate(measurement["coverage"]) is None:
+                started = time.perf_counter()
+                result = await classifier.predict(symptoms)
+                measurement["classifier_seconds"] = time.perf_counter() - started
+                measurement["top_probability"] = result["top_probability"]
+                top = result["diagnoses"][0]["condition"] if result["diagnoses"] else ""
+                measurement["classifier_correct"] = _normalize(top) == label
+
+            if measurement["top_probability"] is None or measurement["top_probability"] < highest_threshold:
+                if generator is None:
+                    logger.info("Loading the generator...")
+                    generator = self.cascade.generator_factory()
+                started = time.perf_counter()
+                generated = await generator.predict_diseases(symptoms)
+                measurement["generator_seconds"] = time.perf_counter() - started
+                measurement["generator_correct"] = any(label in _normalize(text) for text in generated)
+
+            self.measurements.append(measurement)
+
+    def score(self, threshold: float) -> Dict[str, float]:
+        cascade = DiagnosisCascade(None, self.cascade.generator_factory, threshold, self.cascade.min_coverage)
+        latencies, correct, escalated = [], 0, 0
+        for m in self.measurements:
+            reason = cascade.gate(m["coverage"], m["top_probability"])
+            seconds = m.get("classifier_seconds", 0.0)
+            if reason is None:
+                correct += m["classifier_correct"]
+            else:
+                escalated += 1
+                seconds += m["generator_seconds"]
+                correct += m["generator_correct"]
+            latencies.append(seconds)
+
+        latencies.sort()
+        total = len(self.measurements)
+        return {
+            "threshold": threshold,
+            "escalation_rate": escalated / total,
+            "accuracy": correct / total,
+            "mean_ms": sum(latencies) / total * 1000,
+            "p95_ms": latencies[max(0, int(total * 0.95) - 1)] * 1000
+        }
+
+    def run(self, thresholds: Sequence[float]) -> List[Dict[str, float]]:
+        asyncio.run(self.measure(max(thresholds)))
+        out_of_vocabulary = sum(1 for m in self.measurements if self.cascade.gate(m["coverage"]) == OUT_OF_VOCABULARY)
+        logger.info(f"{len(self.measurements)} cases, {out_of_vocabulary} outside the classifier's vocabulary")
+
+        results = [self.score(threshold) for threshold in sorted(thresholds)]
+        for r in results:
+            logger.info(
+                f"threshold {r['threshold']:.2f}: escalated {r['escalation_rate']:.1%}, accuracy {r['accuracy']:.1%}, "
+                f"mean {r['mean_ms']:.1f} ms, p95 {r['p95_ms']:.1f} ms"
+            )
+        return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate the diagnosis cascade's latency/accuracy trade-off")
+    parser.add_argument("dataset", help="JSON lines with 'symptoms' (list) and 'condition'")
+    parser.add_argument(
+        "--thresholds", default="0.5,0.6,0.7,0.8,0.85,0.9,0.95,1.0",
+        help="comma-separated confidence thresholds; 1.0 approximates always escalating"
+    )
+    parser.add_argument("--min-coverage", type=float, default=None)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--output", help="also write the results as JSON here")
+    args = parser.parse_args()
+
+    cascade = get_diagnosis_cascade()
+    if cascade.classifier is None:
+        parser.error(f"No diagnosis classifier version in {settings.MODEL_REGISTRY_DIR}/diagnosis_model")
+    if args.min_coverage is not None:
+        cascade.min_coverage = args.min_coverage
+
+    evaluator = CascadeEvaluator(cascade, CascadeEvaluator.load_cases(args.dataset, args.limit))
+    results = evaluator.run([float(t) for t in args.thresholds.split(",")])
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
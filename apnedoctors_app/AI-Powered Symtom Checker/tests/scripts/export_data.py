@@ -0,0 +1,54 @@
+from datetime import datetime
+from pathlib import Path
+import argparse
+import logging
+from core.config import get_settings
+from services.export_service import DataExportService, EXPORT_TABLES, EXPORT_FORMATS
+from core.logging_config import setup_logging
+
+settings = get_settings()
+setup_logging(json_format=False)
+logger = logging.getLogger(__name__)
+
+class DataExporter:
+    def __init__(self, batch_size: int = None):
+        self.export_service = DataExportService(batch_size=batch_size)
+
+    def export_to_file(self, table_name: str, export_format: str, output: Path, **filters) -> bool:
+        """Stream an export straight to disk"""
+        try:
+            logger.info(f"Exporting {table_name} to {output}...")
+            written = 0
+            with open(output, "wb") as f:
+                for chunk in self.export_service.export(table_name, export_format, **filters):
+                    f.write(chunk)
+                    written += len(chunk)
+            logger.info(f"Export completed: {written} bytes")
+            return True
+        except Exception as e:
+            logger.error(f"Export failed: {str(e)}")
+            return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export diagnoses or medical records")
+    parser.add_argument("table", choices=sorted(EXPORT_TABLES))
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="parquet")
+    parser.add_argument("--start", type=datetime.fromisoformat)
+    parser.add_argument("--end", type=datetime.fromisoformat)
+    parser.add_argument("--patient-id", type=int)
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    extension = EXPORT_FORMATS[args.format][1]
+    output = args.output or Path(f"data/{args.table}.{extension}")
+
+    exporter = DataExporter(batch_size=args.batch_size)
+    exporter.export_to_file(
+        args.table,
+        args.format,
+        output,
+        start=args.start,
+        end=args.end,
+        patient_id=args.patient_id
+    )
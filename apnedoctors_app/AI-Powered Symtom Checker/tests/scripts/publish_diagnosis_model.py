@@ -0,0 +1,64 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+import argparse
+import json
+import logging
+import torch
+from core.logging_config import setup_logging
+from core.model_registry import ModelArtifact, get_model_registry
+from models.ai_models.diagnosis_model import DiagnosisModel
+
+setup_logging(json_format=False)
+logger = logging.getLogger(__name__)
+
+class DiagnosisModelPublisher:
+    """Turns a legacy pickled diagnosis checkpoint into a registry version.
+
+    The checkpoint is unpickled once, here, so only run this on files you
+    trust. Its state dict is checked against the allowlisted architecture
+    and written as safetensors with a manifest; the vocabulary comes from
+    the old <model>.vocab.json sidecar, which is required. The new version is
+    not activated: restart or call POST /api/v1/admin/models/diagnosis_model/activate.
+    """
+
+    def __init__(self, checkpoint: str, config: Dict[str, Any], architecture: str = "diagnosis_mlp"):
+        self.checkpoint = Path(checkpoint)
+        self.config = config
+        self.architecture = architecture
+
+    def load_vocabulary(self) -> Dict[str, Any]:
+        path = self.checkpoint.with_suffix(".vocab.json")
+        if not path.is_file():
+            raise ValueError(f"{path} is missing; a diagnosis model can't be served without its vocabulary")
+        return json.loads(path.read_text())
+
+    def publish(self, version: str) -> ModelArtifact:
+        try:
+            loaded = torch.load(self.checkpoint, map_location="cpu", weights_only=False)
+        except TypeError:
+            # torch < 1.13 has no weights_only and always unpickles
+            loaded = torch.load(self.checkpoint, map_location="cpu")
+        state_dict = loaded if isinstance(loaded, dict) else loaded.state_dict()
+
+        artifact = get_model_registry().publish(
+            "diagnosis_model", version, state_dict, self.architecture, self.config,
+            vocabulary=self.load_vocabulary(), source=self.checkpoint.name
+        )
+        # Round trip through the serving path before anyone activates it
+        DiagnosisModel.from_artifact(artifact, device="cpu")
+        logger.info(f"Published diagnosis_model {version} to {artifact.path}")
+        return artifact
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publish a pickled diagnosis model as a safetensors registry version")
+    parser.add_argument("checkpoint", help="torch.save()d nn.Module or state dict")
+    parser.add_argument(
+        "--config", required=True,
+        help='architecture config as JSON, e.g. \'{"input_size": 300, "hidden_sizes": [256], "num_classes": 40}\''
+    )
+    parser.add_argument("--architecture", default="diagnosis_mlp")
+    parser.add_argument("--version", default=datetime.utcnow().strftime("%Y%m%d-%H%M%S"))
+    args = parser.parse_args()
+
+    DiagnosisModelPublisher(args.checkpoint, json.loads(args.config), args.architecture).publish(args.version)
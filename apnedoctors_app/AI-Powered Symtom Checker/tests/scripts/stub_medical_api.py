@@ -0,0 +1,95 @@
+from aiohttp import web
+from typing import Dict, Any, Optional
+import argparse
+import asyncio
+import logging
+from core.logging_config import setup_logging
+
+setup_logging(json_format=False)
+logger = logging.getLogger(__name__)
+
+class StubMedicalAPI:
+    """Local stand-in for the Mayo Clinic, NIH and WHO condition APIs.
+
+    Each source is served under its own prefix (/mayo_clinic, /nih, /who)
+    with a configurable delay and status code, so hedging, timeouts and
+    failover can be exercised without network access. Point
+    MAYO_CLINIC_API/NIH_API/WHO_API at http://host:port/<source>.
+    """
+
+    SOURCES = ("mayo_clinic", "nih", "who")
+
+    def __init__(
+        self,
+        delays: Optional[Dict[str, float]] = None,
+        statuses: Optional[Dict[str, int]] = None
+    ):
+        self.delays = {source: 0.0 for source in self.SOURCES}
+        self.delays.update(delays or {})
+        self.statuses = {source: 200 for source in self.SOURCES}
+        self.statuses.update(statuses or {})
+        self.request_counts = {source: 0 for source in self.SOURCES}
+        self._runner: Optional[web.AppRunner] = None
+
+    def base_url(self, source: str, port: int, host: str = "127.0.0.1") -> str:
+        return f"http://{host}:{port}/{source}"
+
+    async def handle_condition(self, request: web.Request) -> web.Response:
+        source = request.match_info["source"]
+        if source not in self.SOURCES:
+            raise web.HTTPNotFound()
+
+        self.request_counts[source] += 1
+        await asyncio.sleep(self.delays[source])
+
+        status = self.statuses[source]
+        if status != 200:
+            return web.json_response({"detail": "stub failure"}, status=status)
+
+        condition = request.match_info["condition"]
+        payload: Dict[str, Any] = {
+            "condition": condition,
+            "source": source,
+            "summary": f"Stub information about {condition}",
+            "recommendations": ["Rest and hydrate", "Consult healthcare provider"]
+        }
+        return web.json_response(payload)
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/{source}/conditions/{condition}", self.handle_condition)
+        return app
+
+    async def start(self, port: int = 8081, host: str = "127.0.0.1") -> None:
+        """Start serving in the current event loop (for use from tests)"""
+        self._runner = web.AppRunner(self.build_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info(f"Stub medical API listening on http://{host}:{port}")
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+def _parse_pairs(pairs, cast):
+    """Parse ["nih=0.2", ...] into {"nih": 0.2, ...}"""
+    parsed = {}
+    for pair in pairs or []:
+        source, value = pair.split("=", 1)
+        parsed[source] = cast(value)
+    return parsed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local stub of the external medical APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--delay", action="append", help="source=seconds, e.g. mayo_clinic=0.8")
+    parser.add_argument("--status", action="append", help="source=code, e.g. nih=503")
+    args = parser.parse_args()
+
+    stub = StubMedicalAPI(
+        delays=_parse_pairs(args.delay, float),
+        statuses=_parse_pairs(args.status, int)
+    )
+    web.run_app(stub.build_app(), host=args.host, port=args.port)
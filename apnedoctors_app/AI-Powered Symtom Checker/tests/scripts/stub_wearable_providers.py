@@ -0,0 +1,122 @@
+from aiohttp import web
+from typing import Dict, Optional
+import argparse
+import logging
+import math
+import time
+from utils.token_bucket import TokenBucket
+from core.logging_config import setup_logging
+
+setup_logging(json_format=False)
+logger = logging.getLogger(__name__)
+
+class StubWearableProviders:
+    """Local stand-in for the Apple Health, Fitbit and Google Fit APIs.
+
+    Every user has a synthetic 1 Hz heart-rate and SpO2 stream plus
+    per-minute step counts covering the last `history` seconds up to now.
+    GET /<provider>/user/<id>/vitals?since=&limit= returns the samples
+    newer than `since` in columnar form, `limit` at a time. Providers can
+    enforce their own rate limit (answering 429) to check that the sync
+    scheduler paces itself. Point APPLE_HEALTH_API/FITBIT_API/GOOGLE_FIT_API
+    at http://host:port/<provider>.
+    """
+
+    PROVIDERS = ("apple_health", "fitbit", "google_fit")
+
+    def __init__(self, history: float = 3600.0, rate_limits: Optional[Dict[str, float]] = None):
+        self.history = history
+        self.started = time.time()
+        self.buckets = {
+            provider: TokenBucket(rate, max(1.0, rate))
+            for provider, rate in (rate_limits or {}).items()
+        }
+        self.request_counts = {provider: 0 for provider in self.PROVIDERS}
+        self.throttled_counts = {provider: 0 for provider in self.PROVIDERS}
+        self._runner: Optional[web.AppRunner] = None
+
+    def base_url(self, provider: str, port: int, host: str = "127.0.0.1") -> str:
+        return f"http://{host}:{port}/{provider}"
+
+    def samples(self, user_id: int, since: float, limit: int):
+        """Columnar page of synthetic samples newer than since"""
+        now = time.time()
+        first = max(math.floor(since) + 1, math.ceil(self.started - self.history))
+        last = min(int(now), first + limit - 1)
+        timestamps = [float(t) for t in range(first, last + 1)]
+        minutes = [t for t in timestamps if t % 60 == 0]
+        series = [
+            {
+                "metric": "heart_rate",
+                "timestamps": timestamps,
+                "values": [round(70 + 10 * math.sin(t / 300 + user_id), 1) for t in timestamps]
+            },
+            {
+                "metric": "spo2",
+                "timestamps": timestamps,
+                "values": [round(97 + math.sin(t / 900 + user_id), 1) for t in timestamps]
+            },
+            {
+                "metric": "steps",
+                "timestamps": minutes,
+                "values": [float((int(t) // 60 + user_id) % 120) for t in minutes]
+            }
+        ]
+        return {"series": series, "has_more": last < int(now)}
+
+    async def handle_vitals(self, request: web.Request) -> web.Response:
+        provider = request.match_info["provider"]
+        if provider not in self.PROVIDERS:
+            raise web.HTTPNotFound()
+
+        self.request_counts[provider] += 1
+        bucket = self.buckets.get(provider)
+        if bucket is not None:
+            wait = bucket.try_acquire()
+            if wait:
+                self.throttled_counts[provider] += 1
+                return web.json_response(
+                    {"detail": "rate limited"}, status=429,
+                    headers={"Retry-After": str(math.ceil(wait))}
+                )
+
+        since = float(request.query.get("since", 0))
+        limit = int(request.query.get("limit", 1000))
+        page = self.samples(int(request.match_info["user_id"]), since, limit)
+        return web.json_response(page)
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/{provider}/user/{user_id}/vitals", self.handle_vitals)
+        return app
+
+    async def start(self, port: int = 8082, host: str = "127.0.0.1") -> None:
+        """Start serving in the current event loop (for use from tests)"""
+        self._runner = web.AppRunner(self.build_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info(f"Stub wearable providers listening on http://{host}:{port}")
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+def _parse_pairs(pairs, cast):
+    """Parse ["fitbit=5", ...] into {"fitbit": 5.0, ...}"""
+    parsed = {}
+    for pair in pairs or []:
+        provider, value = pair.split("=", 1)
+        parsed[provider] = cast(value)
+    return parsed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run local stubs of the wearable provider APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8082)
+    parser.add_argument("--history", type=float, default=3600.0, help="seconds of data per user")
+    parser.add_argument("--rate-limit", action="append", help="provider=requests/s, e.g. fitbit=5")
+    args = parser.parse_args()
+
+    stub = StubWearableProviders(args.history, _parse_pairs(args.rate_limit, float))
+    web.run_app(stub.build_app(), host=args.host, port=args.port)
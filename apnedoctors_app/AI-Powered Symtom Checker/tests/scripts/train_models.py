@@ -4,9 +4,10 @@ from pathlib import Path
 import logging
 import json
 from core.config import get_settings
+from core.logging_config import setup_logging
 
 settings = get_settings()
-logging.basicConfig(level=logging.INFO)
+setup_logging(json_format=False)
 logger = logging.getLogger(__name__)
 
 class ModelTrainer:
@@ -0,0 +1,41 @@
+import asyncio
+import time
+import pytest
+from services import resilience
+from services.resilience import CircuitBreaker, DeadlineExceeded, call_with_resilience, deadline_scope
+
+@pytest.fixture
+def half_open_breaker(monkeypatch):
+    """A breaker whose recovery timeout has passed, so the next allow() is the probe"""
+    breaker = CircuitBreaker("probe", failure_threshold=1, recovery_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    monkeypatch.setattr(resilience, "_breakers", {"probe": breaker})
+    return breaker
+
+async def _ok():
+    return "ok"
+
+def test_expired_deadline_releases_the_half_open_probe(half_open_breaker):
+    async def scenario():
+        with deadline_scope(0):
+            with pytest.raises(DeadlineExceeded):
+                await call_with_resilience("probe", _ok, retries=0)
+        return await call_with_resilience("probe", _ok, retries=0)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert half_open_breaker.state == CircuitBreaker.CLOSED
+
+def test_cancelled_acquire_releases_the_half_open_probe(half_open_breaker):
+    async def scenario():
+        waiting = asyncio.ensure_future(
+            call_with_resilience("probe", _ok, retries=0, acquire=lambda: asyncio.sleep(3600))
+        )
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        return await call_with_resilience("probe", _ok, retries=0)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert half_open_breaker.state == CircuitBreaker.CLOSED
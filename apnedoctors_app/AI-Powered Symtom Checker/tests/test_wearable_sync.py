@@ -0,0 +1,150 @@
+from pathlib import Path
+import asyncio
+import socket
+import sys
+import numpy as np
+import pytest
+from core.config import get_settings
+from services import resilience, wearable_service
+from services.http_client import close_http_session
+from services.vitals_ingestion import VitalsIngestor
+from services.wearable_service import SyncInterrupted, WearableService
+
+sys.path.insert(0, str(Path(__file__).parent / "scripts"))
+from stub_wearable_providers import StubWearableProviders
+
+settings = get_settings()
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+class RecordingSink:
+    """Stands in for the time-series store; can fail chosen flushes"""
+
+    def __init__(self, fail_on=()):
+        self.calls = 0
+        self.fail_on = set(fail_on)
+        self.stored = {}
+
+    def __call__(self, drained):
+        self.calls += 1
+        if self.calls in self.fail_on:
+            raise RuntimeError("store unavailable")
+        for (_, metric), timestamps, _ in drained:
+            self.stored.setdefault(metric, []).extend(timestamps.tolist())
+        return sum(len(timestamps) for _, timestamps, _ in drained)
+
+@pytest.fixture
+def sync_env(monkeypatch):
+    """Fresh breakers, provider buckets and ingestor for each test"""
+    monkeypatch.setattr(resilience, "_breakers", {})
+    monkeypatch.setattr(wearable_service, "_provider_buckets", {})
+    monkeypatch.setattr(wearable_service, "provider_metrics", {})
+    monkeypatch.setattr(settings, "EXTERNAL_API_BACKOFF_BASE", 0.01)
+
+    created = []
+
+    def make(capacity=4096, sink=None):
+        ingestor = VitalsIngestor(
+            capacity=capacity, flush_interval=3600, sink=sink or RecordingSink(), patient_lookup=set
+        )
+        monkeypatch.setattr(wearable_service, "get_vitals_ingestor", lambda: ingestor)
+        created.append(ingestor)
+        return ingestor
+
+    yield make
+    for ingestor in created:
+        ingestor.close()
+
+def run_sync(stub, since=None, user_id="7"):
+    """Start the stub, run one fetch_new_data against its fitbit endpoint"""
+    async def scenario():
+        port = _free_port()
+        await stub.start(port)
+        service = WearableService()
+        service.supported_devices["fitbit"] = stub.base_url("fitbit", port)
+        try:
+            return await service.fetch_new_data("fitbit", user_id, since)
+        finally:
+            await close_http_session()
+            await stub.stop()
+    return asyncio.run(scenario())
+
+def test_sync_pages_through_history_and_flushes_each_page(sync_env, monkeypatch):
+    monkeypatch.setattr(settings, "WEARABLE_SYNC_PAGE_SIZE", 100)
+    sink = RecordingSink()
+    sync_env(sink=sink)
+    stub = StubWearableProviders(history=450)
+
+    accepted, high_water = run_sync(stub)
+
+    heart_rate = sink.stored["heart_rate"]
+    assert stub.request_counts["fitbit"] >= 5
+    assert sink.calls >= 5  # one flush per page
+    assert len(heart_rate) == len(set(heart_rate))
+    assert heart_rate == sorted(heart_rate)
+    assert np.all(np.diff(heart_rate) == 1.0)
+    assert high_water == max(heart_rate)
+    assert accepted == sum(len(v) for v in sink.stored.values())
+
+def test_resumed_sync_starts_after_the_cursor(sync_env, monkeypatch):
+    monkeypatch.setattr(settings, "WEARABLE_SYNC_PAGE_SIZE", 100)
+    sink = RecordingSink()
+    sync_env(sink=sink)
+    stub = StubWearableProviders(history=300)
+
+    _, high_water = run_sync(stub)
+    first_pass = len(sink.stored["heart_rate"])
+    run_sync(stub, since=high_water)
+
+    heart_rate = sink.stored["heart_rate"]
+    assert len(heart_rate) == len(set(heart_rate))
+    assert min(heart_rate[first_pass:], default=high_water + 1) > high_water
+
+def test_page_size_is_capped_at_the_buffer_capacity(sync_env, monkeypatch):
+    monkeypatch.setattr(settings, "WEARABLE_SYNC_PAGE_SIZE", 5000)
+    sink = RecordingSink()
+    ingestor = sync_env(capacity=64, sink=sink)
+    stub = StubWearableProviders(history=400)
+
+    _, high_water = run_sync(stub)
+
+    assert ingestor.dropped == 0
+    heart_rate = sink.stored["heart_rate"]
+    assert np.all(np.diff(heart_rate) == 1.0)
+    assert high_water == max(heart_rate)
+
+def test_cursor_stops_at_the_last_stored_page(sync_env, monkeypatch):
+    monkeypatch.setattr(settings, "WEARABLE_SYNC_PAGE_SIZE", 100)
+    sink = RecordingSink(fail_on={3})
+    sync_env(sink=sink)
+    stub = StubWearableProviders(history=600)
+
+    with pytest.raises(SyncInterrupted) as excinfo:
+        run_sync(stub)
+
+    assert excinfo.value.high_water == max(sink.stored["heart_rate"])
+    assert excinfo.value.samples == sum(len(v) for v in sink.stored.values())
+
+def test_429_waits_for_retry_after_without_tripping_the_breaker(sync_env, monkeypatch):
+    monkeypatch.setattr(settings, "WEARABLE_SYNC_PAGE_SIZE", 100)
+    monkeypatch.setattr(settings, "EXTERNAL_API_MAX_RETRIES", 3)
+    sink = RecordingSink()
+    sync_env(sink=sink)
+    # The provider allows 2 requests/s while our bucket allows fitbit 5/s
+    stub = StubWearableProviders(history=500, rate_limits={"fitbit": 2.0})
+
+    accepted, high_water = run_sync(stub)
+
+    metrics = wearable_service.provider_metrics["fitbit"]
+    breaker = resilience.get_breaker("wearable.fitbit")
+    assert stub.throttled_counts["fitbit"] > 0
+    assert metrics["rate_limited"] == stub.throttled_counts["fitbit"]
+    # Every attempt, retries included, went through our token bucket
+    assert metrics["requests"] == stub.request_counts["fitbit"]
+    assert breaker.counters["failures"] == 0
+    assert breaker.state == breaker.CLOSED
+    assert high_water == max(sink.stored["heart_rate"])
+    assert np.all(np.diff(sink.stored["heart_rate"]) == 1.0)
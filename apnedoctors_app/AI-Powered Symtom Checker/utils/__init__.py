@@ -1,5 +1,10 @@
 from .data_processors import DataProcessor
 from .validators import InputValidator
 from .helpers import format_response, generate_id
+from .serialization import dumps, loads
+from .token_bucket import TokenBucket
 
-__all__ = ['DataProcessor', 'InputValidator', 'format_response', 'generate_id']
\ No newline at end of file
+__all__ = [
+    'DataProcessor', 'InputValidator', 'format_response', 'generate_id', 'dumps', 'loads',
+    'TokenBucket'
+]
\ No newline at end of file
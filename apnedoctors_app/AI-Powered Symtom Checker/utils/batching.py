@@ -0,0 +1,146 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import contextvars
+import logging
+import torch
+from core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+def round_up(length: int, multiple: int) -> int:
+    """Round a sequence length up to a multiple (no-op for 0 or 1)"""
+    if multiple <= 1:
+        return length
+    return -(-length // multiple) * multiple
+
+def bucket_by_length(
+    lengths: Sequence[int],
+    max_batch_size: int,
+    max_batch_tokens: int,
+    pad_multiple: int = 1
+) -> List[List[int]]:
+    """Group indices into batches of similar length.
+
+    Indices are sorted by length and cut into consecutive runs, each
+    closed when adding the next item would exceed max_batch_size rows or
+    max_batch_tokens padded tokens. Every batch then pads only to its own
+    (rounded) longest item instead of the longest in the whole queue.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    buckets: List[List[int]] = []
+    current: List[int] = []
+    for index in order:
+        padded = round_up(lengths[index], pad_multiple)
+        if current and (len(current) >= max_batch_size or (len(current) + 1) * padded > max_batch_tokens):
+            buckets.append(current)
+            current = []
+        current.append(index)
+    if current:
+        buckets.append(current)
+    return buckets
+
+def pad_batch(
+    sequences: Sequence[Sequence[int]],
+    pad_token_id: int,
+    pad_multiple: int = 1,
+    max_length: Optional[int] = None
+) -> Dict[str, torch.Tensor]:
+    """input_ids and attention_mask for token id lists, right-padded to the
+    longest one rounded up to pad_multiple (capped at max_length)"""
+    length = round_up(max(len(sequence) for sequence in sequences), pad_multiple)
+    if max_length is not None:
+        length = min(length, max_length)
+    input_ids = torch.full((len(sequences), length), pad_token_id, dtype=torch.long)
+    attention_mask = torch.zeros((len(sequences), length), dtype=torch.long)
+    for row, sequence in enumerate(sequences):
+        sequence = sequence[:length]
+        input_ids[row, :len(sequence)] = torch.as_tensor(sequence, dtype=torch.long)
+        attention_mask[row, :len(sequence)] = 1
+    return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+class EncoderBatcher:
+    """Micro-batches concurrent encoder calls with length-bucketed padding.
+
+    Texts submitted within `max_wait` seconds of each other are tokenized
+    without padding, bucketed by token length and run as one forward pass
+    per bucket. `run_batch(inputs, lengths)` receives padded tensors plus
+    each row's true length and returns one result per row; results and
+    exceptions go back to the submitting callers.
+    """
+
+    def __init__(
+        self,
+        tokenizer: Any,
+        run_batch: Callable[[Dict[str, torch.Tensor], List[int]], List[Any]],
+        max_batch_size: Optional[int] = None,
+        max_batch_tokens: Optional[int] = None,
+        max_wait: Optional[float] = None,
+        pad_multiple: Optional[int] = None,
+        max_length: int = 512
+    ):
+        self.tokenizer = tokenizer
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size or settings.ENCODER_MAX_BATCH_SIZE
+        self.max_batch_tokens = max_batch_tokens or settings.ENCODER_MAX_BATCH_TOKENS
+        self.max_wait = settings.ENCODER_BATCH_WAIT if max_wait is None else max_wait
+        self.pad_multiple = pad_multiple or settings.ENCODER_PAD_MULTIPLE
+        self.max_length = max_length
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats = {"batches": 0, "rows": 0, "tokens": 0, "padded_tokens": 0}
+
+    async def submit(self, text: str) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((text, future))
+        if self._flush_task is None:
+            # Fresh context, so the batch is not attributed to whichever request opened it
+            self._flush_task = contextvars.Context().run(asyncio.ensure_future, self._flush_after_wait())
+        return await future
+
+    async def _flush_after_wait(self) -> None:
+        await asyncio.sleep(self.max_wait)
+        pending, self._pending = self._pending, []
+        self._flush_task = None
+        try:
+            await asyncio.to_thread(self._process, pending)
+        except Exception as e:
+            logger.error(f"Encoder batch tokenization failed: {str(e)}")
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+
+    def _process(self, pending: List[Tuple[str, asyncio.Future]]) -> None:
+        encoded = self.tokenizer(
+            [text for text, _ in pending],
+            truncation=True,
+            max_length=self.max_length,
+            padding=False
+        )["input_ids"]
+        lengths = [len(ids) for ids in encoded]
+
+        # Each bucket succeeds or fails on its own and is answered as soon as it is done
+        for bucket in bucket_by_length(lengths, self.max_batch_size, self.max_batch_tokens, self.pad_multiple):
+            futures = [pending[i][1] for i in bucket]
+            try:
+                inputs = pad_batch([encoded[i] for i in bucket], self.tokenizer.pad_token_id, self.pad_multiple, self.max_length)
+                results = self.run_batch(inputs, [lengths[i] for i in bucket])
+            except Exception as e:
+                logger.error(f"Encoder batch of {len(bucket)} failed: {str(e)}")
+                for future in futures:
+                    future.get_loop().call_soon_threadsafe(_settle, future, None, e)
+                continue
+            self.stats["batches"] += 1
+            self.stats["rows"] += len(bucket)
+            self.stats["tokens"] += sum(lengths[i] for i in bucket)
+            self.stats["padded_tokens"] += inputs["input_ids"].numel()
+            for future, result in zip(futures, results):
+                future.get_loop().call_soon_threadsafe(_settle, future, result, None)
+
+def _settle(future: asyncio.Future, result: Any, error: Optional[BaseException]) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
@@ -0,0 +1,60 @@
+from sqlalchemy import inspect as sa_inspect
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Tuple
+import numpy as np
+import orjson
+
+# Native numpy arrays/scalars, dict keys that are not strings (e.g. int IDs)
+DUMPS_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+@lru_cache(maxsize=None)
+def _column_keys(model: type) -> Tuple[str, ...]:
+    """Public column names of an ORM class, from its __serialize__ tuple.
+
+    Listed explicitly so bookkeeping columns added later do not leak into
+    API responses.
+    """
+    keys = getattr(model, "__serialize__", None)
+    if keys is None:
+        raise TypeError(f"{model.__name__} does not declare __serialize__")
+    columns = {attr.key for attr in sa_inspect(model).column_attrs}
+    unknown = [key for key in keys if key not in columns]
+    if unknown:
+        raise TypeError(f"{model.__name__}.__serialize__ names unknown columns: {unknown}")
+    return tuple(keys)
+
+def _default(obj: Any) -> Any:
+    """Fallback for types orjson does not serialize natively"""
+    # ORM instances: one flat dict of their __serialize__ columns, encoded directly by orjson
+    if hasattr(obj, "__table__") and hasattr(obj, "_sa_instance_state"):
+        return {key: getattr(obj, key) for key in _column_keys(type(obj))}
+
+    # Pydantic models
+    if hasattr(obj, "dict") and hasattr(obj, "__fields__"):
+        return obj.dict()
+
+    # numpy scalars and arrays orjson rejects (non-contiguous, float16, object dtype)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+
+    # torch tensors from model outputs
+    if hasattr(obj, "detach") and hasattr(obj, "cpu"):
+        return obj.detach().cpu().numpy()
+
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def dumps(data: Any) -> bytes:
+    """Serialize API payloads straight to JSON bytes"""
+    return orjson.dumps(data, default=_default, option=DUMPS_OPTIONS)
+
+def loads(data: bytes) -> Any:
+    """Parse JSON request bodies (faster than json.loads for large numeric arrays)"""
+    return orjson.loads(data)